@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the Vercel function in api/index.py.
+
+Every run starts a fresh interpreter, imports ``http.server`` first (the
+Vercel runtime has already done so before loading the function), then times:
+
+- import:     ``import index``, i.e. everything our code adds to a cold start
+- tools/list: the first tools/list request through the HTTP app
+- tools/call: the first tools/call request (imports the tool module when lazy)
+
+Both the lazy (manifest) and eager (MCP_LAZY_TOOLS=0) modes are measured.
+The script exits with status 1 when the median lazy import time exceeds the
+budget, so it can guard against import-time regressions in CI.
+
+    python benchmarks/cold_start.py --runs 20 --budget-ms 40
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(REPO_ROOT, "api")
+
+CHILD_CODE = r"""
+import json, sys, time
+import http.server
+
+sys.path.insert(0, API_DIR)
+started = time.perf_counter()
+import index
+imported = time.perf_counter()
+
+list_body = b'{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}'
+call_body = b'{"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": "echo", "arguments": {"message": "hi"}}}'
+
+response = index.app.handle_post({}, list_body)
+listed = time.perf_counter()
+response = index.app.handle_post({}, call_body)
+called = time.perf_counter()
+assert response.status == 200, response.status
+
+print(json.dumps({
+    "import": (imported - started) * 1000,
+    "tools/list": (listed - imported) * 1000,
+    "tools/call": (called - listed) * 1000,
+}))
+""".replace("API_DIR", repr(API_DIR))
+
+PHASES = ["import", "tools/list", "tools/call"]
+
+
+def run_once(lazy: bool) -> Dict[str, float]:
+    """Time one cold start in a fresh interpreter"""
+    env = dict(os.environ, MCP_LAZY_TOOLS="1" if lazy else "0")
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD_CODE],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def print_import_profile(top: int) -> None:
+    """Show the modules with the largest self import time in lazy mode"""
+    code = "import http.server, sys; sys.path.insert(0, %r); import index" % API_DIR
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=dict(os.environ, MCP_LAZY_TOOLS="1"), capture_output=True, text=True, check=True
+    ).stderr
+
+    # Lines look like "import time:  self [us] | cumulative | module" and are
+    # printed as each import completes: everything after http.server is ours
+    rows = []
+    after_http_server = False
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[0].split()[-1].isdigit():
+            continue
+        module = parts[2].strip()
+        if after_http_server:
+            rows.append((int(parts[0].split()[-1]), module))
+        elif module == "http.server":
+            after_http_server = True
+    rows.sort(reverse=True)
+    print(f"\nLargest self import times (us), lazy mode, top {top}:")
+    for self_us, module in rows[:top]:
+        print(f"  {self_us:8d}  {module}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure cold-start import and first-request latency")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per mode (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=40.0,
+                        help="Maximum median import time in lazy mode (default: 40ms)")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Also list the N modules with the largest import time")
+    args = parser.parse_args()
+
+    results = {}
+    for lazy in (True, False):
+        samples = [run_once(lazy) for _ in range(args.runs)]
+        results["lazy" if lazy else "eager"] = {
+            phase: [sample[phase] for sample in samples] for phase in PHASES
+        }
+
+    print(f"Cold start over {args.runs} runs per mode (ms)")
+    print(f"{'mode':<6} {'phase':<11} {'min':>8} {'median':>8} {'p95':>8} {'max':>8}")
+    for mode, phases in results.items():
+        for phase, values in phases.items():
+            print(f"{mode:<6} {phase:<11} {min(values):8.2f} {statistics.median(values):8.2f} "
+                  f"{percentile(values, 0.95):8.2f} {max(values):8.2f}")
+
+    if args.importtime:
+        print_import_profile(args.importtime)
+
+    median_import = statistics.median(results["lazy"]["import"])
+    if median_import > args.budget_ms:
+        print(f"\nFAIL: median import {median_import:.2f}ms exceeds budget {args.budget_ms:.2f}ms")
+        sys.exit(1)
+    print(f"\nOK: median import {median_import:.2f}ms within budget {args.budget_ms:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the request dispatch hot path.
+
+Each case is one JSON-RPC request (every method the server answers, every
+tool and resource, and an unknown method). For each case the cost of every
+layer a POST goes through is timed in-process, in microseconds per request:
+
+- decode: ``codec.loads`` of the request body, as in ``do_POST``
+- server: ``MCPServer.handle_request``
+- index:  ``api/index.py:handle_mcp_request``
+- encode: ``codec.dumps`` of the response
+- http:   ``MCPHTTPApp.handle_post``, i.e. all of the above plus headers
+
+Timings are compared against stored baselines (one file per JSON codec
+backend); the script exits with status 1 when any of them is slower than its
+baseline by more than the threshold.
+
+    python benchmarks/dispatch.py                  # compare with the baselines
+    python benchmarks/dispatch.py --save           # record new baselines
+    python benchmarks/dispatch.py --filter tools/call --threshold 0.5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, os.path.join(REPO_ROOT, "api"))
+
+import index  # noqa: E402
+import codec  # noqa: E402
+
+# The JSON backend changes the decode and encode costs, so each has its own baselines
+BASELINE_PATH = os.path.join(REPO_ROOT, "benchmarks", f"dispatch_baseline.{codec.BACKEND}.json")
+
+LAYERS = ["decode", "server", "index", "encode", "http"]
+
+REFERENCE_DOCUMENT = {"jsonrpc": "2.0", "id": 1, "result": {"items": [{"name": str(i), "value": i} for i in range(10)]}}
+
+# Arguments for the built-in tools; other tools get an empty object
+TOOL_ARGUMENTS = {
+    "echo": {"message": "Hello from MCP Client!"},
+    "add_numbers": {"a": 15, "b": 25},
+    "get_weather_info": {"location": "San Francisco"}
+}
+
+
+def build_cases() -> List[Tuple[str, Dict[str, Any]]]:
+    """One request per method, tool and resource"""
+    cases = [
+        ("initialize", {"method": "initialize", "params": {}}),
+        ("tools/list", {"method": "tools/list"}),
+        ("resources/list", {"method": "resources/list"})
+    ]
+    for name in index.mcp.tools:
+        cases.append((f"tools/call {name}", {
+            "method": "tools/call",
+            "params": {"name": name, "arguments": TOOL_ARGUMENTS.get(name, {})}
+        }))
+    for uri in index.mcp.resources:
+        cases.append((f"resources/read {uri}", {"method": "resources/read", "params": {"uri": uri}}))
+    cases.append(("unknown method", {"method": "does/not/exist"}))
+    return [(name, dict(jsonrpc="2.0", id=1, **request)) for name, request in cases]
+
+
+def calibrate(timer: timeit.Timer, run_time: float) -> int:
+    """Number of calls that take about ``run_time`` seconds"""
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= run_time / 10:
+            break
+        number *= 10
+    return max(1, int(number * run_time / elapsed))
+
+
+def layer_calls(request: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    body = json.dumps(request).encode("utf-8")
+    response = index.mcp.handle_request(request)
+
+    # Warm up lazily loaded tool modules and caches before timing
+    index.app.handle_post({}, body)
+
+    return {
+        "decode": lambda: codec.loads(body),
+        "server": lambda: index.mcp.handle_request(request),
+        "index": lambda: index.handle_mcp_request(request),
+        "encode": lambda: codec.dumps(response),
+        "http": lambda: index.app.handle_post({}, body)
+    }
+
+
+def reference_workload() -> None:
+    """Fixed interpreter work that every timing is expressed relative to"""
+    json.loads(json.dumps(REFERENCE_DOCUMENT))
+    sorted(str(i) for i in range(50))
+
+
+def measure(cases: List[Tuple[str, Dict[str, Any]]], repeat: int, run_time: float) -> Dict[str, Dict[str, float]]:
+    """Cost of every layer of every case, relative to the reference workload.
+
+    Shared machines slow down for seconds at a time, so each sample is
+    divided by a reference sample taken right next to it and the median of
+    those ratios is kept. The rounds are interleaved over all cases so that
+    a slow spell cannot spoil every sample of one case.
+    """
+    reference = timeit.Timer(reference_workload)
+    reference_number = calibrate(reference, run_time)
+
+    timers = {}
+    for name, request in cases:
+        for layer, func in layer_calls(request).items():
+            timer = timeit.Timer(func)
+            timers[name, layer] = (timer, calibrate(timer, run_time))
+
+    ratios: Dict[Tuple[str, str], List[float]] = {key: [] for key in timers}
+    for _ in range(repeat):
+        for key, (timer, number) in timers.items():
+            per_call = timer.timeit(number) / number
+            ratios[key].append(per_call / (reference.timeit(reference_number) / reference_number))
+
+    results: Dict[str, Dict[str, float]] = {name: {} for name, _ in cases}
+    for (name, layer), samples in ratios.items():
+        results[name][layer] = statistics.median(samples)
+    return results
+
+
+def reference_microseconds(repeat: int, run_time: float) -> float:
+    """Best time of the reference workload on this machine right now"""
+    timer = timeit.Timer(reference_workload)
+    number = calibrate(timer, run_time)
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def load_baselines(path: str) -> Dict[str, Dict[str, float]]:
+    try:
+        with open(path, encoding="utf-8") as baseline_file:
+            return json.load(baseline_file)
+    except FileNotFoundError:
+        return {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time each layer of request dispatch in-process")
+    parser.add_argument("--repeat", type=int, default=7,
+                        help="Timing rounds; the median of each case's ratios to the reference is kept (default: 7)")
+    parser.add_argument("--run-time", type=float, default=0.02,
+                        help="Approximate seconds per timing run (default: 0.02)")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help=f"Baseline file (default: {BASELINE_PATH})")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline as a fraction (default: 0.25)")
+    parser.add_argument("--save", action="store_true", help="Write the results as the new baselines")
+    args = parser.parse_args()
+
+    baselines = load_baselines(args.baseline)
+    regressions = []
+
+    cases = [(name, request) for name, request in build_cases() if args.filter in name]
+    results = measure(cases, args.repeat, args.run_time)
+    unit = reference_microseconds(args.repeat, args.run_time)
+
+    print(f"JSON codec: {codec.BACKEND}")
+    print(f"Reference workload: {unit:.2f}us; timings below are us on this machine (x reference)")
+    print(f"{'case':<36}" + "".join(f"{layer:>16}" for layer in LAYERS))
+    for name, ratios in results.items():
+        cells = []
+        for layer in LAYERS:
+            cell = f"{ratios[layer] * unit:.2f} ({ratios[layer]:.2f})"
+            baseline = baselines.get(name, {}).get(layer)
+            if baseline:
+                change = ratios[layer] / baseline - 1
+                if change > args.threshold:
+                    regressions.append((name, layer, baseline, ratios[layer], change))
+                    cell += "!"
+            cells.append(f"{cell:>16}")
+        print(f"{name:<36}" + "".join(cells))
+
+    if args.save:
+        # Keep baselines of cases that were filtered out of this run
+        baselines.update({name: {layer: round(ratio, 4) for layer, ratio in ratios.items()}
+                          for name, ratios in results.items()})
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(baselines, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print(f"\nSaved baselines for {len(results)} cases to {args.baseline}")
+        return
+
+    if not baselines:
+        print(f"\nNo baselines at {args.baseline}; run with --save to record them")
+        return
+
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} timings regressed by more than {args.threshold:.0%}")
+        for name, layer, baseline, value, change in regressions:
+            print(f"  {name} [{layer}]: {baseline:.2f} -> {value:.2f} x reference (+{change:.0%})")
+        sys.exit(1)
+    print(f"\nOK: no timing regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
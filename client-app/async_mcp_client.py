@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Asyncio MCP client for driving the Vercel MCP Python Server from batch jobs.
+
+Many ``call_tool`` / ``read_resource`` calls can be in flight at once. They
+are multiplexed over a bounded pool of keep-alive HTTP/1.1 connections and,
+with ``pipeline_depth`` > 1, pipelined several to a connection. Only the
+standard library is used, so the client adds no dependencies.
+
+    async with AsyncMCPClient("http://127.0.0.1:8000/", max_connections=20) as client:
+        results = await asyncio.gather(*(client.call_tool("echo", {"message": str(i)}) for i in range(1000)))
+"""
+
+import asyncio
+import email.parser
+import http.client
+import itertools
+import json
+import ssl
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Status, headers and body of an HTTP response
+Response = Tuple[int, http.client.HTTPMessage, bytes]
+
+
+class _NotProcessed(ConnectionError):
+    """The server closed the connection before reading a pipelined request"""
+
+
+class _Connection:
+    """One keep-alive connection; responses are matched to requests in send order"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, freed: asyncio.Event):
+        self.reader = reader
+        self.writer = writer
+        # Set whenever a response or the close frees capacity on this connection
+        self.freed = freed
+        self.pending: Deque[asyncio.Future] = deque()
+        self.closed = False
+        # Only pipeline once a response has shown that the server keeps the connection open
+        self.persistent = False
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_responses())
+
+    def send(self, request: bytes) -> asyncio.Future:
+        """Queue ``request`` on the connection and return the future of its response"""
+        future = asyncio.get_running_loop().create_future()
+        # Append and write without awaiting in between so that the order of
+        # `pending` is the order of the requests on the wire
+        self.pending.append(future)
+        self.writer.write(request)
+        return future
+
+    async def _read_responses(self) -> None:
+        error: Exception = ConnectionError("Connection closed before the response arrived")
+        try:
+            while True:
+                status, headers, body, keep_alive = await _read_response(self.reader)
+                future = self.pending.popleft()
+                # Timed out requests leave a cancelled future behind
+                if not future.done():
+                    future.set_result((status, headers, body))
+                self.persistent = keep_alive
+                self.freed.set()
+                if not keep_alive:
+                    # Requests pipelined behind this response were never read
+                    error = _NotProcessed("Server closed the connection before reading the request")
+                    break
+        except (OSError, asyncio.IncompleteReadError, ValueError, zlib.error) as e:
+            if self.pending:
+                error = ConnectionError(f"Connection lost: {e!r}")
+        finally:
+            self._fail_pending(error)
+            self.writer.close()
+
+    def _fail_pending(self, error: Exception) -> None:
+        self.closed = True
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+        self.freed.set()
+
+    async def close(self) -> None:
+        """Close the connection, failing the requests still waiting on it"""
+        self._reader_task.cancel()
+        self._fail_pending(ConnectionError("Connection closed before the response arrived"))
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (OSError, asyncio.CancelledError):
+            pass
+
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, http.client.HTTPMessage, bytes, bool]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status_line, _, header_block = head.partition(b"\r\n")
+    version, status = status_line.split()[:2]
+    status = int(status)
+    headers = email.parser.BytesParser(_class=http.client.HTTPMessage).parsebytes(header_block)
+
+    connection = (headers.get("Connection") or "").lower()
+    keep_alive = connection == "keep-alive" or (version == b"HTTP/1.1" and connection != "close")
+
+    if status < 200 or status in (204, 304):
+        body = b""
+    elif (headers.get("Transfer-Encoding") or "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                # Skip trailers up to the blank line ending the message
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif headers.get("Content-Length") is not None:
+        body = await reader.readexactly(int(headers["Content-Length"]))
+    else:
+        # No framing: the body runs to the end of the connection
+        body = await reader.read()
+        keep_alive = False
+
+    encoding = (headers.get("Content-Encoding") or "").lower()
+    if body and encoding in ("gzip", "deflate"):
+        body = zlib.decompress(body, 31 if encoding == "gzip" else zlib.MAX_WBITS)
+
+    return status, headers, body, keep_alive
+
+
+class AsyncMCPClient:
+    """Asyncio client for MCP servers with a keep-alive connection pool.
+
+    At most ``max_connections`` connections are opened, each carrying up to
+    ``pipeline_depth`` outstanding requests. Further calls wait for a free
+    slot, so any number of calls can be issued concurrently. Every request
+    gets a unique id.
+    """
+
+    def __init__(self, server_url: str, timeout: float = 10, max_connections: int = 10, pipeline_depth: int = 1):
+        parts = urlsplit(server_url)
+        self.server_url = server_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.pipeline_depth = pipeline_depth
+
+        self._host = parts.hostname or "localhost"
+        self._tls = parts.scheme == "https"
+        self._port = parts.port or (443 if self._tls else 80)
+        self._path = parts.path or "/"
+        if parts.query:
+            self._path += "?" + parts.query
+        self._host_header = parts.netloc
+
+        self._ids = itertools.count(1)
+        self._connections: List[_Connection] = []
+        self._opening = 0
+        self._freed = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_connections * pipeline_depth)
+
+    async def __aenter__(self) -> "AsyncMCPClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close every pooled connection"""
+        connections, self._connections = self._connections, []
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+    async def send_request(self, method: str, params: Dict[str, Any] = None, request_id: Optional[int] = None) -> Dict[str, Any]:
+        """Send a request to the MCP server"""
+        if request_id is None:
+            request_id = next(self._ids)
+        payload = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method
+        }
+
+        if params:
+            payload["params"] = params
+
+        return await self.post(payload)
+
+    async def post(self, payload: Any) -> Any:
+        """POST any JSON-RPC payload (a message or a batch) and return the decoded reply"""
+        try:
+            status, _, body = await self._request(json.dumps(payload).encode("utf-8"))
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            return {"error": f"Request failed: {e!r}"}
+
+        if status >= 400:
+            return {"error": f"Request failed: HTTP {status}"}
+        if not body:
+            return {}
+        try:
+            return json.loads(body)
+        except json.JSONDecodeError as e:
+            return {"error": f"Invalid JSON response: {str(e)}"}
+
+    async def initialize(self) -> Dict[str, Any]:
+        """Initialize the MCP connection and return the server's result"""
+        response = await self.send_request("initialize", {})
+        return response.get("result", response)
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Get list of available tools, following every page"""
+        return await self._list_all("tools/list", "tools")
+
+    async def list_tools_page(self, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of tools and the cursor of the next page (None after the last)"""
+        return await self._list_page("tools/list", "tools", cursor)
+
+    async def search_tools(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the tools best matching ``query``, best first, each with a ``score``"""
+        response = await self.send_request("tools/search", {"query": query, "limit": limit})
+        return response.get("result", {}).get("tools", [])
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a specific tool; returns its text output, or None on error"""
+        response = await self.send_request("tools/call", {
+            "name": tool_name,
+            "arguments": arguments
+        })
+
+        result = response.get("result", {})
+        if "error" in response or result.get("isError"):
+            return None
+        for item in result.get("content", []):
+            if item.get("type") == "text":
+                return item.get("text", "")
+        return result
+
+    async def list_resources(self) -> List[Dict[str, Any]]:
+        """Get list of available resources, following every page"""
+        return await self._list_all("resources/list", "resources")
+
+    async def list_resources_page(self, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of resources and the cursor of the next page (None after the last)"""
+        return await self._list_page("resources/list", "resources", cursor)
+
+    async def _list_page(self, method: str, field: str, cursor: Optional[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        response = await self.send_request(method, {"cursor": cursor} if cursor else {})
+        result = response.get("result", {})
+        return result.get(field, []), result.get("nextCursor")
+
+    async def _list_all(self, method: str, field: str) -> List[Dict[str, Any]]:
+        items, cursor = await self._list_page(method, field, None)
+        while cursor:
+            page, cursor = await self._list_page(method, field, cursor)
+            items.extend(page)
+        return items
+
+    async def read_resource(self, uri: str) -> str:
+        """Read a specific resource; returns its text, or "" on error"""
+        response = await self.send_request("resources/read", {"uri": uri})
+        for content in response.get("result", {}).get("contents", []):
+            return content.get("text", "")
+        return ""
+
+    async def _request(self, body: bytes) -> Response:
+        head = (
+            f"POST {self._path} HTTP/1.1\r\n"
+            f"Host: {self._host_header}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/json\r\n"
+            "Accept-Encoding: gzip, deflate\r\n"
+            "User-Agent: MCP-Client/1.0\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("latin-1")
+
+        async with self._slots:
+            while True:
+                connection = await asyncio.wait_for(self._acquire_connection(), self.timeout)
+                future = connection.send(head + body)
+                try:
+                    await connection.writer.drain()
+                except OSError:
+                    # The reader task fails the pending future as the connection drops
+                    pass
+                try:
+                    return await asyncio.wait_for(future, self.timeout)
+                except _NotProcessed:
+                    # Safe to resend: the server never saw the request
+                    continue
+                except asyncio.TimeoutError:
+                    # The server may never answer, and would keep the connection's
+                    # slots taken; requests pipelined behind this one fail with it
+                    await connection.close()
+                    raise
+
+    async def _acquire_connection(self) -> _Connection:
+        """Pick the least loaded open connection, opening a new one while the pool has room"""
+        self._connections = [connection for connection in self._connections if not connection.closed]
+        idlest = min(self._connections, key=lambda connection: len(connection.pending), default=None)
+
+        if idlest is not None and not idlest.pending:
+            return idlest
+        if len(self._connections) + self._opening < self.max_connections:
+            self._opening += 1
+            try:
+                connection = await asyncio.wait_for(self._open_connection(), self.timeout)
+            finally:
+                self._opening -= 1
+            self._connections.append(connection)
+            return connection
+
+        # The pool is full: pipeline onto a persistent connection, or wait for one to free up
+        while True:
+            self._freed.clear()
+            for connection in self._connections:
+                if not connection.closed and len(connection.pending) < self._depth(connection):
+                    return connection
+            await self._freed.wait()
+            self._connections = [connection for connection in self._connections if not connection.closed]
+            if len(self._connections) + self._opening < self.max_connections:
+                return await self._acquire_connection()
+
+    def _depth(self, connection: _Connection) -> int:
+        return self.pipeline_depth if connection.persistent else 1
+
+    async def _open_connection(self) -> _Connection:
+        ssl_context = ssl.create_default_context() if self._tls else None
+        reader, writer = await asyncio.open_connection(
+            self._host, self._port, ssl=ssl_context, server_hostname=self._host if self._tls else None
+        )
+        return _Connection(reader, writer, self._freed)
+
+
+async def _demo(server_url: str, calls: int, concurrency: int) -> None:
+    async with AsyncMCPClient(server_url, max_connections=concurrency) as client:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*(
+            client.call_tool("echo", {"message": f"call {i}"}) for i in range(calls)
+        ))
+        elapsed = loop.time() - started
+    failures = sum(result is None for result in results)
+    print(f"{calls} calls over {concurrency} connections in {elapsed:.2f}s ({calls / elapsed:.0f}/s), {failures} failed")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description="Issue many concurrent echo calls with the async client")
+    parser.add_argument("--url", default=os.getenv("MCP_SERVER_URL", "http://127.0.0.1:8000/"))
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(_demo(args.url, args.calls, args.concurrency))
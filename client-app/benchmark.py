@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Load generator and latency benchmark for the Vercel MCP Python Server.
+
+Drives a weighted mix of ``initialize``, ``tools/list``, ``tools/call`` and
+``resources/read`` requests, either with a fixed number of concurrent
+workers (``--concurrency``, closed loop) or at a fixed arrival rate
+(``--rate``, open loop), and reports throughput, p50/p95/p99 latency,
+a latency histogram and error rates per method.
+
+    # Against a deployment
+    python benchmark.py --url https://your-deployed-server.vercel.app --concurrency 20 --duration 30
+
+    # Against api/index.py:handler served by http.server on this machine
+    python benchmark.py --local --rate 200 --duration 10 --mix tools/call=8,tools/list=2
+
+In rate mode latency is measured from the time a request was scheduled, so
+queueing behind a saturated server shows up in the percentiles instead of
+silently lowering the offered load.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from async_mcp_client import AsyncMCPClient
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "initialize=1,tools/list=2,tools/call=6,resources/read=1"
+
+# tools/call requests cycle through the same calls as "Test All Tools"
+TOOL_CALLS = [
+    ("echo", {"message": "Hello from MCP Client!"}),
+    ("get_time", {}),
+    ("add_numbers", {"a": 15, "b": 25}),
+    ("get_weather_info", {"location": "San Francisco"})
+]
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+HISTOGRAM_BOUNDS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+LOCAL_SERVER_CODE = r"""
+import sys
+from http.server import ThreadingHTTPServer
+sys.path.insert(0, sys.argv[1])
+import index
+
+index.handler.log_message = lambda *args: None
+# The default listen backlog of 5 drops connections under load and the
+# resulting SYN retries would dominate the tail latency
+ThreadingHTTPServer.request_queue_size = 128
+server = ThreadingHTTPServer(("127.0.0.1", 0), index.handler)
+print(server.server_port, flush=True)
+server.serve_forever()
+"""
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse ``method=weight,...`` into a weight per method"""
+    mix = {}
+    for part in text.split(","):
+        method, _, weight = part.strip().partition("=")
+        if method not in ("initialize", "tools/list", "tools/call", "resources/read"):
+            raise argparse.ArgumentTypeError(f"Unsupported method in mix: {method}")
+        try:
+            mix[method] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight for {method}: {weight}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("The mix needs at least one positive weight")
+    return mix
+
+
+def build_params(method: str, sequence: int) -> Dict[str, Any]:
+    if method == "tools/call":
+        name, arguments = TOOL_CALLS[sequence % len(TOOL_CALLS)]
+        return {"name": name, "arguments": arguments}
+    if method == "resources/read":
+        return {"uri": "config://server"}
+    return {}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class Recorder:
+    """Latencies and error counts per method"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, method: str, latency_ms: float, response: Dict[str, Any]) -> None:
+        self.latencies[method].append(latency_ms)
+        error = response.get("error") if isinstance(response, dict) else "invalid response"
+        if error is None:
+            result = response.get("result")
+            # Tool failures come back as results marked isError
+            if isinstance(result, dict) and result.get("isError"):
+                self.errors[method]["tool"] += 1
+            return
+        # Transport failures come back as strings, JSON-RPC errors as objects
+        if isinstance(error, dict):
+            self.errors[method][f"rpc {error.get('code')}"] += 1
+        else:
+            self.errors[method]["transport"] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        methods = {}
+        everything = []
+        for method, latencies in sorted(self.latencies.items()):
+            everything.extend(latencies)
+            methods[method] = self._describe(latencies, self.errors[method], elapsed)
+        total_errors = sum((errors for errors in self.errors.values()), Counter())
+        return {
+            "elapsed_s": elapsed,
+            "overall": self._describe(everything, total_errors, elapsed),
+            "methods": methods,
+            "histogram": self._histogram(everything)
+        }
+
+    @staticmethod
+    def _describe(latencies: List[float], errors: Counter, elapsed: float) -> Dict[str, Any]:
+        count = len(latencies)
+        if not count:
+            return {"requests": 0}
+        error_count = sum(errors.values())
+        return {
+            "requests": count,
+            "throughput_rps": count / elapsed if elapsed else 0.0,
+            "errors": error_count,
+            "error_rate": error_count / count,
+            "error_kinds": dict(errors),
+            "p50_ms": percentile(latencies, 0.50),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": max(latencies)
+        }
+
+    @staticmethod
+    def _histogram(latencies: List[float]) -> List[Tuple[float, int]]:
+        counts = [0] * len(HISTOGRAM_BOUNDS)
+        for latency in latencies:
+            for index, bound in enumerate(HISTOGRAM_BOUNDS):
+                if latency <= bound:
+                    counts[index] += 1
+                    break
+        return list(zip(HISTOGRAM_BOUNDS, counts))
+
+
+class LoadGenerator:
+    """Issues the request mix through an AsyncMCPClient and records the outcome"""
+
+    def __init__(self, client: AsyncMCPClient, mix: Dict[str, float], seed: Optional[int] = None):
+        self.client = client
+        self.methods = list(mix)
+        self.weights = [mix[method] for method in self.methods]
+        self.random = random.Random(seed)
+        self.recorder = Recorder()
+        self.sequence = 0
+
+    async def request(self, recording: bool, scheduled: Optional[float] = None) -> None:
+        method = self.random.choices(self.methods, self.weights)[0]
+        self.sequence += 1
+        params = build_params(method, self.sequence)
+
+        started = time.perf_counter() if scheduled is None else scheduled
+        response = await self.client.send_request(method, params)
+        latency_ms = (time.perf_counter() - started) * 1000
+        if recording:
+            self.recorder.record(method, latency_ms, response)
+
+    async def run_closed(self, concurrency: int, duration: float, requests: Optional[int], warmup: float) -> float:
+        """Keep ``concurrency`` requests in flight; returns the measured time span"""
+        measure_from = time.perf_counter() + warmup
+        stop_at = measure_from + duration
+        remaining = [requests]
+
+        async def worker():
+            while True:
+                now = time.perf_counter()
+                recording = now >= measure_from
+                if remaining[0] is not None:
+                    if recording and remaining[0] <= 0:
+                        return
+                    if recording:
+                        remaining[0] -= 1
+                elif now >= stop_at:
+                    return
+                await self.request(recording)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - measure_from
+
+    async def run_open(self, rate: float, duration: float, requests: Optional[int], warmup: float) -> float:
+        """Start requests at ``rate`` per second regardless of completions"""
+        interval = 1.0 / rate
+        started = time.perf_counter()
+        measure_from = started + warmup
+        total = int((warmup + duration) * rate) if requests is None else int(warmup * rate) + requests
+        in_flight = set()
+
+        for index in range(total):
+            scheduled = started + index * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.ensure_future(self.request(scheduled >= measure_from, scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+
+        await asyncio.gather(*in_flight)
+        return time.perf_counter() - measure_from
+
+
+def print_report(summary: Dict[str, Any], mode: str) -> None:
+    elapsed = summary["elapsed_s"]
+    overall = summary["overall"]
+    print(f"\n{mode}, measured over {elapsed:.2f}s")
+    print(f"{'method':<15} {'requests':>9} {'req/s':>9} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    rows = list(summary["methods"].items()) + [("total", overall)]
+    for method, stats in rows:
+        if not stats["requests"]:
+            continue
+        print(f"{method:<15} {stats['requests']:>9} {stats['throughput_rps']:>9.1f} {stats['error_rate']:>6.1%} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+
+    for method, stats in rows:
+        if stats.get("errors"):
+            kinds = ", ".join(f"{kind}: {count}" for kind, count in sorted(stats["error_kinds"].items()))
+            print(f"  {method} errors: {kinds}")
+
+    print("\nLatency histogram")
+    largest = max((count for _, count in summary["histogram"]), default=0) or 1
+    lower = 0
+    for bound, count in summary["histogram"]:
+        label = f"> {lower} ms" if bound == float("inf") else f"<= {bound} ms"
+        print(f"  {label:>11} {count:>8}  {'#' * round(40 * count / largest)}")
+        lower = bound
+
+
+def start_local_server() -> Tuple[subprocess.Popen, str]:
+    """Serve api/index.py:handler with http.server on a free port"""
+    process = subprocess.Popen(
+        [sys.executable, "-c", LOCAL_SERVER_CODE, os.path.join(REPO_ROOT, "api")],
+        stdout=subprocess.PIPE, text=True
+    )
+    port = process.stdout.readline().strip()
+    if not port:
+        process.kill()
+        raise RuntimeError("The local server failed to start")
+    return process, f"http://127.0.0.1:{port}/"
+
+
+async def run(args: argparse.Namespace, server_url: str) -> Dict[str, Any]:
+    connections = args.connections or (64 if args.rate else args.concurrency)
+    async with AsyncMCPClient(server_url, timeout=args.timeout, max_connections=connections) as client:
+        generator = LoadGenerator(client, args.mix, args.seed)
+        if args.rate:
+            elapsed = await generator.run_open(args.rate, args.duration, args.requests, args.warmup)
+        else:
+            elapsed = await generator.run_closed(args.concurrency, args.duration, args.requests, args.warmup)
+    return generator.recorder.summary(elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure MCP server throughput and latency")
+    parser.add_argument("--url", default=os.getenv("MCP_SERVER_URL", "http://127.0.0.1:8000/"),
+                        help="Server to benchmark (default: $MCP_SERVER_URL)")
+    parser.add_argument("--local", action="store_true",
+                        help="Start api/index.py:handler under http.server and benchmark it")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Weighted request mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=10,
+                        help="Requests kept in flight in closed-loop mode (default: 10)")
+    parser.add_argument("--rate", type=float, help="Open-loop mode: requests started per second")
+    parser.add_argument("--connections", type=int,
+                        help="Connection pool size (default: --concurrency, or 64 with --rate)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds (default: 10)")
+    parser.add_argument("--requests", type=int, help="Measure this many requests instead of a duration")
+    parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds first (default: 1)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout (default: 10s)")
+    parser.add_argument("--seed", type=int, help="Seed for the request mix")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    server = None
+    server_url = args.url
+    if args.local:
+        server, server_url = start_local_server()
+    try:
+        summary = asyncio.run(run(args, server_url))
+    finally:
+        if server is not None:
+            server.kill()
+            server.wait()
+
+    if args.json:
+        summary["histogram"] = [[None if bound == float("inf") else bound, count] for bound, count in summary["histogram"]]
+        print(json.dumps(summary, indent=2))
+        return
+
+    mode = f"{args.rate:g} req/s offered" if args.rate else f"{args.concurrency} concurrent"
+    print_report(summary, f"{server_url} with {mode}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Stand-in MCP server that injects latency and failures, for exercising client policies.
+
+Serves the real ``api/index.py`` handler with http.server, but before each
+POST it may wait (a fixed delay, a slow tail and a cold start after idle
+periods), answer with an error status and ``Retry-After``, or drop the
+connection without answering. Faults are drawn from a seeded random
+generator, so a run can be repeated.
+
+    # 10% 503s, 5% of requests 2 s slow, a 1.5 s cold start after 30 s idle
+    python fault_server.py --port 8001 --error-rate 0.1 --slow-rate 0.05 --slow-ms 2000 \\
+        --cold-start-ms 1500 --idle-s 30
+
+    MCP_SERVER_URL=http://127.0.0.1:8001/ MCP_RETRIES=3 MCP_HEDGE_PERCENTILE=95 python mcp_client.py
+
+Scripts can also run it in process with ``start_fault_server`` and change
+``FaultInjector`` settings between calls, e.g. set ``error_rate`` to 1 to
+take the server "down".
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FaultInjector:
+    """Which fault, if any, the next request gets, and counts of those injected"""
+
+    def __init__(self, delay_ms: float = 0, slow_rate: float = 0, slow_ms: float = 1000,
+                 error_rate: float = 0, error_status: int = 503, retry_after: Optional[int] = 1,
+                 drop_rate: float = 0, cold_start_ms: float = 0, idle_s: float = 60, seed: Optional[int] = None):
+        self.delay_ms = delay_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.drop_rate = drop_rate
+        self.cold_start_ms = cold_start_ms
+        self.idle_s = idle_s
+        self.counts: Dict[str, int] = {"requests": 0, "cold_starts": 0, "slow": 0, "errors": 0, "drops": 0}
+        self._random = random.Random(seed)
+        self._last_request: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def next_fault(self) -> Tuple[float, Optional[str]]:
+        """Seconds to wait before answering, and ``"error"``, ``"drop"`` or None"""
+        with self._lock:
+            self.counts["requests"] += 1
+            now = time.monotonic()
+            delay = self.delay_ms
+            if self.cold_start_ms and (self._last_request is None or now - self._last_request >= self.idle_s):
+                self.counts["cold_starts"] += 1
+                delay += self.cold_start_ms
+            self._last_request = now
+            if self._random.random() < self.slow_rate:
+                self.counts["slow"] += 1
+                delay += self.slow_ms
+
+            draw = self._random.random()
+            fault = None
+            if draw < self.error_rate:
+                fault = "error"
+                self.counts["errors"] += 1
+            elif draw < self.error_rate + self.drop_rate:
+                fault = "drop"
+                self.counts["drops"] += 1
+            return delay / 1000, fault
+
+
+def make_handler(injector: FaultInjector):
+    """A subclass of the ``api/index.py`` handler with ``injector``'s faults in front of POST"""
+    if os.path.join(REPO_ROOT, "api") not in sys.path:
+        sys.path.insert(0, os.path.join(REPO_ROOT, "api"))
+    import index
+
+    class FaultyHandler(index.handler):
+        def do_POST(self):
+            delay, fault = injector.next_fault()
+            if delay:
+                time.sleep(delay)
+            if fault is None:
+                super().do_POST()
+                return
+
+            # Consume the body so a kept-alive connection stays in sync
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            self.close_connection = True
+            if fault == "drop":
+                # No status line at all: the client sees the connection close
+                return
+            body = b'{"error":"Injected failure"}'
+            self.send_response(injector.error_status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if injector.retry_after is not None:
+                self.send_header("Retry-After", str(injector.retry_after))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FaultyHandler
+
+
+def start_fault_server(injector: FaultInjector, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    """Serve in a background thread; returns the server (call ``shutdown`` to stop it) and its URL"""
+    server = ThreadingHTTPServer((host, port), make_handler(injector))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}/"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the MCP server with injected delays and failures")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on (default: 8001)")
+    parser.add_argument("--delay-ms", type=float, default=0, help="Added to every POST (default: 0)")
+    parser.add_argument("--slow-rate", type=float, default=0, help="Fraction of POSTs made slow (default: 0)")
+    parser.add_argument("--slow-ms", type=float, default=1000, help="Extra delay of a slow POST (default: 1000)")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction answered with --error-status (default: 0)")
+    parser.add_argument("--error-status", type=int, default=503, help="Status of injected errors (default: 503)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After of injected errors, -1 for none (default: 1)")
+    parser.add_argument("--drop-rate", type=float, default=0, help="Fraction of connections closed unanswered (default: 0)")
+    parser.add_argument("--cold-start-ms", type=float, default=0, help="Delay of the first POST after an idle period (default: 0)")
+    parser.add_argument("--idle-s", type=float, default=60, help="Idle seconds before the next POST is a cold start (default: 60)")
+    parser.add_argument("--seed", type=int, help="Seed for the fault draws")
+    args = parser.parse_args()
+
+    injector = FaultInjector(
+        delay_ms=args.delay_ms, slow_rate=args.slow_rate, slow_ms=args.slow_ms,
+        error_rate=args.error_rate, error_status=args.error_status,
+        retry_after=None if args.retry_after < 0 else args.retry_after,
+        drop_rate=args.drop_rate, cold_start_ms=args.cold_start_ms, idle_s=args.idle_s, seed=args.seed
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(injector))
+    print(f"Serving MCP with injected faults on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Injected: {injector.counts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,12 @@ MCP Client for testing the Vercel MCP Python Server
 """
 
 import requests
+import itertools
 import json
 import time
 import os
-from typing import Dict, Any, List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
@@ -15,6 +17,7 @@ from rich.prompt import Prompt, Confirm
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from colorama import init, Fore, Style
 from dotenv import load_dotenv
+from resilience import IDEMPOTENT_METHODS, CircuitBreaker, HedgePolicy, LatencyTracker, RetryPolicy
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,21 +25,103 @@ load_dotenv()
 # Initialize colorama for cross-platform colored output
 init(autoreset=True)
 
+# Header carrying the session id the server assigned on initialize
+SESSION_HEADER = "Mcp-Session-Id"
+
+# Sent with initialize, and again when an expired session is re-established
+INITIALIZE_PARAMS = {
+    "protocolVersion": "2024-11-05",
+    "clientInfo": {"name": "MCP-Client", "version": "1.0"},
+    "capabilities": {}
+}
+
+# Server notifications that make a cached list stale, and the list method each one invalidates
+LIST_CHANGED_NOTIFICATIONS = {
+    "notifications/tools/list_changed": "tools/list",
+    "notifications/resources/list_changed": "resources/list"
+}
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending while the circuit breaker is open"""
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header given in seconds, else None"""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        # HTTP dates are not worth parsing here; fall back to backoff
+        return None
+
+class _CatalogPage:
+    """One page of a list method as last received, with the ETag to revalidate it"""
+    
+    def __init__(self, cursor: Optional[str], etag: Optional[str], result: Dict[str, Any]):
+        self.cursor = cursor
+        self.etag = etag
+        self.result = result
+
+class _Catalog:
+    """Every page of a list method, the items they hold and when they were fetched"""
+    
+    def __init__(self, pages: List[_CatalogPage], items: List[Dict[str, Any]], fetched_at: float):
+        self.pages = pages
+        self.items = items
+        self.fetched_at = fetched_at
+
 class MCPClient:
-    """Client for connecting to MCP servers"""
+    """Client for connecting to MCP servers
     
-    def __init__(self, server_url: str, timeout: int = 10):
+    Tool and resource lists are cached for ``catalog_ttl`` seconds. Once
+    stale, each page is revalidated with its ETag, so an unchanged catalog
+    costs a ``304 Not Modified`` per page instead of the whole list. A
+    ``list_changed`` notification drops the affected list at once.
+    
+    Requests are sent once unless policies are given. Idempotent requests
+    are retried under ``retry`` and hedged under ``hedge``; with a
+    ``breaker``, every request fails fast while the server is down.
+    """
+    
+    def __init__(self, server_url: str, timeout: int = 10, catalog_ttl: float = 300,
+                 retry: Optional[RetryPolicy] = None, hedge: Optional[HedgePolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None):
         self.server_url = server_url
         self.timeout = timeout
+        self.catalog_ttl = catalog_ttl
+        self.retry = retry
+        self.hedge = hedge
+        self.breaker = breaker
+        self.latencies = LatencyTracker()
+        # Attempts beyond the first of each request, and duplicates sent by hedging
+        self.retries = 0
+        self.hedges = 0
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        # Assigned by servers that keep sessions; sent with every request once known
+        self.session_id: Optional[str] = None
         self.console = Console()
+        self._request_ids = itertools.count(1)
+        # list method -> _Catalog
+        self._catalogs: Dict[str, _Catalog] = {}
+        # Tools by name with their parsed parameters, rebuilt when the tool list changes
+        self._tools_by_name: Dict[str, Dict[str, Any]] = {}
+        self._tool_parameters: Dict[str, List[Tuple[str, Dict[str, Any], bool]]] = {}
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'MCP-Client/1.0'
         })
     
-    def send_request(self, method: str, params: Dict[str, Any] = None, request_id: int = 1) -> Dict[str, Any]:
-        """Send a request to the MCP server"""
+    def send_request(self, method: str, params: Dict[str, Any] = None, request_id: int = None,
+                     idempotent: Optional[bool] = None) -> Dict[str, Any]:
+        """Send a request to the MCP server
+        
+        ``idempotent`` defaults to whether ``method`` is one of
+        ``IDEMPOTENT_METHODS``; only idempotent requests are retried or hedged.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if request_id is None:
+            request_id = next(self._request_ids)
         payload = {
             "jsonrpc": "2.0",
             "id": request_id,
@@ -47,14 +132,191 @@ class MCPClient:
             payload["params"] = params
         
         try:
-            response = self.session.post(self.server_url, json=payload, timeout=self.timeout)
+            response = self._post(payload, idempotent=idempotent)
             response.raise_for_status()
-            return response.json()
+            reply = response.json()
+            if isinstance(reply, dict):
+                self._take_notifications([reply])
+            return reply
         except requests.exceptions.RequestException as e:
             return {"error": f"Request failed: {str(e)}"}
         except json.JSONDecodeError as e:
             return {"error": f"Invalid JSON response: {str(e)}"}
     
+    def send_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Send several requests as one JSON-RPC batch; responses are returned in request order"""
+        payload = []
+        for method, params in batch:
+            message = {
+                "jsonrpc": "2.0",
+                "id": next(self._request_ids),
+                "method": method
+            }
+            if params:
+                message["params"] = params
+            payload.append(message)
+        
+        try:
+            response = self._post(payload, idempotent=all(method in IDEMPOTENT_METHODS for method, _ in batch))
+            response.raise_for_status()
+            replies = response.json()
+        except requests.exceptions.RequestException as e:
+            return [{"error": f"Request failed: {str(e)}"}] * len(payload)
+        except json.JSONDecodeError as e:
+            return [{"error": f"Invalid JSON response: {str(e)}"}] * len(payload)
+        
+        # A single error object means the batch itself was rejected
+        if not isinstance(replies, list):
+            error = replies.get("error", replies) if isinstance(replies, dict) else replies
+            return [{"error": error}] * len(payload)
+        
+        # Responses may arrive in any order, so correlate them by id
+        replies = self._take_notifications(replies)
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        return [
+            by_id.get(message["id"], {"error": f"No response for request {message['id']}"})
+            for message in payload
+        ]
+    
+    def _post(self, payload: Any, headers: Optional[Dict[str, str]] = None,
+              idempotent: bool = False) -> requests.Response:
+        """POST a JSON-RPC message or batch and return the HTTP response
+        
+        A ``404`` for a request sent in a session means the server has
+        forgotten it: the session is re-established with ``initialize`` and
+        the request sent once more.
+        """
+        response = self._post_with_policies(payload, headers, idempotent)
+        session_id = response.headers.get(SESSION_HEADER)
+        if session_id is not None and session_id != self.session_id:
+            self._set_session(session_id)
+        elif response.status_code == 404 and self.session_id is not None \
+                and not (isinstance(payload, dict) and payload.get("method") == "initialize"):
+            self._set_session(None)
+            reply = self._post_with_policies(
+                {"jsonrpc": "2.0", "id": next(self._request_ids), "method": "initialize", "params": INITIALIZE_PARAMS},
+                None, False
+            )
+            if reply.ok and reply.headers.get(SESSION_HEADER):
+                self._set_session(reply.headers[SESSION_HEADER])
+                response = self._post_with_policies(payload, headers, idempotent)
+        return response
+    
+    def _set_session(self, session_id: Optional[str]) -> None:
+        self.session_id = session_id
+        if session_id is None:
+            self.session.headers.pop(SESSION_HEADER, None)
+        else:
+            self.session.headers[SESSION_HEADER] = session_id
+    
+    def close(self) -> None:
+        """End the server session, if there is one, and close the HTTP connections"""
+        if self.session_id is not None:
+            try:
+                self.session.delete(self.server_url, timeout=self.timeout)
+            except requests.exceptions.RequestException:
+                # The session expires on the server by itself
+                pass
+            self._set_session(None)
+        self.session.close()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+    
+    def _post_with_policies(self, payload: Any, headers: Optional[Dict[str, str]], idempotent: bool) -> requests.Response:
+        """POST under the client's retry, hedging and circuit-breaker policies"""
+        attempts = self.retry.max_attempts if idempotent and self.retry is not None else 1
+        attempt = 0
+        while True:
+            if self.breaker is not None and not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open, server unavailable; next try in {self.breaker.retry_in():.1f}s")
+            
+            attempt += 1
+            try:
+                if idempotent and self.hedge is not None:
+                    response = self._post_hedged(payload, headers)
+                else:
+                    response = self._post_once(payload, headers)
+            except requests.exceptions.RequestException:
+                self._record_outcome(False)
+                if attempt >= attempts:
+                    raise
+                delay = self.retry.delay(attempt - 1)
+            else:
+                # 429 is about this client's rate, not the server's health
+                self._record_outcome(response.status_code < 500)
+                if attempt >= attempts or response.status_code not in self.retry.retry_statuses:
+                    return response
+                delay = self.retry.delay(attempt - 1, _retry_after(response))
+                if delay is None:
+                    return response
+            
+            self.retries += 1
+            time.sleep(delay)
+    
+    def _post_once(self, payload: Any, headers: Optional[Dict[str, str]]) -> requests.Response:
+        started = time.perf_counter()
+        response = self.session.post(self.server_url, json=payload, headers=headers, timeout=self.timeout)
+        if response.status_code < 500:
+            self.latencies.record(time.perf_counter() - started)
+        return response
+    
+    def _post_hedged(self, payload: Any, headers: Optional[Dict[str, str]]) -> requests.Response:
+        """Send ``payload``, and a copy if no response comes within the hedge delay; the first success wins"""
+        delay = self.hedge.delay(self.latencies)
+        if delay is None:
+            return self._post_once(payload, headers)
+        
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mcp-hedge")
+        first = self._hedge_pool.submit(self._post_once, payload, headers)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+        
+        self.hedges += 1
+        pending = {first, self._hedge_pool.submit(self._post_once, payload, headers)}
+        # The slower copy is left to finish in the background
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return first.result()
+    
+    def _record_outcome(self, success: bool) -> None:
+        if self.breaker is None:
+            return
+        if success:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+    
+    def _take_notifications(self, messages: List[Any]) -> List[Any]:
+        """Handle server notifications among ``messages`` and return the other messages"""
+        replies = []
+        for message in messages:
+            if isinstance(message, dict) and "method" in message and "id" not in message:
+                self.handle_notification(message)
+            else:
+                replies.append(message)
+        return replies
+    
+    def handle_notification(self, message: Dict[str, Any]) -> None:
+        """Act on a notification from the server, e.g. one received over another channel"""
+        method = LIST_CHANGED_NOTIFICATIONS.get(message.get("method"))
+        if method is not None:
+            self.invalidate_catalog(method)
+    
+    def invalidate_catalog(self, method: Optional[str] = None) -> None:
+        """Forget the cached ``tools/list`` or ``resources/list`` result, or both"""
+        if method is None:
+            self._catalogs.clear()
+        else:
+            self._catalogs.pop(method, None)
+        if method in (None, "tools/list"):
+            self._tools_by_name = {}
+            self._tool_parameters = {}
+    
     def test_connection(self) -> bool:
         """Test basic connection to the server"""
         try:
@@ -76,7 +338,7 @@ class MCPClient:
         """Initialize the MCP connection"""
         self.console.print("🔌 Initializing MCP connection...")
         
-        response = self.send_request("initialize", {})
+        response = self.send_request("initialize", INITIALIZE_PARAMS)
         
         if "error" in response:
             self.console.print(f"❌ Initialization failed: {response['error']}")
@@ -91,18 +353,42 @@ class MCPClient:
         
         return True
     
-    def list_tools(self) -> List[Dict[str, Any]]:
+    def get_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Available tools, from the cache while it is fresh; ``refresh`` revalidates it now"""
+        tools = self._list_all("tools/list", "tools", refresh)
+        if tools is None:
+            return []
+        return tools
+    
+    def get_tool(self, name: str) -> Optional[Dict[str, Any]]:
+        """The definition of the tool called ``name``, or None if there is none"""
+        self.get_tools()
+        return self._tools_by_name.get(name)
+    
+    def tool_parameters(self, name: str) -> List[Tuple[str, Dict[str, Any], bool]]:
+        """``(name, schema, required)`` of each parameter of a tool, in inputSchema order"""
+        parameters = self._tool_parameters.get(name)
+        if parameters is None:
+            tool = self.get_tool(name)
+            if tool is None:
+                return []
+            schema = tool.get("inputSchema", {})
+            required = set(schema.get("required", []))
+            parameters = [
+                (param_name, param_info, param_name in required)
+                for param_name, param_info in schema.get("properties", {}).items()
+            ]
+            self._tool_parameters[name] = parameters
+        return parameters
+    
+    def list_tools(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """Get list of available tools"""
         self.console.print("🔧 Fetching available tools...")
         
-        response = self.send_request("tools/list", {})
-        
-        if "error" in response:
-            self.console.print(f"❌ Failed to get tools: {response['error']}")
+        tools = self.get_tools(refresh)
+        if not tools:
             return []
         
-        tools = response.get("result", {}).get("tools", [])
-        
         # Display tools in a nice table
         table = Table(title="Available MCP Tools")
         table.add_column("Name", style="cyan")
@@ -111,12 +397,8 @@ class MCPClient:
         
         for tool in tools:
             params = []
-            properties = tool.get("inputSchema", {}).get("properties", {})
-            required = tool.get("inputSchema", {}).get("required", [])
-            
-            for param_name, param_info in properties.items():
+            for param_name, param_info, is_required in self.tool_parameters(tool.get("name", "")):
                 param_type = param_info.get("type", "unknown")
-                is_required = param_name in required
                 param_str = f"{param_name} ({param_type})"
                 if is_required:
                     param_str += " *"
@@ -131,41 +413,140 @@ class MCPClient:
         self.console.print(table)
         return tools
     
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Call a specific tool with arguments"""
+    def _list_all(self, method: str, field: str, refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Collect every page of a paginated list method, through the catalog cache; None on error"""
+        cached = self._catalogs.get(method)
+        if cached is not None and not refresh and time.monotonic() - cached.fetched_at < self.catalog_ttl:
+            return cached.items
+        
+        previous_pages = cached.pages if cached is not None else []
+        pages = []
+        items = []
+        cursor = None
+        while True:
+            # Pages are revalidated in order for as long as the cursors line up
+            previous = previous_pages[len(pages)] if len(pages) < len(previous_pages) else None
+            if previous is not None and previous.cursor != cursor:
+                previous = None
+            page = self._fetch_page(method, field, cursor, previous)
+            if page is None:
+                return None
+            
+            pages.append(page)
+            items.extend(page.result.get(field, []))
+            cursor = page.result.get("nextCursor")
+            if not cursor:
+                break
+        
+        self._catalogs[method] = _Catalog(pages, items, time.monotonic())
+        if method == "tools/list":
+            self._tools_by_name = {tool.get("name"): tool for tool in items}
+            self._tool_parameters = {}
+        return items
+    
+    def _fetch_page(self, method: str, field: str, cursor: Optional[str],
+                    previous: Optional[_CatalogPage]) -> Optional[_CatalogPage]:
+        """Fetch one page of a list method, or reuse ``previous`` if the server says it has not changed"""
+        payload = {"jsonrpc": "2.0", "id": next(self._request_ids), "method": method}
+        if cursor:
+            payload["params"] = {"cursor": cursor}
+        headers = {"If-None-Match": previous.etag} if previous is not None and previous.etag else None
+        
+        try:
+            response = self._post(payload, headers, idempotent=True)
+            if response.status_code == 304 and previous is not None:
+                return previous
+            response.raise_for_status()
+            reply = response.json()
+        except requests.exceptions.RequestException as e:
+            reply = {"error": f"Request failed: {str(e)}"}
+        except json.JSONDecodeError as e:
+            reply = {"error": f"Invalid JSON response: {str(e)}"}
+        
+        if "error" in reply:
+            self.console.print(f"❌ Failed to get {field}: {reply['error']}")
+            return None
+        return _CatalogPage(cursor, response.headers.get("ETag"), reply.get("result", {}))
+    
+    def call_tool(self, tool_name: str, arguments: Dict[str, Any], idempotent: Optional[bool] = None) -> Any:
+        """Call a specific tool with arguments
+        
+        Tool calls are only retried or hedged when ``idempotent`` is true or,
+        by default, when the cached definition carries an ``idempotentHint``
+        or ``readOnlyHint`` annotation.
+        """
         self.console.print(f"🔨 Calling tool: {tool_name}")
         
+        if idempotent is None:
+            annotations = self._tools_by_name.get(tool_name, {}).get("annotations") or {}
+            idempotent = bool(annotations.get("idempotentHint") or annotations.get("readOnlyHint"))
         response = self.send_request("tools/call", {
             "name": tool_name,
             "arguments": arguments
-        })
+        }, idempotent=idempotent)
         
         if "error" in response:
             self.console.print(f"❌ Tool call failed: {response['error']}")
             return None
         
         result = response.get("result", {})
-        content = result.get("content", [])
-        
-        if content:
-            for item in content:
-                if item.get("type") == "text":
-                    return item.get("text", "")
+        if result.get("isError"):
+            self.console.print(f"❌ Tool call failed: {self._tool_output(result)}")
+            return None
+        return self._tool_output(result)
+    
+    def call_tools_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Call several tools in a single round trip.
+        
+        Returns one entry per call, in order: ``{"name", "result"}`` on success
+        or ``{"name", "error"}`` when that call failed, including a result
+        the tool marked with ``isError``.
+        """
+        self.console.print(f"🔨 Calling {len(calls)} tools in one batch")
+        
+        responses = self.send_batch([
+            ("tools/call", {"name": tool_name, "arguments": arguments})
+            for tool_name, arguments in calls
+        ])
+        
+        results = []
+        for (tool_name, _), response in zip(calls, responses):
+            if "error" in response:
+                error = response["error"]
+                if isinstance(error, dict):
+                    error = error.get("message", error)
+                results.append({"name": tool_name, "error": error})
+            elif response.get("result", {}).get("isError"):
+                # The tool ran but reported a failure, such as an unknown location
+                results.append({"name": tool_name, "error": self._tool_output(response["result"])})
+            else:
+                results.append({"name": tool_name, "result": self._tool_output(response.get("result", {}))})
+        return results
+    
+    @staticmethod
+    def _tool_output(result: Dict[str, Any]) -> Any:
+        """Text of a tools/call result, or the raw result when it has none"""
+        for item in result.get("content", []):
+            if item.get("type") == "text":
+                return item.get("text", "")
         
         return result
     
-    def list_resources(self) -> List[Dict[str, Any]]:
+    def get_resources(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """Available resources, from the cache while it is fresh; ``refresh`` revalidates it now"""
+        resources = self._list_all("resources/list", "resources", refresh)
+        if resources is None:
+            return []
+        return resources
+    
+    def list_resources(self, refresh: bool = False) -> List[Dict[str, Any]]:
         """Get list of available resources"""
         self.console.print("📚 Fetching available resources...")
         
-        response = self.send_request("resources/list", {})
-        
-        if "error" in response:
-            self.console.print(f"❌ Failed to get resources: {response['error']}")
+        resources = self.get_resources(refresh)
+        if not resources:
             return []
         
-        resources = response.get("result", {}).get("resources", [])
-        
         # Display resources in a nice table
         table = Table(title="Available MCP Resources")
         table.add_column("URI", style="cyan")
@@ -210,6 +591,10 @@ def main():
     # Load server URL from environment variables
     server_url = os.getenv('MCP_SERVER_URL', 'https://your-deployed-server.vercel.app')
     timeout = int(os.getenv('MCP_TIMEOUT', '10'))
+    catalog_ttl = float(os.getenv('MCP_CATALOG_TTL', '300'))
+    retries = int(os.getenv('MCP_RETRIES', '2'))
+    hedge_percentile = float(os.getenv('MCP_HEDGE_PERCENTILE', '0'))
+    breaker_threshold = int(os.getenv('MCP_BREAKER_THRESHOLD', '5'))
     debug = os.getenv('MCP_DEBUG', 'false').lower() == 'true'
     
     if debug:
@@ -225,7 +610,12 @@ def main():
     ))
     
     # Create client
-    client = MCPClient(server_url, timeout)
+    client = MCPClient(
+        server_url, timeout, catalog_ttl,
+        retry=RetryPolicy(max_attempts=retries + 1) if retries > 0 else None,
+        hedge=HedgePolicy(hedge_percentile / 100) if hedge_percentile > 0 else None,
+        breaker=CircuitBreaker(breaker_threshold) if breaker_threshold > 0 else None
+    )
     
     # Test connection
     if not client.test_connection():
@@ -255,31 +645,30 @@ def main():
         choice = Prompt.ask("Select an option", choices=["1", "2", "3", "4", "5", "6"])
         
         if choice == "1":
-            client.list_tools()
+            # Listing on request checks with the server, at the cost of a 304 if nothing changed
+            client.list_tools(refresh=True)
         
         elif choice == "2":
-            tools = client.list_tools()
+            # Choices come from the cached catalog; no list round trip per call
+            tools = client.get_tools()
             if not tools:
+                console.print("❌ No tools available")
                 continue
             
             tool_names = [tool["name"] for tool in tools]
             tool_name = Prompt.ask("Enter tool name", choices=tool_names)
             
             # Get tool details
-            tool = next((t for t in tools if t["name"] == tool_name), None)
-            if not tool:
+            if client.get_tool(tool_name) is None:
                 console.print("❌ Tool not found")
                 continue
             
             # Get arguments
             arguments = {}
-            properties = tool.get("inputSchema", {}).get("properties", {})
-            required = tool.get("inputSchema", {}).get("required", [])
             
-            for param_name, param_info in properties.items():
+            for param_name, param_info, is_required in client.tool_parameters(tool_name):
                 param_type = param_info.get("type", "string")
                 param_desc = param_info.get("description", "")
-                is_required = param_name in required
                 
                 if param_type == "integer":
                     value = Prompt.ask(f"Enter {param_name} (integer)" + (" *" if is_required else ""))
@@ -298,11 +687,12 @@ def main():
                 console.print(f"✅ Result: {result}")
         
         elif choice == "3":
-            client.list_resources()
+            client.list_resources(refresh=True)
         
         elif choice == "4":
-            resources = client.list_resources()
+            resources = client.get_resources()
             if not resources:
+                console.print("❌ No resources available")
                 continue
             
             uris = [resource["uri"] for resource in resources]
@@ -315,27 +705,33 @@ def main():
         elif choice == "5":
             console.print("🧪 Testing all tools...")
             
-            # Test echo
-            result = client.call_tool("echo", {"message": "Hello from MCP Client!"})
-            console.print(f"Echo: {result}")
-            
-            # Test get_time
-            result = client.call_tool("get_time", {})
-            console.print(f"Time: {result}")
+            # Call every tool in a single batch request
+            tests = [
+                ("Echo", "echo", {"message": "Hello from MCP Client!"}),
+                ("Time", "get_time", {}),
+                ("Add Numbers (15 + 25)", "add_numbers", {"a": 15, "b": 25}),
+                ("Weather", "get_weather_info", {"location": "San Francisco"})
+            ]
+            results = client.call_tools_batch([(tool_name, arguments) for _, tool_name, arguments in tests])
             
-            # Test add_numbers
-            result = client.call_tool("add_numbers", {"a": 15, "b": 25})
-            console.print(f"Add Numbers (15 + 25): {result}")
-            
-            # Test get_weather_info
-            result = client.call_tool("get_weather_info", {"location": "San Francisco"})
-            console.print(f"Weather: {result}")
+            failures = 0
+            for (label, _, _), outcome in zip(tests, results):
+                if "error" in outcome:
+                    failures += 1
+                    console.print(f"❌ {label}: {outcome['error']}")
+                else:
+                    console.print(f"{label}: {outcome['result']}")
             
-            console.print("✅ All tools tested successfully!")
+            if failures:
+                console.print(f"❌ {failures} of {len(tests)} tool calls failed")
+            else:
+                console.print("✅ All tools tested successfully!")
         
         elif choice == "6":
             console.print("👋 Goodbye!")
             break
+    
+    client.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,159 @@
+"""
+Retry, hedging and circuit-breaker policies for MCP clients.
+
+These classes only decide; the client does the sending. ``RetryPolicy``
+says how often and how long to wait between attempts, ``HedgePolicy``
+when to fire a duplicate of a slow request, and ``CircuitBreaker`` whether
+to try the server at all. Only the standard library is used.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Optional
+
+# Methods that can be sent twice without changing the outcome, and so can be retried or hedged.
+# Not "initialize": on a server with sessions, every copy that arrives starts a session of its own.
+IDEMPOTENT_METHODS = frozenset({
+    "ping",
+    "tools/list",
+    "tools/search",
+    "resources/list",
+    "resources/read"
+})
+
+
+class RetryPolicy:
+    """Up to ``max_attempts`` attempts with full-jitter exponential backoff.
+
+    Before retry ``n`` (counting from 0) the client sleeps a random time up
+    to ``base_delay * 2**n``, capped at ``max_delay``. A ``Retry-After`` the
+    server sent is waited out instead, unless it exceeds ``max_delay``, in
+    which case the response is returned as it is. Transport failures and
+    the HTTP statuses in ``retry_statuses`` are retried.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.1, max_delay: float = 2.0,
+                 retry_statuses: frozenset = frozenset({429, 502, 503, 504}), seed: Optional[int] = None):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self._random = random.Random(seed)
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to sleep before retry number ``retry``, or None to stop retrying"""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class LatencyTracker:
+    """Latencies of the last ``window`` successful requests, for percentiles"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """The ``fraction`` quantile of the recorded latencies, or None before the first one"""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return None
+        return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+class HedgePolicy:
+    """Send a second copy of a request that is slower than the ``percentile`` latency.
+
+    The first response to arrive wins. Until ``min_samples`` latencies are
+    known the client waits ``initial_delay`` seconds before hedging, or
+    does not hedge at all when that is None. Hedging costs at most one
+    extra request per call, and by construction only for the slowest
+    ``1 - percentile`` of them.
+    """
+
+    def __init__(self, percentile: float = 0.95, min_samples: int = 20, initial_delay: Optional[float] = None):
+        if not 0 < percentile < 1:
+            raise ValueError("percentile must be between 0 and 1")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+
+    def delay(self, latencies: LatencyTracker) -> Optional[float]:
+        """Seconds to wait for the first response before hedging, or None to not hedge"""
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        return latencies.percentile(self.percentile)
+
+
+class CircuitBreaker:
+    """Stops sending to a server that keeps failing.
+
+    After ``failure_threshold`` failures in a row the circuit opens and
+    requests fail at once, without touching the network. After
+    ``reset_timeout`` seconds one trial request is let through (half open):
+    its success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Tell whether a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            # Half open: a single trial request at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until the open circuit lets a trial request through"""
+        return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
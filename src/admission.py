@@ -0,0 +1,144 @@
+"""Admission control: per-API-key rate limits and a cap on requests in flight.
+
+Both checks look only at the request headers, so a transport can refuse a
+request before reading its body. Refusing early keeps an overloaded server
+fast: excess requests get an immediate 429 or 503 with ``Retry-After``
+instead of queueing behind the work already admitted and dragging every
+request's latency up with them.
+"""
+
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Collection, Optional
+
+from cache import LRUCache, MISSING
+
+# Request header identifying the client a rate limit applies to
+API_KEY_HEADER = 'X-API-Key'
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average and bursts of up to ``burst``.
+
+    Not thread-safe on its own; ``RateLimiter`` takes a lock around it.
+    """
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Take a token; returns 0 if one was taken, else the seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """One token bucket per key, for at most ``max_keys`` keys.
+
+    The least recently seen key's bucket is dropped past that; it comes
+    back full, so the bound trades a little leniency for fixed memory.
+    """
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._buckets = LRUCache(max_entries=max_keys)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def take(self, key: str) -> float:
+        """Take a token from ``key``'s bucket; returns 0 if allowed, else the seconds to wait"""
+        with self._lock:
+            now = self._clock()
+            bucket = self._buckets.get(key)
+            if bucket is MISSING:
+                bucket = TokenBucket(self.rate, self.burst, now)
+                self._buckets.set(key, bucket)
+            return bucket.take(now)
+
+
+class Rejection:
+    """Why a request was refused: HTTP status, message and seconds to wait before retrying"""
+
+    def __init__(self, status: int, message: str, retry_after: float):
+        self.status = status
+        self.message = message
+        self.retry_after = retry_after
+
+    @property
+    def reason(self) -> str:
+        return "rate_limited" if self.status == 429 else "overloaded"
+
+    def retry_after_header(self) -> str:
+        # Retry-After takes whole seconds; round up so a retry is not refused again
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionControl:
+    """Decides from the headers alone whether a request may proceed.
+
+    Requests are limited by ``rate_limiter``: each of the ``api_keys`` sent
+    in ``X-API-Key`` has its own bucket, and every other request, with an
+    unknown key or none, is charged to one shared bucket. The header is not
+    authenticated otherwise, so a client cannot get a fresh bucket by
+    making a key up. At most ``max_in_flight``
+    admitted requests may be unfinished at once; past that, requests are
+    shed with 503 and told to retry after ``overload_retry_after`` seconds.
+    Every admitted request must be matched by one call to ``release``.
+    """
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, max_in_flight: Optional[int] = None,
+                 overload_retry_after: float = 1.0, api_keys: Collection[str] = ()):
+        self.rate_limiter = rate_limiter
+        self.api_keys = frozenset(api_keys)
+        self.max_in_flight = max_in_flight
+        self.overload_retry_after = overload_retry_after
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["AdmissionControl"]:
+        """Configure from MCP_RATE_LIMIT, MCP_RATE_BURST, MCP_API_KEYS and MCP_MAX_IN_FLIGHT; None if all are off"""
+        rate = float(os.environ.get("MCP_RATE_LIMIT", "0"))
+        max_in_flight = int(os.environ.get("MCP_MAX_IN_FLIGHT", "0")) or None
+        if rate <= 0 and max_in_flight is None:
+            return None
+        rate_limiter = None
+        if rate > 0:
+            burst = float(os.environ.get("MCP_RATE_BURST", "0")) or max(1.0, rate)
+            rate_limiter = RateLimiter(rate, burst)
+        api_keys = [key.strip() for key in os.environ.get("MCP_API_KEYS", "").split(",") if key.strip()]
+        return cls(rate_limiter, max_in_flight, api_keys=api_keys)
+
+    def admit(self, headers: Any) -> Optional[Rejection]:
+        """Admit a request, or return why it is refused; an admitted request holds a slot until ``release``"""
+        with self._lock:
+            if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+                return Rejection(503, "Server is overloaded", self.overload_retry_after)
+            self.in_flight += 1
+
+        if self.rate_limiter is not None:
+            # Shed requests are not charged a token; limited ones give their slot back
+            key = (headers.get(API_KEY_HEADER) or "").strip()
+            wait = self.rate_limiter.take(key if key in self.api_keys else "")
+            if wait:
+                self.release()
+                return Rejection(429, "Rate limit exceeded", wait)
+        return None
+
+    def release(self) -> None:
+        """Give back the slot of an admitted request once its response has been sent"""
+        with self._lock:
+            self.in_flight -= 1
@@ -0,0 +1,175 @@
+"""Standalone asyncio HTTP server for non-Vercel deployments.
+
+Serves the same routes as ``api/index.py`` through ``MCPHTTPApp`` but
+dispatches with ``MCPServer.handle_request_async``, so one process can keep
+thousands of I/O-bound tool calls in flight. Connections are kept alive
+(HTTP/1.1) and streamed responses use chunked transfer encoding.
+
+    python src/aio_server.py --host 0.0.0.0 --port 8000
+"""
+
+import argparse
+import asyncio
+import email.parser
+import http.client
+from contextlib import suppress
+from http import HTTPStatus
+from typing import Any, Optional
+
+from admission import AdmissionControl
+from body import BodyError, read_body_async
+from http_app import HTTPResponse, MCPHTTPApp
+from mcp_server import MCPServer, mcp
+from profiling import Profiler
+from sessions import SessionStore
+
+# Largest request line plus headers accepted before answering 431
+MAX_HEADER_BYTES = 64 * 1024
+
+_NO_BODY_STATUSES = (204, 304)
+
+
+async def start_server(host: str = "127.0.0.1", port: int = 8000, server: Optional[MCPServer] = None) -> asyncio.AbstractServer:
+    """Start listening and return the asyncio server; ``server`` defaults to the global ``mcp``"""
+    app = MCPHTTPApp(server or mcp, profiler=Profiler.from_env(), admission=AdmissionControl.from_env(),
+                     sessions=SessionStore.from_env())
+
+    async def on_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        await handle_connection(app, reader, writer)
+
+    return await asyncio.start_server(on_connection, host, port, limit=MAX_HEADER_BYTES)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8000, server: Optional[MCPServer] = None) -> None:
+    """Run the HTTP server until cancelled"""
+    aio_server = await start_server(host, port, server)
+    async with aio_server:
+        await aio_server.serve_forever()
+
+
+async def handle_connection(app: MCPHTTPApp, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Serve the requests of one keep-alive connection in order"""
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            except asyncio.LimitOverrunError:
+                await _write_response(writer, HTTPResponse(431), keep_alive=False)
+                break
+
+            request_line, _, header_block = head.partition(b"\r\n")
+            try:
+                method, target, version = request_line.decode("latin-1").split()
+            except ValueError:
+                await _write_response(writer, HTTPResponse(400), keep_alive=False)
+                break
+
+            headers = email.parser.BytesParser(_class=http.client.HTTPMessage).parsebytes(header_block)
+            keep_alive = _wants_keep_alive(version, headers)
+
+            admitted = False
+            try:
+                if method == "POST":
+                    # Refused requests are answered before any of their body is read
+                    response = app.admit(headers)
+                    admitted = response is None
+                    if admitted:
+                        response = await _handle_post(app, reader, headers)
+                elif method == "GET":
+                    response = app.handle_get(target, headers)
+                elif method == "DELETE":
+                    response = app.handle_delete(target, headers)
+                elif method == "OPTIONS":
+                    response = app.handle_options(target, headers)
+                else:
+                    response = HTTPResponse(501)
+
+                if response.close:
+                    keep_alive = False
+                chunked = version == "HTTP/1.1"
+                if response.stream is not None and not chunked:
+                    # HTTP/1.0 has no chunked encoding: the stream ends with the connection
+                    keep_alive = False
+
+                await _write_response(writer, response, keep_alive, chunked)
+            finally:
+                if admitted:
+                    app.release()
+            if not keep_alive:
+                break
+
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+        with suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def _handle_post(app: MCPHTTPApp, reader: asyncio.StreamReader, headers: Any) -> HTTPResponse:
+    try:
+        body = await read_body_async(reader, headers, app.max_body_size)
+    except BodyError as e:
+        return app.body_error_response(e)
+    return await app.handle_post_async(headers, body)
+
+
+def _wants_keep_alive(version: str, headers: Any) -> bool:
+    connection = (headers.get("Connection") or "").lower()
+    if version == "HTTP/1.1":
+        return connection != "close"
+    return connection == "keep-alive"
+
+
+async def _write_response(writer: asyncio.StreamWriter, response: HTTPResponse, keep_alive: bool, chunked: bool = True) -> None:
+    status = response.status
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in response.headers]
+
+    header_names = {name.lower() for name, _ in response.headers}
+    if response.stream is not None:
+        if chunked:
+            lines.append("Transfer-Encoding: chunked")
+    elif "content-length" not in header_names and status not in _NO_BODY_STATUSES:
+        lines.append(f"Content-Length: {len(response.body)}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    if response.stream is None:
+        if response.body:
+            writer.write(response.body)
+        await writer.drain()
+        return
+
+    try:
+        await writer.drain()
+        async for chunk in response.stream:
+            if chunked:
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            else:
+                writer.write(chunk)
+            await writer.drain()
+    finally:
+        # Also ends the request's session and profile when the stream was never read
+        await response.stream.aclose()
+    if chunked:
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the MCP server on a standalone asyncio HTTP server")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    args = parser.parse_args()
+
+    print(f"Serving MCP on http://{args.host}:{args.port}/")
+    with suppress(KeyboardInterrupt):
+        asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""Bounded reading and incremental decoding of request bodies.
+
+``read_body`` and ``read_body_async`` check the framing headers before any
+of the body is read, so an oversized request is refused with 413 without
+ever being received. Bodies of at most ``BODY_CHUNK_SIZE`` bytes are read in
+one go; larger and chunked bodies are returned as an iterator of pieces,
+and ``decode_chunks`` turns those into JSON as they arrive. For a batch
+array each element is decoded as soon as its last byte is in, so a large
+batch is never held as a complete bytes or str copy next to its objects.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+
+import codec
+
+# Bodies up to this size are read whole; larger ones are read and decoded in pieces of this size
+BODY_CHUNK_SIZE = 64 * 1024
+
+# Longest chunk-size or trailer line of a chunked body
+MAX_CHUNK_LINE = 4096
+
+# Returned by decode_chunks for a body without any bytes
+NO_BODY = object()
+
+_CHUNK_SIZE = re.compile(rb"[0-9A-Fa-f]{1,16}")
+
+_WHITESPACE = b" \t\r\n"
+_SKIP_WHITESPACE = re.compile(r"[ \t\r\n]*")
+
+# States of _BatchDecoder: before the body, a body that is not an array, and
+# inside an array before "[", after "[", after ",", after an element and after "]"
+_START, _OTHER, _ARRAY, _FIRST, _VALUE, _SEPARATOR, _END = range(7)
+
+
+class BodyError(Exception):
+    """A request body that cannot be accepted, with the HTTP status to answer it with"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def body_length(headers: Any, max_size: Optional[int]) -> Optional[int]:
+    """The Content-Length of the body, or None if it is chunked.
+
+    Raises BodyError for framing this server does not accept, including a
+    Content-Length above ``max_size``.
+    """
+    transfer_encoding = (headers.get("Transfer-Encoding") or "").strip().lower()
+    if transfer_encoding:
+        if transfer_encoding != "chunked":
+            raise BodyError(501, f"Unsupported Transfer-Encoding: {transfer_encoding}")
+        return None
+
+    value = headers.get("Content-Length")
+    if value is None:
+        return 0
+    value = value.strip()
+    if not value.isdigit():
+        raise BodyError(400, "Invalid Content-Length")
+    length = int(value)
+    if max_size is not None and length > max_size:
+        raise BodyError(413, f"Request body is larger than {max_size} bytes")
+    return length
+
+
+def read_body(rfile: Any, headers: Any, max_size: Optional[int]) -> Union[bytes, Iterator[bytes]]:
+    """Read a request body from a blocking file, whole if small and as pieces otherwise"""
+    length = body_length(headers, max_size)
+    if length is None:
+        return _read_chunked(rfile, max_size)
+    if length <= BODY_CHUNK_SIZE:
+        return rfile.read(length)
+    return _read_fixed(rfile, length)
+
+
+def _read_fixed(rfile: Any, length: int) -> Iterator[bytes]:
+    remaining = length
+    while remaining:
+        data = rfile.read(min(remaining, BODY_CHUNK_SIZE))
+        if not data:
+            raise BodyError(400, "Request body ended early")
+        remaining -= len(data)
+        yield data
+
+
+def _read_chunked(rfile: Any, max_size: Optional[int]) -> Iterator[bytes]:
+    total = 0
+    while True:
+        size = _parse_chunk_size(rfile.readline(MAX_CHUNK_LINE + 1))
+        if size == 0:
+            break
+        total += size
+        if max_size is not None and total > max_size:
+            raise BodyError(413, f"Request body is larger than {max_size} bytes")
+        yield from _read_fixed(rfile, size)
+        if rfile.readline(MAX_CHUNK_LINE + 1) not in (b"\r\n", b"\n"):
+            raise BodyError(400, "Malformed chunked body")
+
+    # Trailer fields are read and ignored
+    while True:
+        line = rfile.readline(MAX_CHUNK_LINE + 1)
+        if line in (b"\r\n", b"\n", b""):
+            return
+        if not line.endswith(b"\n"):
+            raise BodyError(400, "Malformed chunked body")
+
+
+async def read_body_async(reader: Any, headers: Any, max_size: Optional[int]) -> Union[bytes, AsyncIterator[bytes]]:
+    """Async counterpart of ``read_body`` for an ``asyncio.StreamReader``"""
+    length = body_length(headers, max_size)
+    if length is None:
+        return _read_chunked_async(reader, max_size)
+    if length <= BODY_CHUNK_SIZE:
+        return await _read_exactly(reader, length)
+    return _read_fixed_async(reader, length)
+
+
+async def _read_exactly(reader: Any, length: int) -> bytes:
+    import asyncio
+
+    try:
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise BodyError(400, "Request body ended early") from None
+
+
+async def _read_fixed_async(reader: Any, length: int) -> AsyncIterator[bytes]:
+    remaining = length
+    while remaining:
+        data = await _read_exactly(reader, min(remaining, BODY_CHUNK_SIZE))
+        remaining -= len(data)
+        yield data
+
+
+async def _read_line(reader: Any) -> bytes:
+    import asyncio
+
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError:
+        raise BodyError(400, "Malformed chunked body") from None
+
+
+async def _read_chunked_async(reader: Any, max_size: Optional[int]) -> AsyncIterator[bytes]:
+    total = 0
+    while True:
+        size = _parse_chunk_size(await _read_line(reader))
+        if size == 0:
+            break
+        total += size
+        if max_size is not None and total > max_size:
+            raise BodyError(413, f"Request body is larger than {max_size} bytes")
+        async for data in _read_fixed_async(reader, size):
+            yield data
+        if await _read_line(reader) not in (b"\r\n", b"\n"):
+            raise BodyError(400, "Malformed chunked body")
+
+    while True:
+        line = await _read_line(reader)
+        if line in (b"\r\n", b"\n", b""):
+            return
+        if len(line) > MAX_CHUNK_LINE or not line.endswith(b"\n"):
+            raise BodyError(400, "Malformed chunked body")
+
+
+def _parse_chunk_size(line: bytes) -> int:
+    if len(line) > MAX_CHUNK_LINE or not line.endswith(b"\n"):
+        raise BodyError(400, "Malformed chunked body")
+    # Chunk extensions after ";" are ignored
+    size = line.split(b";", 1)[0].strip()
+    if not _CHUNK_SIZE.fullmatch(size):
+        raise BodyError(400, "Malformed chunked body")
+    return int(size, 16)
+
+
+class _BatchDecoder:
+    """Decodes a JSON body fed in pieces, a top-level array one element at a time.
+
+    Array elements are decoded with the standard library's scanner straight
+    from a window of UTF-8 text that holds little more than one piece, so
+    they do not go through ``codec``. An element cut off at the end of the
+    window is retried once the window has doubled, which keeps the work
+    linear even for huge elements. Bodies
+    that are not arrays are single messages, small next to the batches this
+    is for; they are buffered and decoded at the end.
+    """
+
+    def __init__(self):
+        self._state = _START
+        self._raw = bytearray()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._position = 0
+        # Length of text after _position needed before a cut-off element is tried again
+        self._retry_length = 0
+        self.elements: List[Any] = []
+        # One document shares equal keys between its objects; decoding the
+        # elements separately would not, and the copies add up over a batch
+        keys: Dict[str, str] = {}
+        self._decoder = json.JSONDecoder(
+            object_pairs_hook=lambda pairs: {keys.setdefault(key, key): value for key, value in pairs}
+        )
+
+    def feed(self, data: bytes) -> None:
+        if self._state == _START:
+            self._raw += data
+            stripped = self._raw.lstrip(_WHITESPACE)
+            if not stripped:
+                return
+            if stripped[:1] != b"[":
+                self._state = _OTHER
+                return
+            self._state = _ARRAY
+            data = bytes(self._raw)
+            self._raw.clear()
+        elif self._state == _OTHER:
+            self._raw += data
+            return
+
+        self._text = self._text[self._position:] + self._utf8.decode(data)
+        self._position = 0
+        self._scan(final=False)
+
+    def finish(self) -> Any:
+        if self._state in (_START, _OTHER):
+            return codec.loads(self._raw) if self._raw else NO_BODY
+        self._text = self._text[self._position:] + self._utf8.decode(b"", final=True)
+        self._position = 0
+        self._scan(final=True)
+        if self._state != _END:
+            raise ValueError("Invalid JSON: unterminated array")
+        return self.elements
+
+    def _scan(self, final: bool) -> None:
+        text = self._text
+        position = self._position
+        state = self._state
+        while True:
+            position = _SKIP_WHITESPACE.match(text, position).end()
+            if position == len(text):
+                break
+            char = text[position]
+
+            if state == _SEPARATOR:
+                if char not in ",]":
+                    raise ValueError(f"Invalid JSON: expected ',' or ']' at {char!r}")
+                state = _VALUE if char == "," else _END
+                position += 1
+            elif state == _END:
+                raise ValueError("Invalid JSON: extra data after the array")
+            elif char == "[" and state == _ARRAY:
+                state = _FIRST
+                position += 1
+            elif char == "]" and state == _FIRST:
+                state = _END
+                position += 1
+            else:
+                if not final and len(text) - position < self._retry_length:
+                    break
+                try:
+                    value, end = self._decoder.raw_decode(text, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # Most likely cut off at the end of the window
+                    self._retry_length = 2 * (len(text) - position)
+                    break
+                following = _SKIP_WHITESPACE.match(text, end).end()
+                if not final and (following == len(text) or text[following] not in ",]"):
+                    # A number may go on in the next piece ("12" then ".5"); keep
+                    # an element only once the "," or "]" after it has arrived
+                    self._retry_length = 2 * (len(text) - position)
+                    break
+                self.elements.append(value)
+                self._retry_length = 0
+                state = _SEPARATOR
+                position = end
+
+        self._state = state
+        self._position = position
+
+
+def decode_chunks(chunks: Iterable[bytes]) -> Any:
+    """Decode a JSON body arriving in pieces; returns NO_BODY if there were no bytes"""
+    decoder = _BatchDecoder()
+    for data in chunks:
+        decoder.feed(data)
+    return decoder.finish()
+
+
+async def decode_chunks_async(chunks: AsyncIterable[bytes]) -> Any:
+    """Async counterpart of ``decode_chunks``"""
+    decoder = _BatchDecoder()
+    async for data in chunks:
+        decoder.feed(data)
+    return decoder.finish()
@@ -0,0 +1,95 @@
+"""Tools and resources that ship with the server.
+
+Registered on the global ``mcp`` instance when this module is imported,
+either at startup or, with a tool manifest, on the first call of one of
+them. Regenerate the manifest (``python src/manifest.py``) after changing
+anything here.
+"""
+
+import datetime
+from typing import Any, Dict
+
+from mcp_server import ToolError, mcp
+
+
+@mcp.tool(
+    description="Echo the provided message back to the user",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "message": {"type": "string", "description": "The message to echo back"}
+        },
+        "required": ["message"]
+    },
+    execution="inline"
+)
+def echo(message: str = "") -> str:
+    return f"Tool echo: {message}"
+
+
+@mcp.tool(
+    description="Get the current server time",
+    input_schema={
+        "type": "object",
+        "properties": {}
+    },
+    execution="inline"
+)
+def get_time() -> str:
+    current_time = datetime.datetime.now().isoformat()
+    return f"Current Vercel server time: {current_time}"
+
+
+@mcp.tool(
+    description="Add two numbers together",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "a": {"type": "integer", "description": "First number"},
+            "b": {"type": "integer", "description": "Second number"}
+        },
+        "required": ["a", "b"]
+    },
+    execution="inline"
+)
+def add_numbers(a: int = 0, b: int = 0) -> int:
+    return a + b
+
+
+@mcp.tool(
+    description="Get the latest weather observation from the station nearest to a location",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "location": {
+                "type": "string",
+                "description": "A place name (\"Portland, ME\"), a station id (\"KSFO\") or \"latitude, longitude\""
+            }
+        },
+        "required": ["location"]
+    },
+    execution="inline"
+)
+def get_weather_info(location: str = "") -> str:
+    # Imported on first call: the station index is built then, not at cold start
+    import weather
+
+    try:
+        # The service caches reports itself, for MCP_WEATHER_TTL and until the data is reloaded
+        return weather.get_service().report(location)
+    except ValueError as e:
+        raise ToolError(str(e)) from None
+
+
+@mcp.resource(
+    "config://server",
+    name="Server Configuration",
+    description="Server configuration information",
+    mime_type="application/json"
+)
+def server_config() -> Dict[str, Any]:
+    return {
+        "version": "1.0.0",
+        "environment": "vercel",
+        "features": ["tools", "resources"]
+    }
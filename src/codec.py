@@ -0,0 +1,63 @@
+"""JSON codec working directly on bytes.
+
+Uses orjson when it is installed and the standard library otherwise; set
+``MCP_JSON_CODEC=stdlib`` to force the fallback. Both emit compact UTF-8
+output, so the bytes on the wire do not depend on the backend.
+"""
+
+import json
+import os
+import re
+from typing import Any, Union
+
+_stdlib_encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _stdlib_loads(data: Union[bytes, str]) -> Any:
+    # json.loads detects the encoding of bytes itself, no decode needed
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    try:
+        return _stdlib_encoder.encode(obj).encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates cannot be written as UTF-8; escape everything instead
+        return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+try:
+    if os.environ.get("MCP_JSON_CODEC", "").lower() == "stdlib":
+        raise ImportError("stdlib codec requested")
+    import orjson
+except ImportError:
+    BACKEND = "stdlib"
+    loads = _stdlib_loads
+    dumps = _stdlib_dumps
+else:
+    BACKEND = "orjson"
+
+    # orjson turns integers beyond 64 bits into floats, which would change
+    # request ids; documents with such long digit runs go to the stdlib
+    _LONG_DIGITS = re.compile(rb"\d{19}")
+    _LONG_DIGITS_TEXT = re.compile(r"\d{19}")
+
+    def loads(data: Union[bytes, str]) -> Any:
+        """Decode a JSON document"""
+        pattern = _LONG_DIGITS_TEXT if isinstance(data, str) else _LONG_DIGITS
+        if pattern.search(data) is not None:
+            return _stdlib_loads(data)
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects some input the standard library accepts, such
+            # as lone surrogates; let the stdlib decide (and raise)
+            return _stdlib_loads(data)
+
+    def dumps(obj: Any) -> bytes:
+        """Encode ``obj`` as compact UTF-8 JSON"""
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # Big integers, non-string keys, lone surrogates and the like
+            return _stdlib_dumps(obj)
@@ -0,0 +1,80 @@
+"""Accept-Encoding negotiation and gzip/deflate compression of response bodies.
+
+Static responses differ per request only in the JSON-RPC id at their
+start, so their fixed tail is compressed once into a ``PrecompressedTail``
+and ``splice`` builds each response by compressing just the short head in
+front of it. Deflate blocks can be concatenated as long as the first part
+ends on a byte boundary (a sync flush), and the gzip/zlib checksums are
+computed over the plain bytes, which is cheap compared to compressing.
+"""
+
+import struct
+import zlib
+from typing import Optional
+
+# Server preference when the client accepts several encodings equally
+SUPPORTED_ENCODINGS = ("gzip", "deflate")
+
+_ALIASES = {"x-gzip": "gzip"}
+
+# Fixed gzip member header: deflate, no flags, no mtime, unknown OS
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+# zlib header for a 32K window (FLEVEL is informational only)
+_ZLIB_HEADER = b"\x78\x9c"
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the encoding to answer an Accept-Encoding header with; None means identity"""
+    if not accept_encoding:
+        return None
+
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[_ALIASES.get(coding, coding)] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """Compress a whole body with ``encoding`` ("gzip" or "deflate")"""
+    wbits = 31 if encoding == "gzip" else zlib.MAX_WBITS
+    compressor = zlib.compressobj(level, zlib.DEFLATED, wbits)
+    return compressor.compress(data) + compressor.flush()
+
+
+class PrecompressedTail:
+    """The fixed end of a body as finished raw deflate data, reusable behind any head"""
+
+    def __init__(self, data: bytes, level: int = 9):
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.data = data
+        self.deflated = compressor.compress(data) + compressor.flush()
+
+
+def splice(encoding: str, head: bytes, tail: PrecompressedTail, level: int = 6) -> bytes:
+    """Compress ``head + tail.data`` reusing the precompressed tail"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated_head = compressor.compress(head) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if encoding == "gzip":
+        crc = zlib.crc32(tail.data, zlib.crc32(head))
+        size = (len(head) + len(tail.data)) & 0xFFFFFFFF
+        return _GZIP_HEADER + deflated_head + tail.deflated + struct.pack("<II", crc, size)
+
+    adler = zlib.adler32(tail.data, zlib.adler32(head))
+    return _ZLIB_HEADER + deflated_head + tail.deflated + struct.pack(">I", adler)
@@ -0,0 +1,574 @@
+"""HTTP front end shared by the Vercel handler and the asyncio server.
+
+Transports only read the request and write back the ``HTTPResponse`` they
+are given; status codes, headers, caching and streaming decisions all live
+here so that ``api/index.py`` and ``aio_server.py`` behave identically.
+"""
+
+import os
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import codec
+import metrics
+from admission import AdmissionControl
+from body import NO_BODY, BodyError, decode_chunks, decode_chunks_async
+from cache import LRUCache, MISSING
+from compression import PrecompressedTail, compress, negotiate, splice
+from mcp_server import SUPPORTED_PROTOCOL_VERSIONS, MCPServer
+from profiling import PROFILE_HEADER, Profiler, RequestProfile, encode_summary
+from sessions import SESSION_HEADER, Session, SessionStore, current_session
+
+Headers = List[Tuple[str, str]]
+
+CORS_HEADERS: Headers = [('Access-Control-Allow-Origin', '*')]
+
+# Request header naming the protocol version of a client that has no session
+PROTOCOL_VERSION_HEADER = 'MCP-Protocol-Version'
+
+# Largest request body accepted, in bytes; MCP_MAX_BODY_SIZE=0 accepts any size
+MAX_BODY_SIZE = int(os.environ.get('MCP_MAX_BODY_SIZE', str(4 * 1024 * 1024))) or None
+
+
+class HTTPResponse:
+    """Status, headers and either a complete body or a stream of body chunks"""
+
+    def __init__(self, status: int, headers: Optional[Headers] = None, body: bytes = b"",
+                 stream: Optional[Union[Iterator[bytes], AsyncIterator[bytes]]] = None, close: bool = False):
+        self.status = status
+        self.headers = headers or []
+        self.body = body
+        # Chunks are written and flushed one by one; body is ignored when set
+        self.stream = stream
+        # The connection must not be reused, e.g. because the request body was not read to its end
+        self.close = close
+
+    def __repr__(self) -> str:
+        return f"HTTPResponse({self.status})"
+
+
+class MCPHTTPApp:
+    """Maps HTTP requests onto an MCPServer.
+
+    JSON bodies of at least ``compress_min_size`` bytes are gzip or deflate
+    compressed when the client's Accept-Encoding allows it; pass
+    ``compress_min_size=None`` to never compress.
+
+    ``GET metrics_path`` (also under ``/api``) serves the server's metrics
+    in the Prometheus text format; pass ``metrics_path=None`` to not expose
+    them.
+
+    POSTs chosen by ``profiler`` are profiled and answered with the profile
+    summary in an ``X-MCP-Profile`` header; a streamed response is profiled
+    until its end, says ``stream`` in the header and carries the summary as
+    its last event, ``event: profile``. Without a profiler, requests take
+    no profiling code path at all.
+
+    Transports read POST bodies with ``body.read_body`` (or its async
+    counterpart) against ``max_body_size`` and pass on the bytes or pieces
+    it returns; pieces are decoded as they arrive.
+
+    Before reading a POST body, transports call ``admit``: with an
+    ``admission`` control it may answer the request straight away with 429
+    or 503. An admitted request is matched by ``release`` once its response
+    has been sent.
+
+    With a ``sessions`` store, ``initialize`` answers carry an
+    ``Mcp-Session-Id``; requests sending it back are handled with that
+    session current (see ``sessions.current_session``), and an unknown or
+    expired id gets 404 so the client initializes again.
+    """
+
+    def __init__(self, server: MCPServer, compress_min_size: Optional[int] = 1024, compress_level: int = 6,
+                 metrics_path: Optional[str] = '/metrics', profiler: Optional[Profiler] = None,
+                 max_body_size: Optional[int] = MAX_BODY_SIZE, admission: Optional[AdmissionControl] = None,
+                 sessions: Optional[SessionStore] = None):
+        self.server = server
+        self.max_body_size = max_body_size
+        self.admission = admission
+        self.sessions = sessions
+        self.compress_min_size = compress_min_size
+        self.compress_level = compress_level
+        self.metrics_path = metrics_path
+        self.profiler = profiler
+        # Compressed tails of static responses, keyed by their ETag
+        self._precompressed = LRUCache(max_entries=32)
+        self._in_flight = server.metrics.gauge(
+            'mcp_http_requests_in_flight', 'POST requests being handled, until their response is ready'
+        )
+        self._rejected = server.metrics.counter(
+            'mcp_http_rejected_total', 'POST requests refused before their body was read', ['reason']
+        )
+
+    def handle_get(self, path: str, headers: Any) -> HTTPResponse:
+        """Handle GET requests"""
+        if self.metrics_path is not None and path.partition('?')[0] in (self.metrics_path, '/api' + self.metrics_path):
+            return self._metrics_response(headers)
+
+        info = {
+            "name": self.server.name,
+            "version": self.server.version,
+            "status": "running",
+            "tools": len(self.server.tools),
+            "resources": len(self.server.resources)
+        }
+        return self._json_response(200, info, request_headers=headers)
+
+    def _metrics_response(self, headers: Any) -> HTTPResponse:
+        body = self.server.metrics.render()
+        response_headers = [('Content-Type', metrics.CONTENT_TYPE), ('Cache-Control', 'no-store')]
+        encoding = self._response_encoding(len(body), headers)
+        if encoding is not None:
+            body = compress(body, encoding, self.compress_level)
+            response_headers.append(('Content-Encoding', encoding))
+        return HTTPResponse(200, response_headers + self._vary_headers() + [('Content-Length', str(len(body)))], body)
+
+    def handle_options(self, path: str, headers: Any) -> HTTPResponse:
+        """Handle CORS preflight requests"""
+        return HTTPResponse(200, [
+            ('Access-Control-Allow-Origin', '*'),
+            ('Access-Control-Allow-Methods', 'GET, POST, DELETE, OPTIONS'),
+            ('Access-Control-Allow-Headers', 'Content-Type, Authorization, X-API-Key, If-None-Match, Accept-Encoding, '
+                                             + PROFILE_HEADER + ', ' + SESSION_HEADER + ', ' + PROTOCOL_VERSION_HEADER),
+            ('Content-Length', '0')
+        ])
+
+    def handle_delete(self, path: str, headers: Any) -> HTTPResponse:
+        """End the session named by the request's Mcp-Session-Id"""
+        if self.sessions is None:
+            return HTTPResponse(405, CORS_HEADERS + [('Allow', 'GET, POST, OPTIONS'), ('Content-Length', '0')])
+        session_id = headers.get(SESSION_HEADER)
+        if not session_id:
+            return self._json_response(400, {"error": f"Missing {SESSION_HEADER} header"})
+        if not self.sessions.delete(session_id):
+            return self._json_response(404, {"error": "Session not found"})
+        return HTTPResponse(204, CORS_HEADERS)
+
+    def admit(self, headers: Any) -> Optional[HTTPResponse]:
+        """Admit a POST from its headers alone, or return the 429/503 response refusing it"""
+        if self.admission is None:
+            return None
+        rejection = self.admission.admit(headers)
+        if rejection is None:
+            return None
+        self._rejected.inc((rejection.reason,))
+        response = self._json_response(rejection.status, {"error": rejection.message})
+        response.headers += [('Retry-After', rejection.retry_after_header()),
+                             ('Access-Control-Expose-Headers', 'Retry-After')]
+        # The body is left unread
+        response.close = True
+        return response
+
+    def release(self) -> None:
+        """End a POST admitted by ``admit``, after its response has been sent"""
+        if self.admission is not None:
+            self.admission.release()
+
+    def handle_post(self, headers: Any, body: Union[bytes, Iterable[bytes]]) -> HTTPResponse:
+        """Handle POST requests carrying JSON-RPC messages"""
+        self._in_flight.inc()
+        try:
+            if self.profiler is not None and self.profiler.wants(headers):
+                profile = self.profiler.start()
+                if profile is None:
+                    return self._profile_skipped(self._handle_post(headers, body))
+                profile.enable()
+                response = None
+                try:
+                    token = profile.activate()
+                    try:
+                        response = self._handle_post(headers, body)
+                    finally:
+                        profile.deactivate(token)
+                finally:
+                    if response is None or response.stream is None:
+                        profile.disable()
+                if response.stream is not None:
+                    # Produced after this returns: measured until it ends, the summary is its last event
+                    response.stream = StreamInContext(response.stream, profile, profile.disable,
+                                                      lambda: self._profile_event(profile))
+                return self._profiled(response, profile)
+            return self._handle_post(headers, body)
+        finally:
+            self._in_flight.dec()
+
+    def _handle_post(self, headers: Any, body: Union[bytes, Iterable[bytes]]) -> HTTPResponse:
+        try:
+            if isinstance(body, (bytes, bytearray)):
+                request = codec.loads(body) if body else NO_BODY
+            else:
+                request = decode_chunks(body)
+            if request is NO_BODY:
+                return self._json_response(200, {"error": "No data received"})
+
+            if self.sessions is None:
+                return self._respond(request, headers)
+
+            session, response = self._open_session(request, headers)
+            if session is None:
+                return response or self._respond(request, headers)
+            token = session.activate()
+            response = None
+            try:
+                response = self._respond(request, headers)
+            finally:
+                Session.deactivate(token)
+                if response is None or response.stream is None:
+                    self.sessions.save(session)
+            if response.stream is not None:
+                # Streamed tools run, and may change the session's data, after this returns
+                response.stream = StreamInContext(response.stream, session, lambda: self.sessions.save(session))
+            return self._with_session(response, session)
+
+        except BodyError as e:
+            return self.body_error_response(e)
+        except Exception as e:
+            return self._server_error_response(e, body)
+
+    def _respond(self, request: Any, headers: Any) -> HTTPResponse:
+        cached = self._cached_response(request, headers)
+        if cached is not None:
+            return cached
+
+        if self.server.is_streaming_request(request) and self._accepts_event_stream(headers):
+            messages = self.server.stream_request(request, self._protocol_version(headers))
+            return self._event_stream_response(self._encode_events(messages))
+
+        return self._rpc_response(self.server.handle_request(request), headers)
+
+    async def handle_post_async(self, headers: Any, body: Union[bytes, AsyncIterable[bytes]]) -> HTTPResponse:
+        """Async counterpart of ``handle_post``"""
+        self._in_flight.inc()
+        try:
+            if self.profiler is not None and self.profiler.wants(headers):
+                profile = self.profiler.start()
+                if profile is None:
+                    return self._profile_skipped(await self._handle_post_async(headers, body))
+                profile.enable()
+                response = None
+                try:
+                    token = profile.activate()
+                    try:
+                        response = await self._handle_post_async(headers, body)
+                    finally:
+                        profile.deactivate(token)
+                finally:
+                    if response is None or response.stream is None:
+                        profile.disable()
+                if response.stream is not None:
+                    response.stream = AsyncStreamInContext(response.stream, profile, profile.disable,
+                                                           lambda: self._profile_event(profile))
+                return self._profiled(response, profile)
+            return await self._handle_post_async(headers, body)
+        finally:
+            self._in_flight.dec()
+
+    async def _handle_post_async(self, headers: Any, body: Union[bytes, AsyncIterable[bytes]]) -> HTTPResponse:
+        try:
+            if isinstance(body, (bytes, bytearray)):
+                request = codec.loads(body) if body else NO_BODY
+            else:
+                request = await decode_chunks_async(body)
+            if request is NO_BODY:
+                return self._json_response(200, {"error": "No data received"})
+
+            if self.sessions is None:
+                return await self._respond_async(request, headers)
+
+            session, response = self._open_session(request, headers)
+            if session is None:
+                return response or await self._respond_async(request, headers)
+            token = session.activate()
+            response = None
+            try:
+                response = await self._respond_async(request, headers)
+            finally:
+                Session.deactivate(token)
+                if response is None or response.stream is None:
+                    self.sessions.save(session)
+            if response.stream is not None:
+                # Streamed tools run, and may change the session's data, after this returns
+                response.stream = AsyncStreamInContext(response.stream, session, lambda: self.sessions.save(session))
+            return self._with_session(response, session)
+
+        except BodyError as e:
+            return self.body_error_response(e)
+        except Exception as e:
+            return self._server_error_response(e, body)
+
+    async def _respond_async(self, request: Any, headers: Any) -> HTTPResponse:
+        cached = self._cached_response(request, headers)
+        if cached is not None:
+            return cached
+
+        if self.server.is_streaming_request(request) and self._accepts_event_stream(headers):
+            messages = self.server.stream_request_async(request, self._protocol_version(headers))
+            return self._event_stream_response(self._encode_events_async(messages))
+
+        return self._rpc_response(await self.server.handle_request_async(request), headers)
+
+    def _open_session(self, request: Any, headers: Any) -> Tuple[Optional[Session], Optional[HTTPResponse]]:
+        """The session to handle ``request`` in, or the 404 response refusing it; (None, None) for no session"""
+        initialize = isinstance(request, dict) and request.get("method") == "initialize"
+        session_id = headers.get(SESSION_HEADER)
+        if session_id:
+            session = self.sessions.get(session_id)
+            if session is not None:
+                # A reconnecting client's initialize reuses its session as it is
+                return session, None
+            if not initialize:
+                return None, self._json_response(404, {"error": "Session not found"})
+        if initialize:
+            params = request.get("params")
+            return self.sessions.create(params, self.server.negotiate_protocol_version(params)), None
+        # Clients that never initialized keep working without a session
+        return None, None
+
+    def _protocol_version(self, headers: Any) -> Optional[str]:
+        """The protocol version the client negotiated, from its session or header; None if unknown"""
+        session = current_session()
+        version = session.protocol_version if session is not None else headers.get(PROTOCOL_VERSION_HEADER)
+        return version if version in SUPPORTED_PROTOCOL_VERSIONS else None
+
+    def _with_session(self, response: HTTPResponse, session: Session) -> HTTPResponse:
+        response.headers = response.headers + [(SESSION_HEADER, session.id),
+                                               ('Access-Control-Expose-Headers', SESSION_HEADER)]
+        return response
+
+    def body_error_response(self, error: BodyError) -> HTTPResponse:
+        """Answer a request whose body was refused; the rest of the body is left unread"""
+        response = self._json_response(error.status, {"error": error.message})
+        response.close = True
+        return response
+
+    def _server_error_response(self, error: Exception, body: Any) -> HTTPResponse:
+        response = self._json_response(500, {"error": str(error)}, cors=False)
+        # A body read in pieces may have been abandoned part way
+        response.close = not isinstance(body, (bytes, bytearray))
+        return response
+
+    def _profiled(self, response: HTTPResponse, profile: RequestProfile) -> HTTPResponse:
+        # The headers of a streamed response go out before the profile ends
+        value = 'stream' if response.stream is not None else self._profile_summary(profile)
+        response.headers = response.headers + [(PROFILE_HEADER, value),
+                                               ('Access-Control-Expose-Headers', PROFILE_HEADER)]
+        return response
+
+    def _profile_summary(self, profile: RequestProfile) -> str:
+        try:
+            return encode_summary(self.profiler.finish(profile))
+        except Exception as e:
+            # A profile that cannot be summarized must not cost the request its response
+            return encode_summary({"error": str(e)})
+
+    def _profile_event(self, profile: RequestProfile) -> bytes:
+        return b'event: profile\ndata: ' + self._profile_summary(profile).encode('utf-8') + b'\n\n'
+
+    def _profile_skipped(self, response: HTTPResponse) -> HTTPResponse:
+        # Another request holds the profiler; say so rather than wait for it
+        response.headers = response.headers + [(PROFILE_HEADER, 'busy'),
+                                               ('Access-Control-Expose-Headers', PROFILE_HEADER)]
+        return response
+
+    def _cached_response(self, request: Any, headers: Any) -> Optional[HTTPResponse]:
+        """Serve a pre-encoded static response, or 304 if the client already has it"""
+        parts = self.server.encode_cached_response_parts(request)
+        if parts is None:
+            return None
+
+        head, tail, etag = parts
+        encoding = self._response_encoding(len(head) + len(tail), headers)
+        if encoding is not None:
+            # The compressed bytes differ from the identity ones, so only a weak ETag holds for both
+            etag = 'W/' + etag
+        cache_headers = [
+            ('ETag', etag),
+            ('Cache-Control', 'no-cache'),
+            ('Access-Control-Allow-Origin', '*'),
+            ('Access-Control-Expose-Headers', 'ETag')
+        ] + self._vary_headers()
+        if etag_matches(headers.get('If-None-Match'), etag):
+            return HTTPResponse(304, cache_headers)
+
+        if encoding is None:
+            body = head + tail
+            encoding_headers = []
+        else:
+            precompressed = self._precompressed.get(etag)
+            if precompressed is MISSING:
+                precompressed = PrecompressedTail(tail)
+                self._precompressed.set(etag, precompressed)
+            body = splice(encoding, head, precompressed, self.compress_level)
+            encoding_headers = [('Content-Encoding', encoding)]
+
+        return HTTPResponse(200, [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body)))
+        ] + encoding_headers + cache_headers, body)
+
+    def _rpc_response(self, response: Any, request_headers: Any = None) -> HTTPResponse:
+        if response is None:
+            # Notifications only: accepted, nothing to send back
+            return HTTPResponse(202, CORS_HEADERS + [('Content-Length', '0')])
+        return self._json_response(200, response, request_headers=request_headers)
+
+    def _json_response(self, status: int, payload: Any, cors: bool = True, request_headers: Any = None) -> HTTPResponse:
+        body = codec.dumps(payload)
+        headers = [('Content-Type', 'application/json')]
+        if request_headers is not None:
+            encoding = self._response_encoding(len(body), request_headers)
+            if encoding is not None:
+                body = compress(body, encoding, self.compress_level)
+                headers.append(('Content-Encoding', encoding))
+            headers += self._vary_headers()
+        headers.append(('Content-Length', str(len(body))))
+        if cors:
+            headers += CORS_HEADERS
+        return HTTPResponse(status, headers, body)
+
+    def _response_encoding(self, size: int, request_headers: Any) -> Optional[str]:
+        """Content-Encoding for a body of ``size`` bytes, or None to send it as is"""
+        if self.compress_min_size is None or size < self.compress_min_size:
+            return None
+        return negotiate(request_headers.get('Accept-Encoding'))
+
+    def _vary_headers(self) -> Headers:
+        return [] if self.compress_min_size is None else [('Vary', 'Accept-Encoding')]
+
+    def _accepts_event_stream(self, headers: Any) -> bool:
+        return 'text/event-stream' in (headers.get('Accept') or '')
+
+    def _event_stream_response(self, stream: Union[Iterator[bytes], AsyncIterator[bytes]]) -> HTTPResponse:
+        return HTTPResponse(200, [
+            ('Content-Type', 'text/event-stream'),
+            ('Cache-Control', 'no-cache'),
+            ('X-Accel-Buffering', 'no')
+        ] + CORS_HEADERS, stream=stream)
+
+    def _encode_events(self, messages: Iterator[Any]) -> Iterator[bytes]:
+        try:
+            for message in messages:
+                yield encode_event(message)
+        finally:
+            # Stops the tool if the transport gives up on the stream early
+            messages.close()
+
+    async def _encode_events_async(self, messages: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+        try:
+            async for message in messages:
+                yield encode_event(message)
+        finally:
+            await messages.aclose()
+
+
+class StreamInContext:
+    """A streamed body produced with ``context`` current at every step.
+
+    ``context`` is a ``Session`` or ``RequestProfile``. The body is produced
+    after the handler has returned, when what the handler made current is
+    gone; without this, streamed tools would run outside the request's
+    session and profile. ``finish`` runs once, when the body ends or is
+    closed, even if it was never iterated, so transports must close it.
+    ``trailer``, if given, produces one last chunk after a complete body.
+    """
+
+    def __init__(self, chunks: Iterator[bytes], context: Any, finish: Callable[[], None],
+                 trailer: Optional[Callable[[], bytes]] = None):
+        self._chunks = chunks
+        self._context = context
+        self._finish = finish
+        self._trailer = trailer
+        self._done = False
+
+    def __iter__(self) -> "StreamInContext":
+        return self
+
+    def __next__(self) -> bytes:
+        if self._done:
+            raise StopIteration
+        token = self._context.activate()
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            pass
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            self._context.deactivate(token)
+        self.close()
+        if self._trailer is None:
+            raise StopIteration
+        return self._trailer()
+
+    def close(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        try:
+            self._chunks.close()
+        finally:
+            self._finish()
+
+
+class AsyncStreamInContext:
+    """Async counterpart of ``StreamInContext``; transports must ``aclose`` it"""
+
+    def __init__(self, chunks: AsyncIterator[bytes], context: Any, finish: Callable[[], None],
+                 trailer: Optional[Callable[[], bytes]] = None):
+        self._chunks = chunks
+        self._context = context
+        self._finish = finish
+        self._trailer = trailer
+        self._done = False
+
+    def __aiter__(self) -> "AsyncStreamInContext":
+        return self
+
+    async def __anext__(self) -> bytes:
+        if self._done:
+            raise StopAsyncIteration
+        token = self._context.activate()
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            pass
+        except BaseException:
+            await self.aclose()
+            raise
+        finally:
+            self._context.deactivate(token)
+        await self.aclose()
+        if self._trailer is None:
+            raise StopAsyncIteration
+        return self._trailer()
+
+    async def aclose(self) -> None:
+        if self._done:
+            return
+        self._done = True
+        try:
+            await self._chunks.aclose()
+        finally:
+            self._finish()
+
+
+def encode_event(message: Any) -> bytes:
+    """Encode a JSON-RPC message as a Server-Sent Event"""
+    return b'event: message\ndata: ' + codec.dumps(message) + b'\n\n'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
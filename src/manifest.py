@@ -0,0 +1,95 @@
+"""Build the tool manifest used for lazy tool loading.
+
+The manifest records the metadata and import target of every tool and
+resource registered by ``mcp_server.TOOL_MODULES``, so that a cold start can
+fill the registry without importing any tool module.
+
+    python src/manifest.py          # rewrite src/tool_manifest.json
+    python src/manifest.py --check  # exit 1 if the manifest is out of date
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Any, Dict
+
+# The manifest must describe the code, so always import the tool modules
+os.environ["MCP_LAZY_TOOLS"] = "0"
+
+from mcp_server import MANIFEST_PATH, MCPServer, mcp, resolve_import_target
+
+
+def build_manifest(server: MCPServer) -> Dict[str, Any]:
+    """Describe every tool and resource of ``server`` in manifest form"""
+    tools = []
+    for tool in server.tools.values():
+        _check_importable(tool.target, tool.func, f"tool {tool.name}")
+        tools.append({
+            "name": tool.name,
+            "description": tool.description,
+            "inputSchema": tool.input_schema,
+            "target": tool.target,
+            "kind": tool.kind,
+            "execution": tool.execution,
+            "maxConcurrency": tool.max_concurrency,
+            "timeout": tool.timeout,
+            "cacheable": tool.cache is not None,
+            "cacheTtl": tool.cache.ttl if tool.cache is not None else None,
+            "cacheMaxEntries": tool.cache.max_entries if tool.cache is not None else 256
+        })
+
+    resources = []
+    for resource in server.resources.values():
+        _check_importable(resource.target, resource.func, f"resource {resource.uri}")
+        resources.append({
+            "uri": resource.uri,
+            "name": resource.name,
+            "description": resource.description,
+            "mimeType": resource.mime_type,
+            "target": resource.target
+        })
+
+    return {"tools": tools, "resources": resources}
+
+
+def _check_importable(target: str, func: Any, label: str) -> None:
+    try:
+        resolved = resolve_import_target(target)
+    except (ImportError, AttributeError):
+        resolved = None
+    if resolved is not func:
+        raise ValueError(f"The {label} is not importable as {target}; lazy loading needs module-level functions")
+
+
+def encode_manifest(manifest: Dict[str, Any]) -> str:
+    return json.dumps(manifest, indent=2, ensure_ascii=False) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write the tool manifest used for lazy tool loading")
+    parser.add_argument("--check", action="store_true", help="Only verify that the manifest is up to date")
+    parser.add_argument("--output", default=MANIFEST_PATH, help=f"Manifest path (default: {MANIFEST_PATH})")
+    args = parser.parse_args()
+
+    encoded = encode_manifest(build_manifest(mcp))
+
+    if args.check:
+        try:
+            with open(args.output, encoding="utf-8") as manifest_file:
+                current = manifest_file.read()
+        except FileNotFoundError:
+            current = None
+        if current != encoded:
+            print(f"{args.output} is out of date; run python src/manifest.py", file=sys.stderr)
+            sys.exit(1)
+        print(f"{args.output} is up to date")
+        return
+
+    with open(args.output, "w", encoding="utf-8") as manifest_file:
+        manifest_file.write(encoded)
+    print(f"Wrote {len(mcp.tools)} tools and {len(mcp.resources)} resources to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,170 +1,1246 @@
-# src/mcp_server.py
-import datetime
+import base64
+import binascii
+import hashlib
+import importlib
 import json
-from typing import Dict, Any, List
+import os
+import threading
+import time
+import types
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union, Callable, Tuple, Iterator, AsyncIterator
+
+import codec
+from cache import LRUCache, MISSING
+from metrics import Registry
+from profiling import current_profile
+from schema import compile_schema
+from search import ToolIndex
+from sessions import current_session
+
+# asyncio, concurrent.futures and inspect are imported where they are first
+# needed: together they are most of this module's import time, and a cold
+# start that only serves sync tools never touches them.
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Protocol versions this server speaks, newest first; a client asking for
+# another one is answered with the newest
+SUPPORTED_PROTOCOL_VERSIONS = ("2025-03-26", "2024-11-05")
+PROTOCOL_VERSION = SUPPORTED_PROTOCOL_VERSIONS[0]
+
+# First protocol version whose progress notifications carry a ``message``
+PROGRESS_MESSAGE_VERSION = "2025-03-26"
+
+# JSON-RPC server error returned when a tool misses its deadline
+TOOL_TIMEOUT_ERROR = -32001
+
+# Where a synchronous tool runs: on the dispatching thread, in the server's
+# thread pool, or in a worker process (the function must then be picklable)
+EXECUTION_CLASSES = ("inline", "thread", "process")
+
+# What a tool function is; recorded in the manifest for tools not imported yet
+FUNCTION_KINDS = ("function", "coroutine", "generator", "async_generator")
+
+# Marks the end of a generator advanced one step at a time from another thread
+_EXHAUSTED = object()
+
+# How often the async path retries for a free slot of a saturated tool
+_SLOT_POLL_INTERVAL = 0.005
+
+# Most results one tools/search request may ask for
+MAX_SEARCH_LIMIT = 100
+
+
+class ToolTimeoutError(Exception):
+    """A tool call did not get a concurrency slot or finish before its deadline"""
+
+
+class ToolError(Exception):
+    """A tool could not do what it was asked; answered as a result with ``isError`` set, never cached"""
+
+
+class InvalidCursorError(ValueError):
+    """A list request carried a cursor this server did not hand out"""
+
+
+def import_target(func: Callable[..., Any]) -> str:
+    """The "module:qualified.name" string under which ``func`` can be imported"""
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def resolve_import_target(target: str) -> Any:
+    """Import the object named by a "module:qualified.name" string"""
+    module_name, _, qualname = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for attribute in qualname.split("."):
+        obj = getattr(obj, attribute)
+    return obj
+
+
+def _function_kind(func: Callable[..., Any]) -> str:
+    import inspect
+
+    if inspect.isasyncgenfunction(func):
+        return "async_generator"
+    if inspect.iscoroutinefunction(func):
+        return "coroutine"
+    if inspect.isgeneratorfunction(func):
+        return "generator"
+    return "function"
+
+
+def _cache_key(arguments: Dict[str, Any]) -> bytes:
+    """Canonical hash of tool arguments: equal JSON objects give equal keys regardless of key order"""
+    encoded = json.dumps(arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).digest()
+
+
+def _invoke(func: Callable[..., Any], arguments: Dict[str, Any]) -> Any:
+    """Call a synchronous tool and return its complete result.
+
+    Module level so that it can be shipped to a process pool.
+    """
+    result = func(**arguments)
+    if isinstance(result, types.GeneratorType):
+        # Not streaming: collect the chunks into a single result
+        result = "".join(str(chunk) for chunk in result)
+    return result
+
+
+class Tool:
+    """A registered tool: the metadata advertised by tools/list plus the function that runs it.
+
+    ``func`` may be given as a "module:qualified.name" import target instead
+    of a function, together with its ``kind``; the module is then only
+    imported when the tool is first called.
+    """
+
+    def __init__(self, name: str, description: str, input_schema: Dict[str, Any], func: Union[Callable[..., Any], str],
+                 execution: str = "thread", max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+                 cacheable: bool = False, cache_ttl: Optional[float] = None, cache_max_entries: int = 256,
+                 kind: Optional[str] = None):
+        self.name = name
+        self.description = description
+        self.input_schema = input_schema
+        if isinstance(func, str):
+            if kind not in FUNCTION_KINDS:
+                raise ValueError(f"Lazily loaded tool {name} needs a function kind, got {kind!r}")
+            self.target = func
+            self._func: Optional[Callable[..., Any]] = None
+        else:
+            self.target = import_target(func)
+            self._func = func
+            kind = _function_kind(func)
+        self.kind = kind
+        # Generator tools produce their output in chunks that can be streamed
+        self.streaming = kind in ("generator", "async_generator")
+        self.is_async = kind in ("coroutine", "async_generator")
+
+        if execution not in EXECUTION_CLASSES:
+            raise ValueError(f"Unknown execution class for tool {name}: {execution}")
+        if execution == "process" and self.is_async:
+            raise ValueError(f"Async tool {name} cannot run in a process pool")
+        self.execution = execution
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+        if cacheable and self.streaming:
+            raise ValueError(f"Streaming tool {name} cannot be cacheable")
+        # Results of deterministic tools, keyed by a hash of the arguments
+        self.cache = LRUCache(cache_max_entries, cache_ttl) if cacheable else None
+        # Compiled once so tools/call only pays for the checks themselves
+        self.validate = compile_schema(input_schema)
+        # Built once at registration; tools/list only ever hands out this dict
+        self.definition = {
+            "name": name,
+            "description": description,
+            "inputSchema": input_schema
+        }
+
+    @property
+    def func(self) -> Callable[..., Any]:
+        """The tool function, imported on first use if the tool was registered lazily"""
+        if self._func is None:
+            self._func = resolve_import_target(self.target)
+        return self._func
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def bind(self, func: Callable[..., Any]) -> None:
+        """Attach the function of a lazily registered tool once its module is imported"""
+        self._func = func
+
+    def __repr__(self) -> str:
+        return f"Tool({self.name!r})"
+
+
+class Resource:
+    """A registered resource: the metadata advertised by resources/list plus its reader.
+
+    Like tools, ``func`` may be a "module:qualified.name" import target.
+    """
+
+    def __init__(self, uri: str, name: str, description: str, mime_type: str, func: Union[Callable[[], str], str]):
+        self.uri = uri
+        self.name = name
+        self.description = description
+        self.mime_type = mime_type
+        if isinstance(func, str):
+            self.target = func
+            self._func: Optional[Callable[[], str]] = None
+        else:
+            self.target = import_target(func)
+            self._func = func
+        self.definition = {
+            "uri": uri,
+            "name": name,
+            "description": description,
+            "mimeType": mime_type
+        }
+
+    @property
+    def func(self) -> Callable[[], str]:
+        """The reader function, imported on first use if the resource was registered lazily"""
+        if self._func is None:
+            self._func = resolve_import_target(self.target)
+        return self._func
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def bind(self, func: Callable[[], str]) -> None:
+        self._func = func
+
+    def __repr__(self) -> str:
+        return f"Resource({self.uri!r})"
+
+
+def encode_cursor(key: str) -> str:
+    """Opaque cursor pointing after the listing entry ``key``"""
+    return base64.urlsafe_b64encode(key.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Any) -> str:
+    """The listing key a cursor points after; raises InvalidCursorError"""
+    if not isinstance(cursor, str):
+        raise InvalidCursorError("cursor must be a string")
+    try:
+        return base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(f"invalid cursor: {cursor}")
+
+
+class Listing:
+    """Definitions of tools or resources in registration order, served in pages.
+
+    A cursor names the last entry of the previous page rather than an
+    offset. New registrations are appended and re-registering a name keeps
+    its place, so a cursor stays valid and skips or repeats nothing while
+    the registry grows.
+    """
+
+    def __init__(self, definitions: List[Dict[str, Any]], key: str, field: str):
+        self.definitions = definitions
+        self.key = key
+        self.field = field
+        self.positions = {definition[key]: index for index, definition in enumerate(definitions)}
+        # List results by (cursor, page size); a Listing is replaced, never changed
+        self._results: Dict[Tuple[Optional[str], Optional[int]], Dict[str, Any]] = {}
+
+    def result(self, cursor: Optional[str], page_size: Optional[int]) -> Dict[str, Any]:
+        """The list method result for the page after ``cursor``"""
+        result = self._results.get((cursor, page_size))
+        if result is None:
+            entries, next_cursor = self.page(cursor, page_size)
+            result = {self.field: entries}
+            if next_cursor is not None:
+                result["nextCursor"] = next_cursor
+            self._results[cursor, page_size] = result
+        return result
+
+    def page(self, cursor: Optional[str], page_size: Optional[int]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Entries after ``cursor`` (from the start if None) and the cursor of the next page"""
+        start = 0
+        if cursor is not None:
+            key = decode_cursor(cursor)
+            position = self.positions.get(key)
+            # Only the exact cursor handed out is accepted, so each entry has one
+            if position is None or encode_cursor(key) != cursor:
+                raise InvalidCursorError(f"invalid cursor: {cursor}")
+            start = position + 1
+
+        if page_size is None or start + page_size >= len(self.definitions):
+            return self.definitions[start:], None
+        page = self.definitions[start:start + page_size]
+        return page, encode_cursor(page[-1][self.key])
+
 
 class MCPServer:
-    """Simple MCP server implementation for Vercel deployment"""
-    
-    def __init__(self):
-        self.tools = {
-            "echo": {
-                "name": "echo",
-                "description": "Echo the provided message back to the user",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "message": {"type": "string", "description": "The message to echo back"}
-                    },
-                    "required": ["message"]
-                }
-            },
-            "get_time": {
-                "name": "get_time", 
-                "description": "Get the current server time",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {}
-                }
-            },
-            "add_numbers": {
-                "name": "add_numbers",
-                "description": "Add two numbers together", 
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "a": {"type": "integer", "description": "First number"},
-                        "b": {"type": "integer", "description": "Second number"}
-                    },
-                    "required": ["a", "b"]
-                }
-            },
-            "get_weather_info": {
-                "name": "get_weather_info",
-                "description": "Get weather information for a location (mock implementation)",
-                "inputSchema": {
-                    "type": "object", 
-                    "properties": {
-                        "location": {"type": "string", "description": "The location to get weather for"}
-                    },
-                    "required": ["location"]
-                }
+    """Simple MCP server implementation for Vercel deployment.
+
+    Tools and resources are added with the ``tool`` and ``resource``
+    decorators; JSON-RPC methods are looked up in a dispatch table that can
+    be extended with the ``method`` decorator.
+    """
+
+    def __init__(self, name: str = "Vercel MCP Server", version: str = "1.0.0", max_batch_workers: int = 8,
+                 max_tool_threads: int = 32, max_tool_processes: Optional[int] = None,
+                 page_size: Optional[int] = 100):
+        self.name = name
+        self.version = version
+        # Entries per tools/list and resources/list page; None lists everything at once
+        self.page_size = page_size
+        self.max_batch_workers = max_batch_workers
+        self.max_tool_threads = max_tool_threads
+        self.max_tool_processes = max_tool_processes
+        self._batch_executor: Optional["ThreadPoolExecutor"] = None
+        self._thread_executor: Optional["ThreadPoolExecutor"] = None
+        self._process_executor: Optional["ProcessPoolExecutor"] = None
+        self._executor_lock = threading.Lock()
+
+        self.tools: Dict[str, Tool] = {}
+        self.resources: Dict[str, Resource] = {}
+        # Search index over self.tools, updated on every registration
+        self.tool_index = ToolIndex()
+
+        # Request, error and tool call metrics, served by GET /metrics
+        self.metrics = Registry()
+        self._request_seconds = self.metrics.histogram(
+            "mcp_request_duration_seconds", "Time to answer a JSON-RPC request, by method", ["method"]
+        )
+        self._errors = self.metrics.counter(
+            "mcp_errors_total", "JSON-RPC error responses, by method and error code", ["method", "code"]
+        )
+        self._tool_seconds = self.metrics.histogram(
+            "mcp_tool_call_duration_seconds", "Time to run a tool, including result cache hits, by tool", ["tool"]
+        )
+        self._tools_in_flight = self.metrics.gauge(
+            "mcp_tool_calls_in_flight", "Tool calls currently running, by tool", ["tool"]
+        )
+
+        # Listing payloads, rebuilt lazily after the registry changes
+        self._tool_listing: Optional[Listing] = None
+        self._resource_listing: Optional[Listing] = None
+
+        # initialize results by negotiated protocol version
+        self._initialize_results = {
+            protocol_version: {
+                "protocolVersion": protocol_version,
+                "capabilities": {"tools": {}, "resources": {}},
+                "serverInfo": {"name": name, "version": version}
             }
+            for protocol_version in SUPPORTED_PROTOCOL_VERSIONS
         }
-        
-        self.resources = {
-            "config://server": {
-                "uri": "config://server",
-                "name": "Server Configuration",
-                "description": "Server configuration information",
-                "mimeType": "application/json"
-            }
+
+        # Methods whose result only changes when the registry does, built
+        # from a variant of the request: the cursor of list methods, the
+        # negotiated protocol version of initialize. Their encoded result
+        # (with the closing brace of the response) and ETag are cached in
+        # _static_cache under (method, variant); only cursors the listing
+        # handed out are cached, so each method has a bounded set of entries.
+        self._static_results: Dict[str, Callable[[Optional[str]], Dict[str, Any]]] = {
+            "initialize": self._initialize_results.__getitem__,
+            "tools/list": self._tools_list_result,
+            "resources/list": self._resources_list_result
         }
-    
-    def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """Handle MCP requests"""
+        self._paginated_methods = {"tools/list", "resources/list"}
+        self._static_cache: Dict[Tuple[str, Optional[str]], Tuple[bytes, str]] = {}
+
+        self._methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "initialize": self._handle_initialize,
+            "tools/list": self._handle_tools_list,
+            "tools/call": self._handle_tools_call,
+            "resources/list": self._handle_resources_list,
+            "resources/read": self._handle_resources_read,
+            "tools/search": self._handle_tools_search
+        }
+        # Overrides used by the async dispatch path
+        self._async_methods: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "tools/call": self._handle_tools_call_async
+        }
+
+    # Registration
+
+    def tool(self, name: Optional[str] = None, description: Optional[str] = None,
+             input_schema: Optional[Dict[str, Any]] = None, execution: str = "thread",
+             max_concurrency: Optional[int] = None, timeout: Optional[float] = None,
+             cacheable: bool = False, cache_ttl: Optional[float] = None,
+             cache_max_entries: int = 256) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator registering a function as a tool.
+
+        The function is called with the tool arguments as keyword arguments.
+        It may be a plain function, a coroutine function, or a (sync or
+        async) generator whose output is streamed. ``name`` defaults to the
+        function name and ``description`` to its docstring.
+
+        ``execution`` picks where a synchronous tool runs: ``"inline"`` on
+        the dispatching thread (only for trivial tools, no timeout can be
+        enforced), ``"thread"`` in the server's thread pool or
+        ``"process"`` in a process pool for CPU-bound work. At most
+        ``max_concurrency`` calls of the tool run at once; ``timeout``
+        bounds, in seconds, the wait for a slot plus the run itself.
+
+        Tools whose result depends only on their arguments can set
+        ``cacheable``: results are then memoized in an LRU of
+        ``cache_max_entries`` entries, each kept for ``cache_ttl`` seconds
+        (forever if None). Errors are never cached.
+        """
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            self.add_tool(
+                func,
+                name=name or func.__name__,
+                description=description or (func.__doc__ or "").strip(),
+                input_schema=input_schema or {"type": "object", "properties": {}},
+                execution=execution,
+                max_concurrency=max_concurrency,
+                timeout=timeout,
+                cacheable=cacheable,
+                cache_ttl=cache_ttl,
+                cache_max_entries=cache_max_entries
+            )
+            return func
+        return decorator
+
+    def add_tool(self, func: Union[Callable[..., Any], str], name: str, description: str, input_schema: Dict[str, Any],
+                 execution: str = "thread", max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None, cacheable: bool = False, cache_ttl: Optional[float] = None,
+                 cache_max_entries: int = 256, kind: Optional[str] = None) -> Tool:
+        """Register ``func`` as the tool ``name``, replacing any tool of that name.
+
+        ``func`` may be an import target string (see ``Tool``). When the
+        module of a lazily registered tool is imported and its decorator
+        runs, the function is bound to the existing registration, whose
+        manifest metadata is kept.
+        """
+        existing = self.tools.get(name)
+        if existing is not None and not existing.loaded and not isinstance(func, str) \
+                and existing.target == import_target(func):
+            existing.bind(func)
+            return existing
+
+        tool = Tool(name, description, input_schema, func, execution, max_concurrency, timeout,
+                    cacheable, cache_ttl, cache_max_entries, kind)
+        self.tools[name] = tool
+        self.tool_index.add(name, description, input_schema)
+        self._tool_listing = None
+        self._forget_static("tools/list")
+        return tool
+
+    def resource(self, uri: str, name: str, description: str = "",
+                 mime_type: str = "text/plain") -> Callable[[Callable[[], str]], Callable[[], str]]:
+        """Decorator registering a function returning the text of the resource ``uri``.
+
+        The function may also return a JSON-serializable value, which is
+        encoded as compact JSON text.
+        """
+        def decorator(func: Callable[[], str]) -> Callable[[], str]:
+            self.add_resource(func, uri=uri, name=name, description=description, mime_type=mime_type)
+            return func
+        return decorator
+
+    def add_resource(self, func: Union[Callable[[], str], str], uri: str, name: str, description: str = "",
+                     mime_type: str = "text/plain") -> Resource:
+        """Register ``func`` (a function or import target string) as the reader of the resource ``uri``"""
+        existing = self.resources.get(uri)
+        if existing is not None and not existing.loaded and not isinstance(func, str) \
+                and existing.target == import_target(func):
+            existing.bind(func)
+            return existing
+
+        resource = Resource(uri, name, description, mime_type, func)
+        self.resources[uri] = resource
+        self._resource_listing = None
+        self._forget_static("resources/list")
+        return resource
+
+    def _forget_static(self, method: str) -> None:
+        """Drop every cached page of ``method``"""
+        for key in [key for key in self._static_cache if key[0] == method]:
+            self._static_cache.pop(key, None)
+
+    def load_manifest(self, path: str) -> None:
+        """Register the tools and resources listed in a manifest without importing their modules.
+
+        The manifest is written by ``python src/manifest.py``; each module is
+        imported the first time one of its tools or resources is used.
+        """
+        with open(path, "rb") as manifest_file:
+            manifest = json.load(manifest_file)
+
+        for entry in manifest["tools"]:
+            self.add_tool(
+                entry["target"],
+                name=entry["name"],
+                description=entry["description"],
+                input_schema=entry["inputSchema"],
+                execution=entry["execution"],
+                max_concurrency=entry["maxConcurrency"],
+                timeout=entry["timeout"],
+                cacheable=entry["cacheable"],
+                cache_ttl=entry["cacheTtl"],
+                cache_max_entries=entry["cacheMaxEntries"],
+                kind=entry["kind"]
+            )
+        for entry in manifest["resources"]:
+            self.add_resource(
+                entry["target"],
+                uri=entry["uri"],
+                name=entry["name"],
+                description=entry["description"],
+                mime_type=entry["mimeType"]
+            )
+
+    def method(self, name: str) -> Callable[[Callable[[Dict[str, Any]], Any]], Callable[[Dict[str, Any]], Any]]:
+        """Decorator registering a handler for the JSON-RPC method ``name``.
+
+        The handler receives the request object and returns the full
+        response; it may be a coroutine function.
+        """
+        def decorator(func: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+            self._methods[name] = func
+            self._async_methods.pop(name, None)
+            return func
+        return decorator
+
+    # Dispatch
+
+    def handle_request(self, request: Union[Dict[str, Any], List[Any]]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Handle MCP requests, either a single JSON-RPC object or a batch array.
+
+        Returns None when there is nothing to send back, i.e. for a
+        notification or a batch made up only of notifications.
+        """
+        if isinstance(request, list):
+            return self._handle_batch(request)
+        return self._handle_message(request)
+
+    def encode_cached_response(self, request: Any) -> Optional[Tuple[bytes, str]]:
+        """Return the encoded response and ETag for a request with a static result.
+
+        ``initialize``, ``tools/list`` and ``resources/list`` results are
+        serialized once; only the request id is spliced in per call. The
+        ETag is a hash of the result alone, so it is stable across request
+        ids. Returns None for any other request, including notifications.
+        """
+        parts = self.encode_cached_response_parts(request)
+        if parts is None:
+            return None
+        head, tail, etag = parts
+        return head + tail, etag
+
+    def encode_cached_response_parts(self, request: Any) -> Optional[Tuple[bytes, bytes, str]]:
+        """Like ``encode_cached_response`` but returns ``(head, tail, etag)``.
+
+        The body is ``head + tail``: the head carries the request id and the
+        tail is the same object for every request until the registry changes,
+        so it can be used as a key for derived forms such as compressed bodies.
+        """
+        if not isinstance(request, dict) or "id" not in request:
+            return None
+
+        started = time.perf_counter()
+        method = request.get("method")
+        params = request.get("params")
+        if not isinstance(method, str):
+            return None
+        variant = None
+        if method == "initialize":
+            variant = self.negotiate_protocol_version(params)
+        elif method in self._paginated_methods and isinstance(params, dict):
+            variant = params.get("cursor")
+            if not isinstance(variant, (str, type(None))):
+                return None
+        cached = self._static_cache.get((method, variant))
+        if cached is None:
+            build_result = self._static_results.get(method)
+            if build_result is None:
+                return None
+            try:
+                result = build_result(variant)
+            except InvalidCursorError:
+                # Answered with an error by the regular dispatch path
+                return None
+            result_bytes = codec.dumps(result)
+            etag = '"' + hashlib.sha256(result_bytes).hexdigest()[:32] + '"'
+            cached = self._static_cache[method, variant] = (result_bytes + b"}", etag)
+
+        tail, etag = cached
+        head = b'{"jsonrpc":"2.0","id":' + codec.dumps(request["id"]) + b',"result":'
+        self._request_seconds.observe((method,), time.perf_counter() - started)
+        return head, tail, etag
+
+    def is_streaming_request(self, request: Any) -> bool:
+        """Tell whether ``request`` is a tools/call of a generator tool whose output can be streamed"""
+        if not isinstance(request, dict) or "id" not in request or request.get("method") != "tools/call":
+            return False
+        params = request.get("params")
+        if not isinstance(params, dict):
+            return False
+        # Any other name is left to the regular dispatch path to answer with an error
+        name = params.get("name")
+        if not isinstance(name, str):
+            return False
+        tool = self.tools.get(name)
+        # A process pool worker can only hand back the joined output
+        return tool is not None and tool.streaming and tool.execution != "process"
+
+    def stream_request(self, request: Any, protocol_version: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield the messages answering ``request`` as they are produced.
+
+        For a streaming tool call whose request carries a
+        ``_meta.progressToken``, each chunk the tool yields is sent as a
+        ``notifications/progress`` message as soon as it is produced,
+        followed by the regular response carrying the complete output. The
+        chunk text goes in ``message`` from protocol version 2025-03-26,
+        which is assumed when ``protocol_version`` is None. Any other
+        request yields its single response.
+        """
+        if not self.is_streaming_request(request):
+            response = self.handle_request(request)
+            if response is not None:
+                yield response
+            return
+
+        started = time.perf_counter()
+        tool, arguments, error = self._resolve_tool_call(request)
+        if error is not None:
+            self._record_request(request, error, started)
+            yield error
+            return
+
+        progress_token = self._progress_token(request)
+        with_message = (protocol_version or PROGRESS_MESSAGE_VERSION) >= PROGRESS_MESSAGE_VERSION
+        chunks = []
+        tool_started = self._tool_started(tool)
+        # The slot is held and the deadline checked for the whole stream
+        deadline = None if tool.timeout is None else time.monotonic() + tool.timeout
+        acquired = False
+        try:
+            self._acquire_slot(tool, deadline)
+            acquired = True
+            for chunk in self._iterate_chunks(tool, arguments):
+                self._check_deadline(tool, deadline)
+                text = str(chunk)
+                chunks.append(text)
+                if progress_token is not None:
+                    yield self._progress_notification(progress_token, len(chunks), text if with_message else None)
+            self._check_deadline(tool, deadline)
+            response = self._tool_result_response(request, "".join(chunks))
+        except ToolTimeoutError as e:
+            response = self._create_error_response(TOOL_TIMEOUT_ERROR, str(e), request["id"])
+        except ToolError as e:
+            response = self._tool_result_response(request, e, is_error=True)
+        except Exception as e:
+            response = self._create_error_response(-32603, f"Internal error: {str(e)}", request["id"])
+        finally:
+            if acquired and tool.slots is not None:
+                tool.slots.release()
+            self._tool_finished(tool, tool_started)
+
+        self._record_request(request, response, started)
+        yield response
+
+    async def handle_request_async(self, request: Union[Dict[str, Any], List[Any]]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Async counterpart of ``handle_request``.
+
+        Coroutine tools are awaited on the running loop and other tools are
+        run in the loop's default executor, so a slow tool never blocks
+        other in-flight requests. Calls in a batch run concurrently.
+        """
+        if isinstance(request, list):
+            return await self._handle_batch_async(request)
+        return await self._handle_message_async(request)
+
+    async def stream_request_async(self, request: Any, protocol_version: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async counterpart of ``stream_request``"""
+        if not self.is_streaming_request(request):
+            response = await self.handle_request_async(request)
+            if response is not None:
+                yield response
+            return
+
+        started = time.perf_counter()
+        tool, arguments, error = self._resolve_tool_call(request)
+        if error is not None:
+            self._record_request(request, error, started)
+            yield error
+            return
+
+        progress_token = self._progress_token(request)
+        with_message = (protocol_version or PROGRESS_MESSAGE_VERSION) >= PROGRESS_MESSAGE_VERSION
+        chunks = []
+        tool_started = self._tool_started(tool)
+        # The slot is held and the deadline checked for the whole stream
+        deadline = None if tool.timeout is None else time.monotonic() + tool.timeout
+        acquired = False
         try:
-            method = request.get("method")
-            
-            if method == "initialize":
-                return self._handle_initialize(request)
-            elif method == "tools/list":
-                return self._handle_tools_list(request)
-            elif method == "tools/call":
-                return self._handle_tools_call(request)
-            elif method == "resources/list":
-                return self._handle_resources_list(request)
-            elif method == "resources/read":
-                return self._handle_resources_read(request)
+            await self._acquire_slot_async(tool, deadline)
+            acquired = True
+            async for chunk in self._iterate_chunks_async(tool, arguments):
+                self._check_deadline(tool, deadline)
+                text = str(chunk)
+                chunks.append(text)
+                if progress_token is not None:
+                    yield self._progress_notification(progress_token, len(chunks), text if with_message else None)
+            self._check_deadline(tool, deadline)
+            response = self._tool_result_response(request, "".join(chunks))
+        except ToolTimeoutError as e:
+            response = self._create_error_response(TOOL_TIMEOUT_ERROR, str(e), request["id"])
+        except ToolError as e:
+            response = self._tool_result_response(request, e, is_error=True)
+        except Exception as e:
+            response = self._create_error_response(-32603, f"Internal error: {str(e)}", request["id"])
+        finally:
+            if acquired and tool.slots is not None:
+                tool.slots.release()
+            self._tool_finished(tool, tool_started)
+
+        self._record_request(request, response, started)
+        yield response
+
+    def _progress_token(self, request: Dict[str, Any]) -> Any:
+        """The client's progressToken for a request; None if it asked for no progress"""
+        meta = request["params"].get("_meta")
+        if isinstance(meta, dict):
+            return meta.get("progressToken")
+        return None
+
+    def _progress_notification(self, progress_token: Any, progress: int, text: Optional[str]) -> Dict[str, Any]:
+        params = {"progressToken": progress_token, "progress": progress}
+        if text is not None:
+            params["message"] = text
+        return {
+            "jsonrpc": "2.0",
+            "method": "notifications/progress",
+            "params": params
+        }
+
+    def _iterate_chunks(self, tool: Tool, arguments: Dict[str, Any]) -> Iterator[Any]:
+        """Iterate the output of a generator tool from synchronous code"""
+        chunks = tool.func(**arguments)
+        if tool.is_async:
+            import asyncio
+            loop = asyncio.new_event_loop()
+            try:
+                while True:
+                    try:
+                        yield loop.run_until_complete(chunks.__anext__())
+                    except StopAsyncIteration:
+                        return
+            finally:
+                loop.run_until_complete(chunks.aclose())
+                loop.close()
+
+        if tool.execution == "inline":
+            yield from chunks
+            return
+
+        # Thread tools are advanced one chunk at a time on the tool pool
+        executor = self._get_tool_executor(tool.execution)
+        step = self._chunk_step()
+        try:
+            while True:
+                chunk = executor.submit(step, chunks, _EXHAUSTED).result()
+                if chunk is _EXHAUSTED:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+
+    async def _iterate_chunks_async(self, tool: Tool, arguments: Dict[str, Any]) -> AsyncIterator[Any]:
+        """Iterate the output of a generator tool without blocking the event loop"""
+        import asyncio
+
+        if tool.is_async:
+            async for chunk in tool.func(**arguments):
+                yield chunk
+            return
+
+        chunks = tool.func(**arguments)
+        if tool.execution == "inline":
+            for chunk in chunks:
+                yield chunk
+            return
+
+        # Thread tools are advanced one chunk at a time on the tool pool
+        loop = asyncio.get_running_loop()
+        executor = self._get_tool_executor(tool.execution)
+        step = self._chunk_step()
+        try:
+            while True:
+                chunk = await loop.run_in_executor(executor, step, chunks, _EXHAUSTED)
+                if chunk is _EXHAUSTED:
+                    return
+                yield chunk
+        finally:
+            if not chunks.gi_running:
+                chunks.close()
+
+    def _chunk_step(self) -> Callable[..., Any]:
+        """``next``, carrying the request's profile and session into the worker thread"""
+        step = next
+        profile = current_profile()
+        if profile is not None:
+            # Worker threads neither see nor feed the request's profile on their own
+            step = profile.wrap(step)
+        session = current_session()
+        if session is not None:
+            step = session.wrap(step)
+        return step
+
+    def _handle_batch(self, batch: List[Any]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Run the calls of a JSON-RPC batch concurrently, keeping request order"""
+        if not batch:
+            return self._create_error_response(-32600, "Invalid Request: empty batch")
+
+        if len(batch) == 1:
+            responses = [self._handle_message(batch[0])]
+        else:
+            handle = self._handle_message
+            profile = current_profile()
+            if profile is not None:
+                # Batch threads neither see nor feed the request's profile on their own
+                handle = profile.wrap(handle)
+            session = current_session()
+            if session is not None:
+                handle = session.wrap(handle)
+            responses = list(self._get_batch_executor().map(handle, batch))
+
+        responses = [response for response in responses if response is not None]
+        return responses or None
+
+    def _get_batch_executor(self) -> "ThreadPoolExecutor":
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._batch_executor is None:
+            self._batch_executor = ThreadPoolExecutor(
+                max_workers=self.max_batch_workers, thread_name_prefix="mcp-batch"
+            )
+        return self._batch_executor
+
+    def _handle_message(self, request: Any) -> Optional[Dict[str, Any]]:
+        """Handle a single JSON-RPC message; notifications (no id) get no response"""
+        if not isinstance(request, dict):
+            return self._create_error_response(-32600, "Invalid Request")
+
+        response = self._dispatch(request)
+        if "id" not in request:
+            return None
+        return response
+
+    def _dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        method = request.get("method")
+        try:
+            handler = self._methods.get(method)
+            if handler is None:
+                response = self._create_error_response(-32601, f"Method not found: {method}", request.get("id"))
             else:
-                return self._create_error_response(-32601, f"Method not found: {method}")
-                
+                response = handler(request)
+                if isinstance(response, types.CoroutineType):
+                    import asyncio
+                    response = asyncio.run(response)
+
         except Exception as e:
-            return self._create_error_response(-32603, f"Internal error: {str(e)}")
-    
+            response = self._create_error_response(-32603, f"Internal error: {str(e)}", request.get("id"))
+
+        self._record_request(request, response, started)
+        return response
+
+    async def _handle_batch_async(self, batch: List[Any]) -> Optional[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        import asyncio
+
+        if not batch:
+            return self._create_error_response(-32600, "Invalid Request: empty batch")
+
+        responses = await asyncio.gather(*(self._handle_message_async(message) for message in batch))
+        responses = [response for response in responses if response is not None]
+        return responses or None
+
+    async def _handle_message_async(self, request: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(request, dict):
+            return self._create_error_response(-32600, "Invalid Request")
+
+        response = await self._dispatch_async(request)
+        if "id" not in request:
+            return None
+        return response
+
+    async def _dispatch_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        method = request.get("method")
+        try:
+            handler = self._async_methods.get(method) or self._methods.get(method)
+            if handler is None:
+                response = self._create_error_response(-32601, f"Method not found: {method}", request.get("id"))
+            else:
+                response = handler(request)
+                if isinstance(response, types.CoroutineType):
+                    response = await response
+
+        except Exception as e:
+            response = self._create_error_response(-32603, f"Internal error: {str(e)}", request.get("id"))
+
+        self._record_request(request, response, started)
+        return response
+
+    def _record_request(self, request: Dict[str, Any], response: Any, started: float) -> None:
+        """Record the latency of a request, and its error code if it got an error response"""
+        method = request.get("method")
+        # Unknown methods share one label so that clients cannot grow the label set
+        label = method if isinstance(method, str) and method in self._methods else "other"
+        self._request_seconds.observe((label,), time.perf_counter() - started)
+        # Notifications get no response, so nothing failed as far as the client can tell
+        error = response.get("error") if isinstance(response, dict) and "id" in request else None
+        if isinstance(error, dict):
+            self._errors.inc((label, str(error.get("code"))))
+
+    def negotiate_protocol_version(self, params: Any) -> str:
+        """The protocol version to answer ``initialize`` params with: the client's if supported, else the newest"""
+        requested = params.get("protocolVersion") if isinstance(params, dict) else None
+        return requested if requested in SUPPORTED_PROTOCOL_VERSIONS else PROTOCOL_VERSION
+
     def _handle_initialize(self, request: Dict[str, Any]) -> Dict[str, Any]:
         return {
             "jsonrpc": "2.0",
             "id": request.get("id"),
-            "result": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {"tools": {}, "resources": {}},
-                "serverInfo": {"name": "Vercel MCP Server", "version": "1.0.0"}
-            }
+            "result": self._initialize_results[self.negotiate_protocol_version(request.get("params"))]
         }
-    
+
     def _handle_tools_list(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return self._list_response(request, self._tools_list_result)
+
+    def _tools_list_result(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        listing = self._tool_listing
+        if listing is None:
+            listing = self._tool_listing = Listing([tool.definition for tool in self.tools.values()], "name", "tools")
+        return listing.result(cursor, self.page_size)
+
+    def _list_response(self, request: Dict[str, Any], build_result: Callable[[Optional[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        params = request.get("params")
+        try:
+            result = build_result(params.get("cursor") if isinstance(params, dict) else None)
+        except InvalidCursorError as e:
+            return self._create_error_response(-32602, f"Invalid params: {e}", request.get("id"))
         return {
-            "jsonrpc": "2.0", 
+            "jsonrpc": "2.0",
+            "id": request.get("id"),
+            "result": result
+        }
+
+    def _handle_tools_search(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Rank tools against ``params.query``; results are tool definitions with a score"""
+        params = request.get("params")
+        params = params if isinstance(params, dict) else {}
+        query = params.get("query")
+        limit = params.get("limit", 10)
+
+        if not isinstance(query, str) or not query.strip():
+            return self._create_error_response(-32602, "Invalid params: query must be a non-empty string",
+                                               request.get("id"))
+        if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_SEARCH_LIMIT:
+            return self._create_error_response(
+                -32602, f"Invalid params: limit must be an integer from 1 to {MAX_SEARCH_LIMIT}", request.get("id")
+            )
+
+        tools = [
+            dict(self.tools[name].definition, score=round(score, 4))
+            for name, score in self.tool_index.search(query, limit)
+        ]
+        return {
+            "jsonrpc": "2.0",
             "id": request.get("id"),
-            "result": {"tools": list(self.tools.values())}
+            "result": {"tools": tools}
         }
-    
+
     def _handle_tools_call(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        tool, arguments, error = self._resolve_tool_call(request)
+        if error is not None:
+            return error
+
+        try:
+            result = self._call_tool(tool, arguments)
+        except ToolTimeoutError as e:
+            return self._create_error_response(TOOL_TIMEOUT_ERROR, str(e), request.get("id"))
+        except ToolError as e:
+            return self._tool_result_response(request, e, is_error=True)
+        return self._tool_result_response(request, result)
+
+    async def _handle_tools_call_async(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        tool, arguments, error = self._resolve_tool_call(request)
+        if error is not None:
+            return error
+
+        try:
+            result = await self._call_tool_async(tool, arguments)
+        except ToolTimeoutError as e:
+            return self._create_error_response(TOOL_TIMEOUT_ERROR, str(e), request.get("id"))
+        except ToolError as e:
+            return self._tool_result_response(request, e, is_error=True)
+        return self._tool_result_response(request, result)
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Result cache counters of every cacheable tool, by tool name"""
+        return {name: tool.cache.stats() for name, tool in self.tools.items() if tool.cache is not None}
+
+    def _call_tool(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        """Run a tool from synchronous code, going through its result cache if it has one"""
+        started = self._tool_started(tool)
+        try:
+            if tool.cache is None:
+                return self._run_tool(tool, arguments)
+
+            key = _cache_key(arguments)
+            result = tool.cache.get(key)
+            if result is MISSING:
+                result = self._run_tool(tool, arguments)
+                tool.cache.set(key, result)
+            return result
+        finally:
+            self._tool_finished(tool, started)
+
+    async def _call_tool_async(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        """Async counterpart of ``_call_tool``"""
+        started = self._tool_started(tool)
+        try:
+            if tool.cache is None:
+                return await self._run_tool_async(tool, arguments)
+
+            key = _cache_key(arguments)
+            result = tool.cache.get(key)
+            if result is MISSING:
+                result = await self._run_tool_async(tool, arguments)
+                tool.cache.set(key, result)
+            return result
+        finally:
+            self._tool_finished(tool, started)
+
+    def _tool_started(self, tool: Tool) -> float:
+        self._tools_in_flight.inc((tool.name,))
+        return time.perf_counter()
+
+    def _tool_finished(self, tool: Tool, started: float) -> None:
+        self._tool_seconds.observe((tool.name,), time.perf_counter() - started)
+        self._tools_in_flight.dec((tool.name,))
+
+    def _run_tool(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        """Run a tool from synchronous code, honouring its concurrency limit and deadline"""
+        deadline = None if tool.timeout is None else time.monotonic() + tool.timeout
+        self._acquire_slot(tool, deadline)
+
+        submitted = False
+        try:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+
+            if tool.is_async:
+                import asyncio
+                try:
+                    return asyncio.run(asyncio.wait_for(self._await_tool(tool, arguments), remaining))
+                except asyncio.TimeoutError:
+                    raise ToolTimeoutError(f"Tool {tool.name} timed out after {tool.timeout}s") from None
+
+            if tool.execution == "inline":
+                return _invoke(tool.func, arguments)
+
+            from concurrent.futures import TimeoutError as FutureTimeoutError
+            future = self._submit_tool(tool, arguments)
+            submitted = True
+            try:
+                return future.result(timeout=remaining)
+            except FutureTimeoutError:
+                # The worker keeps running, and keeps its slot; its result is simply discarded
+                future.cancel()
+                raise ToolTimeoutError(f"Tool {tool.name} timed out after {tool.timeout}s") from None
+        finally:
+            if tool.slots is not None and not submitted:
+                tool.slots.release()
+
+    async def _run_tool_async(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        """Run a tool without blocking the event loop, honouring its concurrency limit and deadline"""
+        import asyncio
+
+        deadline = None if tool.timeout is None else time.monotonic() + tool.timeout
+        await self._acquire_slot_async(tool, deadline)
+
+        submitted = False
+        try:
+            if tool.is_async:
+                pending = self._await_tool(tool, arguments)
+            elif tool.execution == "inline":
+                return _invoke(tool.func, arguments)
+            else:
+                pending = asyncio.wrap_future(self._submit_tool(tool, arguments))
+                submitted = True
+
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                return await asyncio.wait_for(pending, remaining)
+            except asyncio.TimeoutError:
+                raise ToolTimeoutError(f"Tool {tool.name} timed out after {tool.timeout}s") from None
+        finally:
+            if tool.slots is not None and not submitted:
+                tool.slots.release()
+
+    def _acquire_slot(self, tool: Tool, deadline: Optional[float]) -> None:
+        """Take one of the tool's concurrency slots, if it has a limit, before ``deadline``"""
+        if tool.slots is None:
+            return
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if not tool.slots.acquire(timeout=remaining):
+            raise ToolTimeoutError(f"Tool {tool.name} timed out waiting for a free slot after {tool.timeout}s")
+
+    async def _acquire_slot_async(self, tool: Tool, deadline: Optional[float]) -> None:
+        """Async counterpart of ``_acquire_slot``, polling so the event loop is never blocked"""
+        import asyncio
+
+        if tool.slots is None:
+            return
+        while not tool.slots.acquire(blocking=False):
+            if deadline is not None and time.monotonic() >= deadline:
+                raise ToolTimeoutError(f"Tool {tool.name} timed out waiting for a free slot after {tool.timeout}s")
+            await asyncio.sleep(_SLOT_POLL_INTERVAL)
+
+    def _check_deadline(self, tool: Tool, deadline: Optional[float]) -> None:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise ToolTimeoutError(f"Tool {tool.name} timed out after {tool.timeout}s")
+
+    def _submit_tool(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        """Start a tool on its pool; a slot the call holds is released when the worker finishes.
+
+        A call that misses its deadline stops waiting, but its worker runs
+        on, so the slot must stay taken until then for ``max_concurrency``
+        to bound the tool's running copies.
+        """
+        future = self._get_tool_executor(tool.execution).submit(self._invoker(tool), tool.func, arguments)
+        if tool.slots is not None:
+            future.add_done_callback(lambda _: tool.slots.release())
+        return future
+
+    def _invoker(self, tool: Tool) -> Callable[..., Any]:
+        """``_invoke``, carrying the request's profile and session into the worker thread"""
+        if tool.execution == "process":
+            # Worker processes see neither this process's profile nor its sessions
+            return _invoke
+        invoke = _invoke
+        profile = current_profile()
+        if profile is not None:
+            invoke = profile.wrap(invoke)
+        session = current_session()
+        if session is not None:
+            invoke = session.wrap(invoke)
+        return invoke
+
+    async def _await_tool(self, tool: Tool, arguments: Dict[str, Any]) -> Any:
+        """Run a coroutine or async generator tool and return its complete result"""
+        if tool.streaming:
+            return "".join([str(chunk) async for chunk in tool.func(**arguments)])
+        return await tool.func(**arguments)
+
+    def _get_tool_executor(self, execution: str) -> "Executor":
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        with self._executor_lock:
+            if execution == "process":
+                if self._process_executor is None:
+                    self._process_executor = ProcessPoolExecutor(max_workers=self.max_tool_processes)
+                return self._process_executor
+
+            if self._thread_executor is None:
+                self._thread_executor = ThreadPoolExecutor(
+                    max_workers=self.max_tool_threads, thread_name_prefix="mcp-tool"
+                )
+            return self._thread_executor
+
+    def _resolve_tool_call(self, request: Dict[str, Any]) -> Tuple[Optional[Tool], Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Look up and validate a tools/call request; returns (tool, arguments, error response)"""
         params = request.get("params", {})
         tool_name = params.get("name")
         arguments = params.get("arguments", {})
-        
-        if tool_name == "echo":
-            message = arguments.get("message", "")
-            result = f"Tool echo: {message}"
-        elif tool_name == "get_time":
-            current_time = datetime.datetime.now().isoformat()
-            result = f"Current Vercel server time: {current_time}"
-        elif tool_name == "add_numbers":
-            a = arguments.get("a", 0)
-            b = arguments.get("b", 0)
-            result = a + b
-        elif tool_name == "get_weather_info":
-            location = arguments.get("location", "")
-            result = f"The weather in {location} is sunny and 72°F"
-        else:
-            return self._create_error_response(-32601, f"Tool not found: {tool_name}")
-        
-        return {
+
+        tool = self.tools.get(tool_name) if isinstance(tool_name, str) else None
+        if tool is None:
+            return None, arguments, self._create_error_response(-32601, f"Tool not found: {tool_name}", request.get("id"))
+
+        error = tool.validate(arguments)
+        if error is not None:
+            return None, arguments, self._create_error_response(-32602, f"Invalid params: {error}", request.get("id"))
+
+        return tool, arguments, None
+
+    def _tool_result_response(self, request: Dict[str, Any], result: Any, is_error: bool = False) -> Dict[str, Any]:
+        response = {
             "jsonrpc": "2.0",
             "id": request.get("id"),
             "result": {
                 "content": [{"type": "text", "text": str(result)}]
             }
         }
-    
+        if is_error:
+            response["result"]["isError"] = True
+        return response
+
     def _handle_resources_list(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "jsonrpc": "2.0",
-            "id": request.get("id"), 
-            "result": {"resources": list(self.resources.values())}
-        }
-    
+        return self._list_response(request, self._resources_list_result)
+
+    def _resources_list_result(self, cursor: Optional[str] = None) -> Dict[str, Any]:
+        listing = self._resource_listing
+        if listing is None:
+            listing = self._resource_listing = Listing(
+                [resource.definition for resource in self.resources.values()], "uri", "resources"
+            )
+        return listing.result(cursor, self.page_size)
+
     def _handle_resources_read(self, request: Dict[str, Any]) -> Dict[str, Any]:
         params = request.get("params", {})
         uri = params.get("uri")
-        
-        if uri == "config://server":
-            config = {
-                "version": "1.0.0",
-                "environment": "vercel", 
-                "features": ["tools", "resources"]
-            }
-            return {
-                "jsonrpc": "2.0",
-                "id": request.get("id"),
-                "result": {
-                    "contents": [{
-                        "uri": uri,
-                        "mimeType": "application/json",
-                        "text": json.dumps(config, indent=2)
-                    }]
-                }
+
+        resource = self.resources.get(uri)
+        if resource is None:
+            return self._create_error_response(-32601, f"Resource not found: {uri}", request.get("id"))
+
+        text = resource.func()
+        if not isinstance(text, str):
+            # Structured content is serialized once, compactly
+            text = codec.dumps(text).decode("utf-8")
+
+        return {
+            "jsonrpc": "2.0",
+            "id": request.get("id"),
+            "result": {
+                "contents": [{
+                    "uri": uri,
+                    "mimeType": resource.mime_type,
+                    "text": text
+                }]
             }
-        else:
-            return self._create_error_response(-32601, f"Resource not found: {uri}")
-    
-    def _create_error_response(self, code: int, message: str) -> Dict[str, Any]:
+        }
+
+    def _create_error_response(self, code: int, message: str, request_id: Any = None) -> Dict[str, Any]:
         return {
             "jsonrpc": "2.0",
+            "id": request_id,
             "error": {"code": code, "message": message}
         }
 
-# Create global instance
-mcp = MCPServer()
+# Modules whose import registers tools and resources on ``mcp``
+TOOL_MODULES = ["builtin_tools"]
+
+# Metadata of every tool and resource in TOOL_MODULES, written by
+# ``python src/manifest.py``. When it is present the registry is filled from
+# it and each tool module is only imported when first used, which keeps tool
+# imports off the cold-start path. Set MCP_LAZY_TOOLS=0 to import every tool
+# module at startup instead.
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_manifest.json")
+
+# Create global instance; MCP_PAGE_SIZE=0 lists everything in one page
+mcp = MCPServer(page_size=int(os.environ.get("MCP_PAGE_SIZE", "100")) or None)
+
+if os.environ.get("MCP_LAZY_TOOLS", "1") != "0" and os.path.exists(MANIFEST_PATH):
+    mcp.load_manifest(MANIFEST_PATH)
+else:
+    for _module_name in TOOL_MODULES:
+        importlib.import_module(_module_name)
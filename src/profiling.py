@@ -0,0 +1,266 @@
+"""Opt-in CPU and memory profiling of single requests.
+
+A ``Profiler`` decides which requests to profile: all of them, or those
+carrying its secret token in the ``X-MCP-Profile`` header. A profiled
+request runs inside a ``RequestProfile``, which records a cProfile profile
+of the dispatching thread and a tracemalloc snapshot. Tool calls handed to
+a thread pool are profiled in their worker thread too, through ``wrap``,
+where the Python version allows a second profiler.
+
+Nothing here runs unless a profiler is configured: the server only checks
+``current_profile()`` before handing work to another thread, and cProfile,
+pstats and tracemalloc are imported when the first profile starts.
+"""
+
+import contextvars
+import hmac
+import io
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Request header carrying the profiler token, and response header carrying the summary
+PROFILE_HEADER = 'X-MCP-Profile'
+
+_current: contextvars.ContextVar[Optional["RequestProfile"]] = contextvars.ContextVar("mcp_profile", default=None)
+
+# tracemalloc is process wide, so only one request is profiled at a time
+_profile_lock = threading.Lock()
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    """The profile of the request being handled in this context, if it is profiled"""
+    return _current.get()
+
+
+class RequestProfile:
+    """CPU profile and allocation snapshot of one request.
+
+    Created by ``Profiler.start``, which holds the process-wide profile lock
+    until ``disable``. Measuring runs from ``enable`` to ``disable``, which
+    for a streamed response is when the stream ends; in between, the
+    profile is current while ``activate`` is in effect. As a context
+    manager it does all of these around the block.
+    """
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_memory = 0
+        self._profiles: List[Any] = []
+        self._profiles_lock = threading.Lock()
+        self._profile = None
+        self._snapshot = None
+        self._enabled = False
+
+    def __enter__(self) -> "RequestProfile":
+        self.enable()
+        self._token = self.activate()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.deactivate(self._token)
+        self.disable()
+
+    def enable(self) -> None:
+        """Start measuring: tracemalloc, and cProfile on the calling thread"""
+        import tracemalloc
+
+        tracemalloc.start()
+        self._enabled = True
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        self._profile = self._start_profile()
+
+    def disable(self) -> None:
+        """Stop measuring and let the next request be profiled; does nothing if already stopped"""
+        import tracemalloc
+
+        if not self._enabled:
+            return
+        self._enabled = False
+        if self._profile is not None:
+            self._profile.disable()
+        self.wall_seconds = time.perf_counter() - self._started
+        self.cpu_seconds = time.process_time() - self._cpu_started
+        try:
+            self._snapshot = tracemalloc.take_snapshot()
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            _profile_lock.release()
+
+    def activate(self) -> contextvars.Token:
+        """Make this the current profile; pass the token to ``deactivate`` afterwards"""
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token: contextvars.Token) -> None:
+        _current.reset(token)
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Make ``func`` profile itself into this request when run on another thread"""
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            token = _current.set(self)
+            profile = self._start_profile()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+                _current.reset(token)
+        return profiled
+
+    def _start_profile(self) -> Optional[Any]:
+        """A cProfile profile enabled on the calling thread, or None if one cannot be enabled.
+
+        From Python 3.12 only one profiler can be active in a process, so a
+        worker thread cannot start its own while the request's is running;
+        its work then goes unprofiled rather than failing.
+        """
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        with self._profiles_lock:
+            self._profiles.append(profile)
+        return profile
+
+    def stats(self) -> Any:
+        """The CPU profiles of every thread that worked on the request, merged"""
+        import pstats
+
+        stats = pstats.Stats(stream=io.StringIO())
+        for profile in self._profiles:
+            stats.add(profile)
+        return stats
+
+    def summary(self) -> Dict[str, Any]:
+        """Times, peak traced memory, and the functions and lines that took the most time and memory"""
+        stats = self.stats()
+        # Own time rather than cumulative: the top of a cumulative list is just the dispatch call chain
+        stats.sort_stats("tottime")
+        functions = []
+        for func in stats.fcn_list[:self.top]:
+            _, calls, total_time, cumulative_time, _ = stats.stats[func]
+            functions.append({
+                "function": _function_label(func),
+                "calls": calls,
+                "totalMs": round(total_time * 1000, 3),
+                "cumulativeMs": round(cumulative_time * 1000, 3)
+            })
+
+        return {
+            "wallMs": round(self.wall_seconds * 1000, 3),
+            "cpuMs": round(self.cpu_seconds * 1000, 3),
+            "peakMemoryBytes": self.peak_memory,
+            "functions": functions,
+            "allocations": [
+                {"line": f"{os.path.basename(frame.filename)}:{frame.lineno}", "sizeBytes": stat.size, "count": stat.count}
+                for stat in self._allocation_statistics()[:self.top]
+                for frame in [stat.traceback[0]]
+            ]
+        }
+
+    def write(self, directory: str) -> str:
+        """Write ``<id>.prof`` (pstats format) and ``<id>.txt`` (readable report) to ``directory``.
+
+        Returns the id shared by both file names.
+        """
+        import uuid
+
+        profile_id = time.strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:8]
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, profile_id)
+
+        stats = self.stats()
+        stats.dump_stats(base + ".prof")
+
+        report = io.StringIO()
+        report.write(f"wall {self.wall_seconds * 1000:.3f} ms, cpu {self.cpu_seconds * 1000:.3f} ms, "
+                     f"peak traced memory {self.peak_memory} bytes\n\n")
+        stats.stream = report
+        stats.sort_stats("cumulative").print_stats(self.top * 5)
+        report.write("Allocations still held at the end of the request, by line:\n")
+        for stat in self._allocation_statistics()[:self.top * 5]:
+            report.write(f"{stat}\n")
+        with open(base + ".txt", "w", encoding="utf-8") as report_file:
+            report_file.write(report.getvalue())
+        return profile_id
+
+    def _allocation_statistics(self) -> List[Any]:
+        import tracemalloc
+
+        if self._snapshot is None:
+            return []
+        snapshot = self._snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        return snapshot.statistics("lineno")
+
+
+class Profiler:
+    """Which requests to profile, and where their profiles go.
+
+    With ``always`` every request is profiled; otherwise only requests whose
+    ``X-MCP-Profile`` header equals ``token``. Profiles are written to
+    ``directory`` when it is set; a summary is always returned.
+    """
+
+    def __init__(self, directory: Optional[str] = None, token: Optional[str] = None, always: bool = False,
+                 top: int = 10):
+        self.directory = directory
+        self.token = token
+        self.always = always
+        self.top = top
+
+    @classmethod
+    def from_env(cls) -> Optional["Profiler"]:
+        """Configure from MCP_PROFILE, MCP_PROFILE_TOKEN and MCP_PROFILE_DIR; None if profiling is off"""
+        always = os.environ.get("MCP_PROFILE", "0") == "1"
+        token = os.environ.get("MCP_PROFILE_TOKEN") or None
+        if not always and token is None:
+            return None
+        return cls(directory=os.environ.get("MCP_PROFILE_DIR") or None, token=token, always=always)
+
+    def wants(self, headers: Any) -> bool:
+        """Tell whether the request with these headers should be profiled"""
+        if self.always:
+            return True
+        supplied = headers.get(PROFILE_HEADER)
+        return supplied is not None and self.token is not None \
+            and hmac.compare_digest(supplied.encode("utf-8"), self.token.encode("utf-8"))
+
+    def start(self) -> Optional[RequestProfile]:
+        """A profile for the next request, or None while another request is being profiled.
+
+        Never waits, so that an event loop is not blocked behind a slow
+        profiled request.
+        """
+        if not _profile_lock.acquire(blocking=False):
+            return None
+        return RequestProfile(self.top)
+
+    def finish(self, profile: RequestProfile) -> Dict[str, Any]:
+        """Summarize a finished profile, writing it out first if a directory is configured"""
+        summary = profile.summary()
+        if self.directory is not None:
+            summary["id"] = profile.write(self.directory)
+        return summary
+
+
+def encode_summary(summary: Dict[str, Any]) -> str:
+    """A profile summary as compact ASCII JSON, for a response header"""
+    return json.dumps(summary, separators=(",", ":"))
+
+
+def _function_label(func: Any) -> str:
+    filename, lineno, name = func
+    if filename == "~":
+        # Built-in functions have no source location
+        return name
+    return f"{os.path.basename(filename)}:{lineno}({name})"
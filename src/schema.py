@@ -0,0 +1,269 @@
+"""Compile JSON Schema fragments into fast argument validators.
+
+Tool input schemas are compiled once, at registration, into a tree of
+closures so that validating a call is a handful of isinstance checks rather
+than a walk over the schema dict. Only the subset of JSON Schema used by MCP
+tool definitions is supported: ``type``, ``enum``, ``const``, ``properties``,
+``required``, ``additionalProperties``, ``items``, numeric ranges and string
+and array lengths/patterns. Unknown keywords (``description``, ``default``...)
+are ignored.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+# A compiled check takes the value and its path and returns an error message or None
+Check = Callable[[Any, str], Optional[str]]
+Validator = Callable[[Any], Optional[str]]
+
+
+def _is_integer(value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": _is_integer,
+    "number": _is_number,
+    "boolean": lambda value: isinstance(value, bool),
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "null": lambda value: value is None
+}
+
+_JSON_TYPE_NAMES = {
+    str: "string",
+    bool: "boolean",
+    int: "integer",
+    float: "number",
+    dict: "object",
+    list: "array",
+    type(None): "null"
+}
+
+
+def _type_name(value: Any) -> str:
+    return _JSON_TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+def compile_schema(schema: Dict[str, Any]) -> Validator:
+    """Compile ``schema`` into a function returning an error message, or None if the value is valid"""
+    check = _compile(schema)
+
+    def validate(value: Any) -> Optional[str]:
+        return check(value, "arguments")
+
+    return validate
+
+
+def _compile(schema: Dict[str, Any]) -> Check:
+    checks: List[Check] = []
+
+    if "type" in schema:
+        checks.append(_compile_type(schema["type"]))
+    if "enum" in schema:
+        checks.append(_compile_enum(schema["enum"]))
+    if "const" in schema:
+        checks.append(_compile_enum([schema["const"]]))
+
+    checks.extend(_compile_number(schema))
+    checks.extend(_compile_string(schema))
+    checks.extend(_compile_array(schema))
+    checks.extend(_compile_object(schema))
+
+    if not checks:
+        return lambda value, path: None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value: Any, path: str) -> Optional[str]:
+        for check in checks:
+            error = check(value, path)
+            if error is not None:
+                return error
+        return None
+
+    return check_all
+
+
+def _compile_type(expected: Any) -> Check:
+    names = [expected] if isinstance(expected, str) else list(expected)
+    unknown = [name for name in names if name not in _TYPE_CHECKS]
+    if unknown:
+        raise ValueError(f"Unsupported schema type: {', '.join(unknown)}")
+
+    type_checks = [_TYPE_CHECKS[name] for name in names]
+    label = " or ".join(names)
+
+    def check_type(value: Any, path: str) -> Optional[str]:
+        for type_check in type_checks:
+            if type_check(value):
+                return None
+        return f"{path}: expected {label}, got {_type_name(value)}"
+
+    return check_type
+
+
+def _compile_enum(allowed: List[Any]) -> Check:
+    def check_enum(value: Any, path: str) -> Optional[str]:
+        # Compare with types so that True does not match 1
+        for option in allowed:
+            if value == option and type(value) is type(option):
+                return None
+        return f"{path}: must be one of {allowed!r}"
+
+    return check_enum
+
+
+def _compile_number(schema: Dict[str, Any]) -> List[Check]:
+    bounds = []
+    if "minimum" in schema:
+        bounds.append((schema["minimum"], lambda value, limit: value >= limit, ">="))
+    if "maximum" in schema:
+        bounds.append((schema["maximum"], lambda value, limit: value <= limit, "<="))
+    if "exclusiveMinimum" in schema:
+        bounds.append((schema["exclusiveMinimum"], lambda value, limit: value > limit, ">"))
+    if "exclusiveMaximum" in schema:
+        bounds.append((schema["exclusiveMaximum"], lambda value, limit: value < limit, "<"))
+
+    checks: List[Check] = []
+    for limit, within, symbol in bounds:
+        def check_bound(value: Any, path: str, limit=limit, within=within, symbol=symbol) -> Optional[str]:
+            if _is_number(value) and not within(value, limit):
+                return f"{path}: must be {symbol} {limit}"
+            return None
+        checks.append(check_bound)
+
+    if "multipleOf" in schema:
+        factor = schema["multipleOf"]
+
+        def check_multiple(value: Any, path: str) -> Optional[str]:
+            if _is_number(value) and (value / factor) % 1 != 0:
+                return f"{path}: must be a multiple of {factor}"
+            return None
+        checks.append(check_multiple)
+
+    return checks
+
+
+def _compile_string(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    min_length = schema.get("minLength")
+    max_length = schema.get("maxLength")
+
+    if min_length is not None or max_length is not None:
+        def check_length(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, str):
+                return None
+            if min_length is not None and len(value) < min_length:
+                return f"{path}: must be at least {min_length} characters"
+            if max_length is not None and len(value) > max_length:
+                return f"{path}: must be at most {max_length} characters"
+            return None
+        checks.append(check_length)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value: Any, path: str) -> Optional[str]:
+            if isinstance(value, str) and pattern.search(value) is None:
+                return f"{path}: does not match pattern {pattern.pattern!r}"
+            return None
+        checks.append(check_pattern)
+
+    return checks
+
+
+def _compile_array(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    min_items = schema.get("minItems")
+    max_items = schema.get("maxItems")
+
+    if min_items is not None or max_items is not None:
+        def check_size(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, list):
+                return None
+            if min_items is not None and len(value) < min_items:
+                return f"{path}: must have at least {min_items} items"
+            if max_items is not None and len(value) > max_items:
+                return f"{path}: must have at most {max_items} items"
+            return None
+        checks.append(check_size)
+
+    if isinstance(schema.get("items"), dict):
+        check_item = _compile(schema["items"])
+
+        def check_items(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, list):
+                return None
+            for index, item in enumerate(value):
+                error = check_item(item, f"{path}[{index}]")
+                if error is not None:
+                    return error
+            return None
+        checks.append(check_items)
+
+    return checks
+
+
+def _compile_object(schema: Dict[str, Any]) -> List[Check]:
+    checks: List[Check] = []
+    required = list(schema.get("required", []))
+    properties = {
+        name: _compile(subschema)
+        for name, subschema in schema.get("properties", {}).items()
+    }
+    additional = schema.get("additionalProperties", True)
+
+    if required:
+        def check_required(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, dict):
+                return None
+            for name in required:
+                if name not in value:
+                    return f"{path}: missing required property '{name}'"
+            return None
+        checks.append(check_required)
+
+    if properties:
+        def check_properties(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, dict):
+                return None
+            for name, check_property in properties.items():
+                if name in value:
+                    error = check_property(value[name], f"{path}.{name}")
+                    if error is not None:
+                        return error
+            return None
+        checks.append(check_properties)
+
+    if additional is False:
+        def check_no_additional(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, dict):
+                return None
+            for name in value:
+                if name not in properties:
+                    return f"{path}: unexpected property '{name}'"
+            return None
+        checks.append(check_no_additional)
+    elif isinstance(additional, dict):
+        check_additional = _compile(additional)
+
+        def check_additional_properties(value: Any, path: str) -> Optional[str]:
+            if not isinstance(value, dict):
+                return None
+            for name, item in value.items():
+                if name not in properties:
+                    error = check_additional(item, f"{path}.{name}")
+                    if error is not None:
+                        return error
+            return None
+        checks.append(check_additional_properties)
+
+    return checks
@@ -0,0 +1,139 @@
+"""Ranked full-text search over the tool registry"""
+
+import bisect
+import heapq
+import math
+import re
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+
+# Each occurrence of a term counts this much towards the tool's term frequency
+FIELD_WEIGHTS = {"name": 3.0, "properties": 2.0, "description": 1.0}
+
+# Query words without an exact match also match indexed terms they start
+# with (at least this long), at this fraction of the weight
+PREFIX_MIN_LENGTH = 3
+PREFIX_WEIGHT = 0.5
+
+# BM25 parameters: term frequency saturation and length normalization
+_K1 = 1.2
+_B = 0.75
+
+_WORD = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """Lowercase words of ``text``, splitting snake_case, camelCase and digits"""
+    for word in _WORD.findall(text):
+        yield word.lower()
+
+
+def _schema_property_names(schema: Any) -> Iterator[str]:
+    """Property names of an inputSchema, including nested objects and array items"""
+    if not isinstance(schema, dict):
+        return
+    properties = schema.get("properties")
+    if isinstance(properties, dict):
+        for name, subschema in properties.items():
+            yield name
+            yield from _schema_property_names(subschema)
+    yield from _schema_property_names(schema.get("items"))
+
+
+class ToolIndex:
+    """Inverted index over tool names, descriptions and inputSchema property names.
+
+    ``add`` and ``remove`` update the postings of one tool, so the index
+    follows registrations incrementally; ``search`` ranks tools with BM25
+    over field-weighted term frequencies.
+    """
+
+    def __init__(self):
+        # term -> {tool name: weighted term frequency}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        # tool name -> {term: weighted term frequency}, to undo an add
+        self._documents: Dict[str, Dict[str, float]] = {}
+        self._lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        # Sorted terms, for prefix matching
+        self._vocabulary: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, name: str, description: str, input_schema: Dict[str, Any]) -> None:
+        """Index a tool, replacing an earlier entry of the same name"""
+        fields = {
+            "name": tokenize(name),
+            "properties": (term for prop in _schema_property_names(input_schema) for term in tokenize(prop)),
+            "description": tokenize(description)
+        }
+        frequencies: Dict[str, float] = {}
+        for field, terms in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in terms:
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+
+        with self._lock:
+            self._remove(name)
+            self._documents[name] = frequencies
+            length = sum(frequencies.values())
+            self._lengths[name] = length
+            self._total_length += length
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[name] = frequency
+
+    def remove(self, name: str) -> None:
+        with self._lock:
+            self._remove(name)
+
+    def _remove(self, name: str) -> None:
+        frequencies = self._documents.pop(name, None)
+        if frequencies is None:
+            return
+        self._total_length -= self._lengths.pop(name)
+        for term in frequencies:
+            postings = self._postings[term]
+            del postings[name]
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """The ``limit`` best matching tool names with their scores, best first"""
+        with self._lock:
+            count = len(self._documents)
+            if not count:
+                return []
+            average_length = self._total_length / count or 1.0
+
+            scores: Dict[str, float] = {}
+            for word in set(tokenize(query)):
+                for term, weight in self._matching_terms(word):
+                    postings = self._postings[term]
+                    idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for name, frequency in postings.items():
+                        norm = _K1 * (1 - _B + _B * self._lengths[name] / average_length)
+                        score = weight * idf * frequency * (_K1 + 1) / (frequency + norm)
+                        scores[name] = scores.get(name, 0.0) + score
+
+        # Ties are broken by name so results are deterministic
+        ranked = heapq.nsmallest(limit, ((-score, name) for name, score in scores.items()))
+        return [(name, -negative) for negative, name in ranked]
+
+    def _matching_terms(self, word: str) -> Iterator[Tuple[str, float]]:
+        if word in self._postings:
+            yield word, 1.0
+            return
+        if len(word) < PREFIX_MIN_LENGTH:
+            return
+        vocabulary = self._vocabulary
+        index = bisect.bisect_left(vocabulary, word)
+        while index < len(vocabulary) and vocabulary[index].startswith(word):
+            yield vocabulary[index], PREFIX_WEIGHT
+            index += 1
@@ -0,0 +1,276 @@
+"""MCP sessions identified by the ``Mcp-Session-Id`` header.
+
+An ``initialize`` request without a known session id starts a session; its
+id goes back in the response header and the client sends it with every
+later request. A client that reconnects with the id it already has skips
+the handshake work: the session, with its negotiated protocol version,
+client capabilities and per-client ``data``, is found instead of rebuilt.
+
+``SessionStore`` keeps recently used sessions in a bounded LRU and drops
+those idle for longer than ``idle_timeout``. With a ``SessionBackend``
+the sessions are also written through to storage that several server
+instances share, so a request may land on an instance other than the one
+that answered ``initialize``. ``SQLiteSessionBackend`` is such a backend.
+"""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from cache import LRUCache, MISSING
+
+# Request and response header carrying the session id
+SESSION_HEADER = 'Mcp-Session-Id'
+
+_current: contextvars.ContextVar[Optional["Session"]] = contextvars.ContextVar("mcp_session", default=None)
+
+
+def current_session() -> Optional["Session"]:
+    """The session of the request being handled in this context, if it has one"""
+    return _current.get()
+
+
+class Session:
+    """What the server knows about one client between its requests.
+
+    ``data`` holds whatever tools want to keep per client; it must be
+    JSON-serializable when a backend is used.
+    """
+
+    def __init__(self, session_id: str, protocol_version: Optional[str] = None,
+                 client_info: Optional[Dict[str, Any]] = None, client_capabilities: Optional[Dict[str, Any]] = None,
+                 data: Optional[Dict[str, Any]] = None, created_at: float = 0.0, last_seen: float = 0.0):
+        self.id = session_id
+        self.protocol_version = protocol_version
+        self.client_info = client_info or {}
+        self.client_capabilities = client_capabilities or {}
+        self.data = data if data is not None else {}
+        self.created_at = created_at
+        self.last_seen = last_seen
+        # When this copy was created or read from the backend
+        self.loaded_at = last_seen
+        # Encoded data and expiry as last written to the backend, to skip unchanged writes
+        self._saved_data: Optional[str] = None
+        self._saved_expiry = 0.0
+
+    def __repr__(self) -> str:
+        return f"Session({self.id!r})"
+
+    def activate(self) -> contextvars.Token:
+        """Make this the current session; pass the token to ``deactivate`` afterwards"""
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token: contextvars.Token) -> None:
+        _current.reset(token)
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        """Make ``func`` see this session as current when run on another thread"""
+        def in_session(*args: Any, **kwargs: Any) -> Any:
+            token = _current.set(self)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _current.reset(token)
+        return in_session
+
+    def to_record(self) -> Dict[str, Any]:
+        return {
+            "protocolVersion": self.protocol_version,
+            "clientInfo": self.client_info,
+            "capabilities": self.client_capabilities,
+            "data": self.data,
+            "createdAt": self.created_at
+        }
+
+    @classmethod
+    def from_record(cls, session_id: str, record: Dict[str, Any], last_seen: float) -> "Session":
+        return cls(session_id, record.get("protocolVersion"), record.get("clientInfo"), record.get("capabilities"),
+                   record.get("data"), record.get("createdAt", last_seen), last_seen)
+
+
+class SessionBackend:
+    """Session storage shared between server instances.
+
+    Records are JSON-serializable dicts; ``expires_at`` is a Unix time,
+    so every instance must agree on the clock.
+    """
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """The record of an unexpired session, or None"""
+        raise NotImplementedError
+
+    def save(self, session_id: str, record: Dict[str, Any], expires_at: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a SQLite database file, shared by the processes that can open it.
+
+    Expired rows are removed every ``prune_every`` saves. The database is
+    opened in WAL mode so that readers do not wait for a writer.
+    """
+
+    def __init__(self, path: str, prune_every: int = 1000):
+        import sqlite3
+
+        self.path = path
+        self.prune_every = prune_every
+        self._saves = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by all threads, serialized by _lock
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def load(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT record FROM sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def save(self, session_id: str, record: Dict[str, Any], expires_at: float) -> None:
+        encoded = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (id, record, expires_at) VALUES (?, ?, ?)",
+                (session_id, encoded, expires_at)
+            )
+            self._saves += 1
+            if self._saves % self.prune_every == 0:
+                self._db.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),))
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class SessionStore:
+    """Sessions by id: at most ``max_sessions`` in memory, each dropped after ``idle_timeout`` idle seconds.
+
+    A session missing from memory is looked up in ``backend``, if there
+    is one. Writes to the backend are skipped while a session's data is
+    unchanged and its stored expiry is at least ``idle_timeout / 2`` away,
+    so a busy session costs a write now and then rather than one per request.
+    The stored expiry can therefore lapse first; a copy in memory then stays
+    live until its own ``idle_timeout`` is up. A copy held in memory is
+    reloaded from the backend once it is ``sync_interval`` seconds old, which
+    picks up sessions ended and data changed on other instances; within that
+    window, concurrent changes to ``data`` from different instances are
+    last-write-wins.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 3600.0,
+                 backend: Optional[SessionBackend] = None, sync_interval: float = 5.0,
+                 clock: Callable[[], float] = time.time):
+        self.idle_timeout = idle_timeout
+        self.backend = backend
+        self.sync_interval = sync_interval
+        self._sessions = LRUCache(max_entries=max_sessions)
+        self._clock = clock
+
+    @classmethod
+    def from_env(cls) -> Optional["SessionStore"]:
+        """Configure from MCP_SESSIONS, MCP_SESSION_DB, MCP_SESSION_IDLE_TIMEOUT and MCP_MAX_SESSIONS.
+
+        Returns None, for stateless operation, unless MCP_SESSIONS=1 or a
+        database path is set.
+        """
+        path = os.environ.get("MCP_SESSION_DB") or None
+        if os.environ.get("MCP_SESSIONS", "0") != "1" and path is None:
+            return None
+        return cls(
+            max_sessions=int(os.environ.get("MCP_MAX_SESSIONS", "10000")),
+            idle_timeout=float(os.environ.get("MCP_SESSION_IDLE_TIMEOUT", "3600")),
+            backend=SQLiteSessionBackend(path) if path is not None else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, params: Any, protocol_version: Optional[str] = None) -> Session:
+        """Start a session for an ``initialize`` request with these params, answered with ``protocol_version``"""
+        import secrets
+
+        if not isinstance(params, dict):
+            params = {}
+        now = self._clock()
+        session = Session(secrets.token_urlsafe(24), protocol_version or params.get("protocolVersion"),
+                          params.get("clientInfo"), params.get("capabilities"), created_at=now, last_seen=now)
+        self._sessions.set(session.id, session)
+        self.save(session)
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """The live session with this id, marked as just used; None if unknown or expired"""
+        now = self._clock()
+        session = self._sessions.get(session_id)
+        if session is not MISSING and now - session.last_seen > self.idle_timeout:
+            self._sessions.pop(session_id)
+            # Another instance may have kept it alive in the backend
+            session = MISSING
+        if session is MISSING or (self.backend is not None and now - session.loaded_at >= self.sync_interval):
+            held = session
+            session = self._load(session_id, now)
+            if session is None and held is not MISSING and held._saved_expiry <= now:
+                # The stored expiry lapsed behind skipped writes, not because the
+                # session ended: this copy's last_seen is authoritative, and the
+                # next save writes the session back
+                session = held
+                session.loaded_at = now
+                session._saved_expiry = 0.0
+            if session is None:
+                self._sessions.pop(session_id)
+                return None
+            self._sessions.set(session_id, session)
+        session.last_seen = now
+        return session
+
+    def _load(self, session_id: str, now: float) -> Optional[Session]:
+        if self.backend is None:
+            return None
+        record = self.backend.load(session_id)
+        if record is None:
+            return None
+        session = Session.from_record(session_id, record, now)
+        session._saved_data = json.dumps(session.data, sort_keys=True)
+        session._saved_expiry = record.get("expiresAt", 0.0)
+        return session
+
+    def save(self, session: Session) -> None:
+        """Write a session through to the backend if its data changed or its stored expiry draws near"""
+        if self.backend is None:
+            return
+        data = json.dumps(session.data, sort_keys=True)
+        expires_at = session.last_seen + self.idle_timeout
+        if data == session._saved_data and session._saved_expiry - session.last_seen >= self.idle_timeout / 2:
+            return
+        record = session.to_record()
+        record["expiresAt"] = expires_at
+        self.backend.save(session.id, record, expires_at)
+        session._saved_data = data
+        session._saved_expiry = expires_at
+
+    def delete(self, session_id: str) -> bool:
+        """End a session; returns whether it existed"""
+        existed = self.get(session_id) is not None
+        self._sessions.pop(session_id)
+        if self.backend is not None:
+            self.backend.delete(session_id)
+        return existed
@@ -0,0 +1,378 @@
+"""Weather reports from a station dataset, for the ``get_weather_info`` tool.
+
+Stations and their latest observations are read from a CSV file once and
+put in a k-d tree over points on the unit sphere, so the station nearest
+to any coordinates is found in a few dozen comparisons, across the
+antimeridian and the poles alike. Place names are resolved with a small
+gazetteer read from a second CSV file. Both files default to the samples
+in ``src/data``; point MCP_WEATHER_STATIONS and MCP_WEATHER_PLACES at
+others. Reports are built from memory and kept in a TTL cache, so a
+lookup never waits on the network.
+"""
+
+import csv
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from cache import LRUCache, MISSING
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+STATIONS_PATH = os.path.join(DATA_DIR, "weather_stations.csv")
+PLACES_PATH = os.path.join(DATA_DIR, "places.csv")
+
+# Mean Earth radius in kilometres
+EARTH_RADIUS_KM = 6371.0088
+
+_COORDINATES = re.compile(r"\s*([+-]?\d+(?:\.\d*)?)\s*[,;\s]\s*([+-]?\d+(?:\.\d*)?)\s*")
+_NOT_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+_COMPASS = ("N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW")
+
+
+def to_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    """The unit vector pointing at a latitude and longitude given in degrees"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    return math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat)
+
+
+def chord_to_km(chord: float) -> float:
+    """Great-circle distance of two points on the Earth whose unit vectors are ``chord`` apart"""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+def normalize(text: str) -> str:
+    """Fold a place name for lookup: no accents, case or punctuation, single spaces"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _NOT_ALPHANUMERIC.sub(" ", stripped.casefold()).strip()
+
+
+class KDTree:
+    """Nearest-neighbour search over points on the sphere.
+
+    Points are stored as unit vectors, for which the straight-line (chord)
+    distance orders neighbours the same way as the great-circle distance.
+    The tree is implicit: each slice of the coordinate arrays holds its
+    median along the slice's axis in the middle, the points below it to the
+    left and those above it to the right, so no node objects are needed.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float]]):
+        items = [(to_vector(latitude, longitude), index) for index, (latitude, longitude) in enumerate(points)]
+        self._build(items, 0, len(items), 0)
+        self._axes = tuple(array("d", (vector[axis] for vector, _ in items)) for axis in range(3))
+        self._indexes = array("l", (index for _, index in items))
+
+    def __len__(self) -> int:
+        return len(self._indexes)
+
+    @staticmethod
+    def _build(items: List, low: int, high: int, axis: int) -> None:
+        # Iterative so that deep trees do not hit the recursion limit
+        pending = [(low, high, axis)]
+        while pending:
+            low, high, axis = pending.pop()
+            if high - low < 2:
+                continue
+            items[low:high] = sorted(items[low:high], key=lambda item: item[0][axis])
+            middle = (low + high) // 2
+            pending.append((low, middle, (axis + 1) % 3))
+            pending.append((middle + 1, high, (axis + 1) % 3))
+
+    def nearest(self, latitude: float, longitude: float) -> Tuple[int, float]:
+        """Index of the point nearest to the given coordinates, and its distance in km"""
+        if not self._indexes:
+            raise ValueError("No points to search")
+        query = to_vector(latitude, longitude)
+        qx, qy, qz = query
+        xs, ys, zs = self._axes
+        axes = self._axes
+        best = -1
+        best_squared = math.inf
+
+        # (low, high, axis, squared distance from the query to the slice's side of the split)
+        pending = [(0, len(self._indexes), 0, 0.0)]
+        while pending:
+            low, high, axis, bound = pending.pop()
+            if low >= high or bound >= best_squared:
+                continue
+            middle = (low + high) // 2
+            dx = qx - xs[middle]
+            dy = qy - ys[middle]
+            dz = qz - zs[middle]
+            squared = dx * dx + dy * dy + dz * dz
+            if squared < best_squared:
+                best = middle
+                best_squared = squared
+
+            offset = query[axis] - axes[axis][middle]
+            following = (axis + 1) % 3
+            # The far side is pushed first so that the near side is searched first
+            if offset < 0:
+                pending.append((middle + 1, high, following, offset * offset))
+                pending.append((low, middle, following, 0.0))
+            else:
+                pending.append((low, middle, following, offset * offset))
+                pending.append((middle + 1, high, following, 0.0))
+
+        return self._indexes[best], chord_to_km(math.sqrt(best_squared))
+
+
+class Station:
+    """A weather station and its latest observation"""
+
+    __slots__ = ("id", "name", "country", "latitude", "longitude", "elevation_m", "observed_at",
+                 "temperature_c", "humidity_pct", "wind_kph", "wind_deg", "conditions")
+
+    def __init__(self, row: Dict[str, str]):
+        self.id = row["station"].strip().upper()
+        self.name = row["name"]
+        self.country = row["country"]
+        self.latitude = float(row["latitude"])
+        self.longitude = float(row["longitude"])
+        self.elevation_m = float(row["elevation_m"] or 0)
+        self.observed_at = row["observed_at"]
+        self.temperature_c = float(row["temperature_c"])
+        self.humidity_pct = int(row["humidity_pct"])
+        self.wind_kph = float(row["wind_kph"])
+        self.wind_deg = int(row["wind_deg"])
+        self.conditions = row["conditions"]
+
+    def __repr__(self) -> str:
+        return f"Station({self.id!r})"
+
+
+class Place:
+    """A named place of the gazetteer"""
+
+    __slots__ = ("name", "label", "latitude", "longitude", "population", "qualifiers")
+
+    def __init__(self, row: Dict[str, str]):
+        self.name = row["name"]
+        # "Name, Region, Country", leaving out parts that repeat the name ("Singapore")
+        parts = [self.name]
+        for part in (row["admin_name"], row["country_name"]):
+            if part and normalize(part) not in {normalize(existing) for existing in parts}:
+                parts.append(part)
+        self.label = ", ".join(parts)
+        self.latitude = float(row["latitude"])
+        self.longitude = float(row["longitude"])
+        self.population = int(row["population"] or 0)
+        # What may follow the name to tell places of the same name apart, e.g. "Portland, ME"
+        self.qualifiers = frozenset(
+            normalize(value) for value in (row["admin_code"], row["admin_name"], row["country_code"], row["country_name"])
+            if value
+        )
+
+    def __repr__(self) -> str:
+        return f"Place({self.label!r})"
+
+
+class Gazetteer:
+    """Place names, aliases included, to places; the most populous wins between places of the same name"""
+
+    def __init__(self, places: Sequence[Place], aliases: Optional[Dict[int, List[str]]] = None):
+        self._by_name: Dict[str, List[Place]] = {}
+        for place in places:
+            self._add(place.name, place)
+        for place_index, names in (aliases or {}).items():
+            for name in names:
+                self._add(name, places[place_index])
+        for candidates in self._by_name.values():
+            candidates.sort(key=lambda place: -place.population)
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def _add(self, name: str, place: Place) -> None:
+        key = normalize(name)
+        if key:
+            candidates = self._by_name.setdefault(key, [])
+            if place not in candidates:
+                candidates.append(place)
+
+    def resolve(self, query: str) -> Optional[Place]:
+        """The place ``query`` names, as "Name", "Name, Region[, Country]" or "Name Region"; None if unknown"""
+        parts = [normalize(part) for part in query.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None
+        if len(parts) > 1:
+            return self._match(parts[0], parts[1:])
+
+        candidates = self._by_name.get(parts[0])
+        if candidates:
+            return candidates[0]
+        # "Portland Maine": the longest known leading name, the rest as a qualifier
+        words = parts[0].split(" ")
+        for split in range(len(words) - 1, 0, -1):
+            place = self._match(" ".join(words[:split]), [" ".join(words[split:])])
+            if place is not None:
+                return place
+        return None
+
+    def _match(self, name: str, qualifiers: List[str]) -> Optional[Place]:
+        for place in self._by_name.get(name, ()):
+            if all(qualifier in place.qualifiers for qualifier in qualifiers):
+                return place
+        return None
+
+
+def parse_coordinates(text: str) -> Optional[Tuple[float, float]]:
+    """Latitude and longitude from text like "48.85, 2.35"; None if it is not a coordinate pair"""
+    match = _COORDINATES.fullmatch(text)
+    if match is None:
+        return None
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError(f"Coordinates out of range: {text.strip()}")
+    return latitude, longitude
+
+
+def load_stations(path: str) -> List[Station]:
+    with open(path, newline="", encoding="utf-8") as f:
+        return [Station(row) for row in csv.DictReader(f)]
+
+
+def load_places(path: str) -> Gazetteer:
+    places: List[Place] = []
+    aliases: Dict[int, List[str]] = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            names = [name for name in (row.get("aliases") or "").split(";") if name.strip()]
+            if names:
+                aliases[len(places)] = names
+            places.append(Place(row))
+    return Gazetteer(places, aliases)
+
+
+def compass_point(degrees: float) -> str:
+    return _COMPASS[int((degrees % 360) / 22.5 + 0.5) % 16]
+
+
+class _Dataset:
+    """Stations, their index and the gazetteer, swapped as one on reload"""
+
+    def __init__(self, stations: List[Station], gazetteer: Gazetteer, signature: Tuple):
+        self.stations = stations
+        self.by_id = {station.id: station for station in stations}
+        self.tree = KDTree([(station.latitude, station.longitude) for station in stations])
+        self.gazetteer = gazetteer
+        self.signature = signature
+
+
+class WeatherService:
+    """Weather reports for place names, station ids and coordinates.
+
+    The data files are read on first use. Reports are cached for
+    ``report_ttl`` seconds, at most ``max_reports`` of them. With a
+    ``reload_interval`` the files' modification times are checked at most
+    that often, and changed files are read again, which also empties the
+    cache.
+    """
+
+    def __init__(self, stations_path: str = STATIONS_PATH, places_path: str = PLACES_PATH,
+                 report_ttl: float = 300.0, max_reports: int = 1024, reload_interval: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.stations_path = stations_path
+        self.places_path = places_path
+        self.reload_interval = reload_interval
+        self._reports = LRUCache(max_entries=max_reports, ttl=report_ttl, clock=clock)
+        self._clock = clock
+        self._dataset: Optional[_Dataset] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "WeatherService":
+        """Configure from MCP_WEATHER_STATIONS, MCP_WEATHER_PLACES, MCP_WEATHER_TTL and MCP_WEATHER_RELOAD"""
+        return cls(
+            stations_path=os.environ.get("MCP_WEATHER_STATIONS") or STATIONS_PATH,
+            places_path=os.environ.get("MCP_WEATHER_PLACES") or PLACES_PATH,
+            report_ttl=float(os.environ.get("MCP_WEATHER_TTL", "300")),
+            reload_interval=float(os.environ.get("MCP_WEATHER_RELOAD", "0")) or None
+        )
+
+    def _signature(self) -> Tuple:
+        return tuple(os.stat(path).st_mtime_ns for path in (self.stations_path, self.places_path))
+
+    def _data(self) -> _Dataset:
+        dataset = self._dataset
+        if dataset is not None and (
+            self.reload_interval is None or self._clock() - self._checked_at < self.reload_interval
+        ):
+            return dataset
+        with self._lock:
+            now = self._clock()
+            if self._dataset is None or (
+                self.reload_interval is not None and now - self._checked_at >= self.reload_interval
+            ):
+                self._checked_at = now
+                signature = self._signature()
+                if self._dataset is None or signature != self._dataset.signature:
+                    self._dataset = _Dataset(load_stations(self.stations_path), load_places(self.places_path), signature)
+                    self._reports.clear()
+            return self._dataset
+
+    def locate(self, location: str) -> Tuple[str, Station, float]:
+        """What ``location`` resolves to, its nearest station and the distance to it in km"""
+        dataset = self._data()
+        coordinates = parse_coordinates(location)
+        if coordinates is not None:
+            label = f"{coordinates[0]:.4g}, {coordinates[1]:.4g}"
+        else:
+            place = dataset.gazetteer.resolve(location)
+            if place is not None:
+                label = place.label
+                coordinates = (place.latitude, place.longitude)
+            else:
+                station = dataset.by_id.get(location.strip().upper())
+                if station is None:
+                    raise ValueError(f"Unknown location: {location.strip()!r}")
+                return station.name, station, 0.0
+
+        index, distance = dataset.tree.nearest(*coordinates)
+        return label, dataset.stations[index], distance
+
+    def report(self, location: str) -> str:
+        """A one-line report of the weather at ``location``; raises ValueError for an unknown location"""
+        # Checks the files for changes first, so a reload is not hidden behind cached reports
+        self._data()
+        key = " ".join(location.casefold().split())
+        text = self._reports.get(key)
+        if text is not MISSING:
+            return text
+
+        label, station, distance = self.locate(location)
+        fahrenheit = station.temperature_c * 9 / 5 + 32
+        text = (
+            f"Weather in {label}: {station.temperature_c:.1f}°C ({fahrenheit:.0f}°F), {station.conditions}, "
+            f"humidity {station.humidity_pct}%, wind {station.wind_kph:.0f} km/h from {compass_point(station.wind_deg)}. "
+            f"Observed {station.observed_at} at {station.id} ({station.name}), {distance:.0f} km away."
+        )
+        self._reports.set(key, text)
+        return text
+
+    def cache_stats(self) -> Dict[str, int]:
+        return self._reports.stats()
+
+
+_service: Optional[WeatherService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> WeatherService:
+    """The process-wide service, configured from the environment on first use"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = WeatherService.from_env()
+    return _service
@@ -0,0 +1,64 @@
+"""Rate limits and load shedding decided from the request headers"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from admission import API_KEY_HEADER, AdmissionControl, RateLimiter  # noqa: E402
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import MCPServer  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class AdmissionTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.admission = AdmissionControl(RateLimiter(rate=1, burst=2, clock=self.clock), api_keys=["alpha", "beta"])
+        self.app = MCPHTTPApp(MCPServer(), admission=self.admission)
+
+    def admit(self, key: str = None):
+        response = self.app.admit({API_KEY_HEADER: key} if key is not None else {})
+        if response is None:
+            self.app.release()
+        return response
+
+    def test_limited_key_gets_429_with_retry_after(self):
+        self.assertIsNone(self.admit("alpha"))
+        self.assertIsNone(self.admit("alpha"))
+        response = self.admit("alpha")
+        self.assertEqual(response.status, 429)
+        self.assertEqual(dict(response.headers)["Retry-After"], "1")
+        self.assertTrue(response.close)
+        self.assertEqual(json.loads(response.body), {"error": "Rate limit exceeded"})
+        # Other keys keep their own bucket, and the limited one refills
+        self.assertIsNone(self.admit("beta"))
+        self.clock.now = 1
+        self.assertIsNone(self.admit("alpha"))
+
+    def test_unknown_keys_share_one_bucket(self):
+        self.assertIsNone(self.admit())
+        self.assertIsNone(self.admit("made-up-1"))
+        for i in range(2, 50):
+            self.assertEqual(self.admit(f"made-up-{i}").status, 429)
+        self.assertEqual(len(self.admission.rate_limiter._buckets), 1)
+
+    def test_requests_past_the_in_flight_cap_get_503(self):
+        app = MCPHTTPApp(MCPServer(), admission=AdmissionControl(max_in_flight=1))
+        self.assertIsNone(app.admit({}))
+        self.assertEqual(app.admit({}).status, 503)
+        app.release()
+        self.assertIsNone(app.admit({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
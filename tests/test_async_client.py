@@ -0,0 +1,90 @@
+"""The asyncio client: its connection pool and how it reports tool results"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "client-app"))
+
+from async_mcp_client import AsyncMCPClient  # noqa: E402
+from fault_server import FaultInjector, start_fault_server  # noqa: E402
+
+
+class HangingServer:
+    """Answers echo calls over keep-alive HTTP/1.1, and never answers a message of "hang" """
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.serve, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}/"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                request = json.loads(await reader.readexactly(length))
+                message = request["params"]["arguments"]["message"]
+                if message == "hang":
+                    await asyncio.sleep(3600)
+                body = json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                                   "result": {"content": [{"type": "text", "text": message}]}}).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            writer.close()
+
+
+class PoolTimeoutTest(unittest.TestCase):
+    def run_client(self, calls, **options):
+        async def run():
+            server = HangingServer()
+            url = await server.start()
+            try:
+                async with AsyncMCPClient(url, timeout=0.2, **options) as client:
+                    return await asyncio.wait_for(calls(client), 5)
+            finally:
+                await server.stop()
+
+        return asyncio.run(run())
+
+    def test_timed_out_calls_free_their_connection(self):
+        async def calls(client):
+            timed_out = [await client.call_tool("echo", {"message": "hang"}) for _ in range(3)]
+            return timed_out, await client.call_tool("echo", {"message": "hi"})
+
+        timed_out, answer = self.run_client(calls, max_connections=1)
+        self.assertEqual(timed_out, [None, None, None])
+        self.assertEqual(answer, "hi")
+
+    def test_calls_waiting_for_a_stuck_pool_time_out(self):
+        async def calls(client):
+            return await asyncio.gather(*(client.call_tool("echo", {"message": "hang"}) for _ in range(4)))
+
+        self.assertEqual(self.run_client(calls, max_connections=1, pipeline_depth=2), [None] * 4)
+
+
+class ToolErrorTest(unittest.TestCase):
+    def test_tool_error_result_is_a_failed_call(self):
+        server, url = start_fault_server(FaultInjector())
+
+        async def calls():
+            async with AsyncMCPClient(url, timeout=5) as client:
+                return await asyncio.gather(client.call_tool("get_weather_info", {"location": "Atlantis"}),
+                                            client.call_tool("echo", {"message": "hi"}))
+
+        try:
+            self.assertEqual(asyncio.run(calls()), [None, "Tool echo: hi"])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
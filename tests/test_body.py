@@ -0,0 +1,117 @@
+"""Bounded reading and incremental decoding of request bodies"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from body import BODY_CHUNK_SIZE, NO_BODY, BodyError, decode_chunks, read_body, read_body_async  # noqa: E402
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import mcp  # noqa: E402
+
+CHUNKED = {"Transfer-Encoding": "chunked"}
+
+
+def chunked(*pieces: bytes, end: bytes = b"0\r\n\r\n") -> bytes:
+    return b"".join(b"%x\r\n%s\r\n" % (len(piece), piece) for piece in pieces) + end
+
+
+def read_all(data: bytes, headers: dict, max_size: int = None) -> bytes:
+    body = read_body(io.BytesIO(data), headers, max_size)
+    return body if isinstance(body, bytes) else b"".join(body)
+
+
+def read_all_async(data: bytes, headers: dict, max_size: int = None) -> bytes:
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        body = await read_body_async(reader, headers, max_size)
+        return body if isinstance(body, bytes) else b"".join([piece async for piece in body])
+
+    return asyncio.run(read())
+
+
+class ReadBodyTest(unittest.TestCase):
+    def assert_refused(self, status: int, data: bytes, headers: dict, max_size: int = None):
+        for read in (read_all, read_all_async):
+            with self.assertRaises(BodyError) as refused:
+                read(data, headers, max_size)
+            self.assertEqual(refused.exception.status, status)
+
+    def test_chunked_body_is_joined(self):
+        for read in (read_all, read_all_async):
+            self.assertEqual(read(chunked(b"ab", b"cde", end=b"0;ext=1\r\nX-Trailer: 1\r\n\r\n"), CHUNKED), b"abcde")
+
+    def test_content_length_over_the_limit_is_refused_unread(self):
+        rfile = io.BytesIO(b"x" * 200)
+        with self.assertRaises(BodyError) as refused:
+            read_body(rfile, {"Content-Length": "200"}, 100)
+        self.assertEqual(refused.exception.status, 413)
+        self.assertEqual(rfile.tell(), 0)
+
+    def test_chunked_body_over_the_limit_is_refused(self):
+        self.assert_refused(413, chunked(b"x" * 60, b"x" * 60), CHUNKED, 100)
+
+    def test_truncated_bodies_are_refused(self):
+        self.assert_refused(400, chunked(b"abc", end=b"")[:-4], CHUNKED)
+        self.assert_refused(400, chunked(b"abc", end=b""), CHUNKED)
+        self.assert_refused(400, b"x" * 10, {"Content-Length": str(BODY_CHUNK_SIZE + 1)})
+
+    def test_malformed_framing_is_refused(self):
+        self.assert_refused(400, b"zz\r\nabc\r\n0\r\n\r\n", CHUNKED)
+        self.assert_refused(400, b"3\r\nabcd\r\n0\r\n\r\n", CHUNKED)
+        self.assert_refused(400, b"{}", {"Content-Length": "-2"})
+        self.assert_refused(501, b"{}", {"Transfer-Encoding": "gzip"})
+
+
+class DecodeChunksTest(unittest.TestCase):
+    def test_batch_split_anywhere_decodes_like_the_whole(self):
+        batch = [{"jsonrpc": "2.0", "id": i, "method": "tools/call",
+                  "params": {"name": "echo", "arguments": {"message": "é" * i, "n": i + 0.5}}} for i in range(20)]
+        data = json.dumps(batch, ensure_ascii=False).encode()
+        for size in (1, 2, 3, 7, 64, len(data)):
+            pieces = [data[i:i + size] for i in range(0, len(data), size)]
+            self.assertEqual(decode_chunks(pieces), batch)
+
+    def test_single_message_and_empty_body(self):
+        self.assertEqual(decode_chunks([b' {"a"', b": 1} "]), {"a": 1})
+        self.assertIs(decode_chunks([]), NO_BODY)
+
+    def test_invalid_batches_are_errors(self):
+        for data in (b"[1, 2", b"[1 2]", b"[1] 2", b"[{]"):
+            with self.assertRaises(ValueError):
+                decode_chunks([data[:2], data[2:]])
+
+
+class BodyResponseTest(unittest.TestCase):
+    def setUp(self):
+        self.app = MCPHTTPApp(mcp, max_body_size=200)
+
+    def post_chunked(self, data: bytes):
+        return self.app.handle_post(CHUNKED, read_body(io.BytesIO(data), CHUNKED, self.app.max_body_size))
+
+    def test_oversized_chunked_body_gets_413(self):
+        response = self.post_chunked(chunked(b"[" + b" " * 250, b"]"))
+        self.assertEqual(response.status, 413)
+        self.assertTrue(response.close)
+
+    def test_truncated_chunked_body_gets_400(self):
+        response = self.post_chunked(chunked(b'[{"jsonrpc": "2.0"', end=b""))
+        self.assertEqual(response.status, 400)
+        self.assertTrue(response.close)
+
+    def test_chunked_batch_is_answered(self):
+        message = json.dumps([{"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                               "params": {"name": "echo", "arguments": {"message": "hi"}}}]).encode()
+        response = self.post_chunked(chunked(message[:40], message[40:]))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.body)[0]["result"]["content"][0]["text"], "Tool echo: hi")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+"""Tool results as the interactive client reports them"""
+
+import os
+import sys
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "client-app"))
+
+from fault_server import FaultInjector, start_fault_server  # noqa: E402
+
+try:
+    import mcp_client
+except ImportError:
+    # The client's own dependencies (client-app/requirements.txt) are not installed
+    mcp_client = None
+
+
+@unittest.skipIf(mcp_client is None, "client dependencies are not installed")
+class ToolErrorTest(unittest.TestCase):
+    def setUp(self):
+        self.server, url = start_fault_server(FaultInjector())
+        self.client = mcp_client.MCPClient(url, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_tool_error_result_is_a_failed_call(self):
+        self.assertIsNone(self.client.call_tool("get_weather_info", {"location": "Atlantis"}))
+        self.assertEqual(self.client.call_tool("echo", {"message": "hi"}), "Tool echo: hi")
+
+    def test_batch_reports_tool_error_results_as_errors(self):
+        results = self.client.call_tools_batch([
+            ("echo", {"message": "hi"}),
+            ("get_weather_info", {"location": "Atlantis"})
+        ])
+        self.assertEqual(results[0], {"name": "echo", "result": "Tool echo: hi"})
+        self.assertIn("Unknown location", results[1]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Accept-Encoding negotiation and gzip/deflate splicing of cached responses"""
+
+import gzip
+import json
+import os
+import sys
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from compression import PrecompressedTail, compress, negotiate, splice  # noqa: E402
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import MCPServer  # noqa: E402
+
+WBITS = {"gzip": 31, "deflate": zlib.MAX_WBITS}
+
+
+def noop() -> str:
+    return ""
+
+
+class NegotiateTest(unittest.TestCase):
+    def test_encodings(self):
+        cases = [
+            (None, None),
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("x-gzip", "gzip"),
+            ("deflate", "deflate"),
+            ("deflate, gzip", "gzip"),
+            ("gzip;q=0.5, deflate", "deflate"),
+            ("gzip;q=0, deflate;q=0", None),
+            ("gzip;q=nope", None),
+            ("*", "gzip"),
+            ("*, gzip;q=0", "deflate"),
+            ("BR, GZIP", "gzip"),
+        ]
+        for accept_encoding, encoding in cases:
+            self.assertEqual(negotiate(accept_encoding), encoding, accept_encoding)
+
+
+class SpliceTest(unittest.TestCase):
+    def test_spliced_bodies_decompress_to_head_and_tail(self):
+        tail = PrecompressedTail(b',"result":{"tools":[' + b'{"name":"noop"},' * 200 + b']}}')
+        for encoding in ("gzip", "deflate"):
+            for head in (b"", b'{"jsonrpc":"2.0","id":1', b'{"jsonrpc":"2.0","id":"' + b"x" * 5000 + b'"'):
+                body = splice(encoding, head, tail)
+                self.assertEqual(zlib.decompress(body, WBITS[encoding]), head + tail.data)
+
+    def test_spliced_gzip_is_a_standard_member(self):
+        tail = PrecompressedTail(b"tail" * 100)
+        self.assertEqual(gzip.decompress(splice("gzip", b"head", tail)), b"head" + b"tail" * 100)
+
+    def test_empty_tail(self):
+        tail = PrecompressedTail(b"")
+        for encoding in ("gzip", "deflate"):
+            self.assertEqual(zlib.decompress(splice(encoding, b"head", tail), WBITS[encoding]), b"head")
+
+    def test_compress_round_trips(self):
+        for encoding in ("gzip", "deflate"):
+            self.assertEqual(zlib.decompress(compress(b"data" * 100, encoding), WBITS[encoding]), b"data" * 100)
+
+
+class CompressedResponseTest(unittest.TestCase):
+    def setUp(self):
+        server = MCPServer()
+        for i in range(50):
+            server.add_tool(noop, f"tool{i}", "Does nothing at all", {"type": "object", "properties": {}})
+        self.app = MCPHTTPApp(server, compress_min_size=256)
+
+    def post(self, request_id, accept_encoding=None):
+        headers = {} if accept_encoding is None else {"Accept-Encoding": accept_encoding}
+        body = json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "tools/list"}).encode()
+        response = self.app.handle_post(headers, body)
+        self.assertEqual(response.status, 200)
+        return response, dict(response.headers)
+
+    def test_cached_responses_are_spliced_behind_each_id(self):
+        plain, plain_headers = self.post(1)
+        self.assertNotIn("Content-Encoding", plain_headers)
+
+        for request_id in (2, "abc", 3):
+            for encoding in ("gzip", "deflate"):
+                response, headers = self.post(request_id, encoding)
+                self.assertEqual(headers["Content-Encoding"], encoding)
+                self.assertEqual(headers["Vary"], "Accept-Encoding")
+                self.assertEqual(headers["Content-Length"], str(len(response.body)))
+                self.assertEqual(headers["ETag"], "W/" + plain_headers["ETag"])
+                decoded = json.loads(zlib.decompress(response.body, WBITS[encoding]))
+                self.assertEqual(decoded["id"], request_id)
+                self.assertEqual(decoded["result"], json.loads(plain.body)["result"])
+
+    def test_small_bodies_are_not_compressed(self):
+        app = MCPHTTPApp(MCPServer(), compress_min_size=256)
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}).encode()
+        response = app.handle_post({"Accept-Encoding": "gzip"}, body)
+        self.assertNotIn("Content-Encoding", dict(response.headers))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""JSON-RPC dispatch through the HTTP layer"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import MCPServer, mcp  # noqa: E402
+
+
+def nap(seconds: float) -> str:
+    time.sleep(seconds)
+    return "rested"
+
+
+def post(app: MCPHTTPApp, message: dict, headers: dict = None):
+    response = app.handle_post(headers or {}, json.dumps(message).encode())
+    body = response.body if isinstance(response.body, bytes) else b"".join(response.body)
+    return response.status, body
+
+
+class ToolNameTest(unittest.TestCase):
+    def setUp(self):
+        self.app = MCPHTTPApp(mcp)
+
+    def test_non_string_tool_names_are_not_found(self):
+        for name in (["echo"], {"name": "echo"}, 3, None):
+            for headers in ({}, {"Accept": "text/event-stream"}):
+                message = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name}}
+                status, body = post(self.app, message, headers)
+                self.assertEqual(status, 200)
+                self.assertEqual(json.loads(body)["error"]["code"], -32601)
+
+
+def echo(message: str, request_id=None) -> dict:
+    call = {"jsonrpc": "2.0", "method": "tools/call", "params": {"name": "echo", "arguments": {"message": message}}}
+    if request_id is not None:
+        call["id"] = request_id
+    return call
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.app = MCPHTTPApp(mcp)
+
+    def test_notifications_are_run_but_not_answered(self):
+        batch = [echo("a", 1), echo("note"), 7, echo("b", "two"),
+                 {"jsonrpc": "2.0", "method": "notifications/initialized"}]
+        status, body = post(self.app, batch)
+        self.assertEqual(status, 200)
+        responses = json.loads(body)
+        self.assertEqual([response.get("id") for response in responses], [1, None, "two"])
+        self.assertEqual(responses[0]["result"]["content"][0]["text"], "Tool echo: a")
+        self.assertEqual(responses[1]["error"]["code"], -32600)
+        self.assertEqual(responses[2]["result"]["content"][0]["text"], "Tool echo: b")
+
+    def test_batch_of_notifications_gets_202(self):
+        self.assertEqual(post(self.app, [echo("a"), echo("b")]), (202, b""))
+
+    def test_empty_batch_is_invalid(self):
+        status, body = post(self.app, [])
+        self.assertEqual(json.loads(body)["error"]["code"], -32600)
+
+    def test_calls_run_concurrently_in_both_paths(self):
+        server = MCPServer()
+        server.add_tool(nap, "nap", "Sleep", {"type": "object", "properties": {"seconds": {"type": "number"}}})
+        batch = [{"jsonrpc": "2.0", "id": i, "method": "tools/call",
+                  "params": {"name": "nap", "arguments": {"seconds": 0.2}}} for i in range(4)]
+
+        started = time.perf_counter()
+        responses = server.handle_request(batch)
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual([response["id"] for response in responses], [0, 1, 2, 3])
+
+        started = time.perf_counter()
+        responses = asyncio.run(server.handle_request_async(batch))
+        self.assertLess(time.perf_counter() - started, 0.6)
+        self.assertEqual([response["result"]["content"][0]["text"] for response in responses], ["rested"] * 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Prometheus metrics of requests, errors and tool calls"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import MCPServer  # noqa: E402
+from metrics import Registry  # noqa: E402
+
+
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+class RegistryTest(unittest.TestCase):
+    def test_render_follows_the_text_format(self):
+        registry = Registry()
+        registry.counter("hits_total", "Hits", ["path"]).inc(("/a\"b",), 2)
+        registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1)).observe((), 0.5)
+        self.assertEqual(registry.render().decode().splitlines(), [
+            "# HELP hits_total Hits",
+            "# TYPE hits_total counter",
+            'hits_total{path="/a\\"b"} 2',
+            "# HELP latency_seconds Latency",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{le="0.1"} 0',
+            'latency_seconds_bucket{le="1"} 1',
+            'latency_seconds_bucket{le="+Inf"} 1',
+            "latency_seconds_sum 0.5",
+            "latency_seconds_count 1",
+        ])
+
+    def test_same_name_returns_the_registered_metric(self):
+        registry = Registry()
+        self.assertIs(registry.gauge("up", "Up"), registry.gauge("up", "Up"))
+
+
+class ServerMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer()
+        self.server.add_tool(add, "add", "Add", {
+            "type": "object",
+            "properties": {"a": {"type": "integer"}, "b": {"type": "integer"}},
+            "required": ["a", "b"]
+        }, execution="inline")
+
+    def call(self, method: str, params: dict = None, request_id=1):
+        message = {"jsonrpc": "2.0", "method": method, "params": params or {}}
+        if request_id is not None:
+            message["id"] = request_id
+        return self.server.handle_request(message)
+
+    def test_requests_errors_and_tool_calls_are_counted(self):
+        self.call("tools/call", {"name": "add", "arguments": {"a": 1, "b": 2}})
+        self.call("tools/call", {"name": "add", "arguments": {"a": "x"}})
+        self.call("no/such/method")
+        self.call("no/such/method", request_id=None)
+
+        text = self.server.metrics.render().decode()
+        self.assertIn('mcp_request_duration_seconds_count{method="tools/call"} 2', text)
+        self.assertIn('mcp_errors_total{method="tools/call",code="-32602"} 1', text)
+        # Unknown methods share one label; the notification is timed but not an error
+        self.assertIn('mcp_request_duration_seconds_count{method="other"} 2', text)
+        self.assertIn('mcp_errors_total{method="other",code="-32601"} 1', text)
+        self.assertIn('mcp_tool_call_duration_seconds_count{tool="add"} 1', text)
+        self.assertIn('mcp_tool_calls_in_flight{tool="add"} 0', text)
+
+    def test_metrics_are_served_over_http(self):
+        response = MCPHTTPApp(self.server).handle_get("/api/metrics", {})
+        self.assertEqual(response.status, 200)
+        self.assertTrue(dict(response.headers)["Content-Type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn(b"# TYPE mcp_request_duration_seconds histogram", response.body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Cursor pagination of tools/list and resources/list"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import PROTOCOL_VERSION, MCPServer, encode_cursor  # noqa: E402
+
+NO_ARGUMENTS = {"type": "object", "properties": {}}
+
+
+def noop() -> str:
+    return ""
+
+
+def message(method: str, params: dict = None) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}).encode()
+
+
+class PaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer(page_size=2)
+        for i in range(5):
+            self.server.add_tool(noop, f"tool{i}", "Does nothing", NO_ARGUMENTS)
+        self.app = MCPHTTPApp(self.server)
+
+    def post(self, method: str, params: dict = None) -> dict:
+        response = self.app.handle_post({}, message(method, params))
+        self.assertEqual(response.status, 200)
+        return json.loads(response.body)
+
+    def test_cursors_walk_every_tool_once(self):
+        names, params = [], {}
+        while True:
+            result = self.post("tools/list", params)["result"]
+            names += [tool["name"] for tool in result["tools"]]
+            if "nextCursor" not in result:
+                break
+            params = {"cursor": result["nextCursor"]}
+        self.assertEqual(names, [f"tool{i}" for i in range(5)])
+
+    def test_unknown_cursors_are_invalid_params(self):
+        # The last one decodes to "tool0" but is not the cursor handed out for it
+        for cursor in ("bm9wZQ", "!!", 3, encode_cursor("tool0") + "="):
+            response = self.post("tools/list", {"cursor": cursor})
+            self.assertEqual(response["error"]["code"], -32602)
+        self.assertEqual(self.server._static_cache, {})
+
+    def test_cursors_of_methods_without_pages_share_one_cache_entry(self):
+        for i in range(50):
+            self.assertIn("result", self.post("initialize", {"cursor": f"c{i}"}))
+        self.assertEqual(list(self.server._static_cache), [("initialize", PROTOCOL_VERSION)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Per-request profiling through the HTTP layer"""
+
+import asyncio
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import MCPServer  # noqa: E402
+from profiling import PROFILE_HEADER, Profiler  # noqa: E402
+
+NO_ARGUMENTS = {"type": "object", "properties": {}}
+
+
+class SingleProfiler(cProfile.Profile):
+    """cProfile as it behaves from Python 3.12: one enabled profiler per process"""
+
+    active = 0
+    lock = threading.Lock()
+
+    def enable(self, *args, **kwargs):
+        with self.lock:
+            if SingleProfiler.active:
+                raise ValueError("Another profiling tool is already active")
+            SingleProfiler.active += 1
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        with self.lock:
+            SingleProfiler.active = max(0, SingleProfiler.active - 1)
+
+
+def count(n: int = 3):
+    for i in range(n):
+        time.sleep(0.02)
+        yield str(i)
+
+
+def slow_total(n: int = 3) -> int:
+    time.sleep(0.02)
+    return sum(range(n))
+
+
+def call(name: str) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                       "params": {"name": name, "arguments": {}}}).encode()
+
+
+def header(response, name: str) -> str:
+    return dict(response.headers).get(name)
+
+
+class ProfilingTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer()
+        self.server.add_tool(count, "count", "Count", NO_ARGUMENTS)
+        self.server.add_tool(slow_total, "slow_total", "Sum", NO_ARGUMENTS, execution="thread")
+        self.app = MCPHTTPApp(self.server, profiler=Profiler(always=True))
+
+    def assert_profiler_free(self):
+        response = self.app.handle_post({}, call("slow_total"))
+        self.assertNotEqual(header(response, PROFILE_HEADER), "busy")
+
+    def test_pooled_tool_runs_when_a_second_profiler_cannot_start(self):
+        with mock.patch.object(cProfile, "Profile", SingleProfiler):
+            response = self.app.handle_post({}, call("slow_total"))
+        self.assertEqual(json.loads(response.body)["result"]["content"][0]["text"], "3")
+        summary = json.loads(header(response, PROFILE_HEADER))
+        self.assertGreaterEqual(summary["wallMs"], 20)
+
+    def test_failing_summary_does_not_drop_the_response(self):
+        with mock.patch.object(Profiler, "finish", side_effect=TypeError("broken")):
+            response = self.app.handle_post({}, call("slow_total"))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(header(response, PROFILE_HEADER)), {"error": "broken"})
+        self.assert_profiler_free()
+
+    def test_streamed_response_is_profiled_until_its_end(self):
+        response = self.app.handle_post({"Accept": "text/event-stream"}, call("count"))
+        self.assertEqual(header(response, PROFILE_HEADER), "stream")
+        events = b"".join(response.stream).split(b"\n\n")
+        response.stream.close()
+        last = [event for event in events if event][-1]
+        self.assertTrue(last.startswith(b"event: profile\ndata: "))
+        summary = json.loads(last.split(b"data: ", 1)[1])
+        # The three 20 ms chunks are produced while the stream is read
+        self.assertGreaterEqual(summary["wallMs"], 60)
+        self.assert_profiler_free()
+
+    def test_unread_stream_frees_the_profiler_when_closed(self):
+        response = self.app.handle_post({"Accept": "text/event-stream"}, call("count"))
+        response.stream.close()
+        self.assert_profiler_free()
+
+    def test_async_streamed_response_is_profiled_until_its_end(self):
+        async def read():
+            response = await self.app.handle_post_async({"Accept": "text/event-stream"}, call("count"))
+            chunks = [chunk async for chunk in response.stream]
+            await response.stream.aclose()
+            return response, chunks
+
+        response, chunks = asyncio.run(read())
+        self.assertEqual(header(response, PROFILE_HEADER), "stream")
+        self.assertTrue(chunks[-1].startswith(b"event: profile\n"))
+        self.assertGreaterEqual(json.loads(chunks[-1].split(b"data: ", 1)[1])["wallMs"], 60)
+        self.assert_profiler_free()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Client retry, hedging and circuit-breaker policies, against the fault-injecting server"""
+
+import os
+import sys
+import time
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(REPO_ROOT, "client-app"))
+
+from resilience import IDEMPOTENT_METHODS, CircuitBreaker, HedgePolicy, LatencyTracker, RetryPolicy  # noqa: E402
+
+try:
+    import mcp_client
+    from fault_server import FaultInjector, start_fault_server
+except ImportError:
+    # The client's own dependencies (client-app/requirements.txt) are not installed
+    mcp_client = None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PolicyTest(unittest.TestCase):
+    def test_retry_delay_is_jittered_and_capped(self):
+        policy = RetryPolicy(max_attempts=5, base_delay=0.1, max_delay=0.3, seed=1)
+        for retry in range(5):
+            self.assertLessEqual(policy.delay(retry), min(0.3, 0.1 * 2 ** retry))
+        self.assertEqual(policy.delay(0, retry_after=0.2), 0.2)
+        self.assertIsNone(policy.delay(0, retry_after=5))
+
+    def test_hedge_delay_follows_the_latency_percentile(self):
+        policy = HedgePolicy(0.9, min_samples=10, initial_delay=0.05)
+        latencies = LatencyTracker()
+        self.assertEqual(policy.delay(latencies), 0.05)
+        for milliseconds in range(1, 101):
+            latencies.record(milliseconds / 1000)
+        self.assertAlmostEqual(policy.delay(latencies), 0.09, places=2)
+
+    def test_breaker_opens_then_lets_one_trial_through(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        for _ in range(2):
+            self.assertTrue(breaker.allow())
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_initialize_is_not_idempotent(self):
+        self.assertNotIn("initialize", IDEMPOTENT_METHODS)
+
+
+@unittest.skipIf(mcp_client is None, "client dependencies are not installed")
+class ClientPolicyTest(unittest.TestCase):
+    def setUp(self):
+        self.faults = FaultInjector(seed=1)
+        self.server, self.url = start_fault_server(self.faults)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def client(self, **policies) -> "mcp_client.MCPClient":
+        return mcp_client.MCPClient(self.url, timeout=5, **policies)
+
+    def test_idempotent_requests_are_retried_through_errors(self):
+        self.faults.error_rate = 0.5
+        self.faults.retry_after = None
+        client = self.client(retry=RetryPolicy(max_attempts=8, base_delay=0.001, seed=1))
+        replies = [client.send_request("tools/list") for _ in range(20)]
+        self.assertTrue(all("result" in reply for reply in replies))
+        self.assertGreater(client.retries, 0)
+
+    def test_other_requests_are_sent_once(self):
+        self.faults.error_rate = 1
+        client = self.client(retry=RetryPolicy(max_attempts=3, base_delay=0.001))
+        client.send_request("tools/call", {"name": "echo", "arguments": {"message": "hi"}})
+        client.send_request("initialize", mcp_client.INITIALIZE_PARAMS)
+        self.assertEqual(self.faults.counts["requests"], 2)
+        self.assertEqual(client.retries, 0)
+
+    def test_retry_after_beyond_the_cap_is_returned_at_once(self):
+        self.faults.error_rate = 1
+        self.faults.retry_after = 60
+        client = self.client(retry=RetryPolicy(max_attempts=3, max_delay=1))
+        self.assertIn("error", client.send_request("tools/list"))
+        self.assertEqual(self.faults.counts["requests"], 1)
+
+    def test_slow_first_request_is_hedged(self):
+        # Only the very first request after start is a cold start
+        self.faults.cold_start_ms = 1000
+        self.faults.idle_s = 3600
+        client = self.client(hedge=HedgePolicy(0.9, initial_delay=0.05))
+        started = time.perf_counter()
+        self.assertIn("result", client.send_request("tools/list"))
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(client.hedges, 1)
+
+    def test_open_breaker_fails_fast_until_the_server_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+        client = self.client(breaker=breaker)
+        self.faults.error_rate = 1
+        for _ in range(6):
+            self.assertIn("error", client.send_request("tools/list"))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.faults.counts["requests"], 3)
+
+        self.faults.error_rate = 0
+        time.sleep(0.25)
+        self.assertIn("result", client.send_request("tools/list"))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""Compiled input-schema validation of tools/call arguments"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from mcp_server import MCPServer  # noqa: E402
+from schema import compile_schema  # noqa: E402
+
+ORDER_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "item": {"type": "string", "minLength": 1, "pattern": "^[a-z]+$"},
+        "quantity": {"type": "integer", "minimum": 1, "maximum": 10},
+        "size": {"enum": ["small", "large"]},
+        "tags": {"type": "array", "maxItems": 2, "items": {"type": "string"}}
+    },
+    "required": ["item"],
+    "additionalProperties": False
+}
+
+
+def order(item: str, quantity: int = 1, size: str = "small", tags: list = None) -> str:
+    return f"{quantity} {size} {item}"
+
+
+class CompileSchemaTest(unittest.TestCase):
+    def setUp(self):
+        self.validate = compile_schema(ORDER_SCHEMA)
+
+    def test_valid_arguments_pass(self):
+        self.assertIsNone(self.validate({"item": "tea"}))
+        self.assertIsNone(self.validate({"item": "tea", "quantity": 2.0, "size": "large", "tags": ["hot"]}))
+
+    def test_errors_name_the_failing_path(self):
+        cases = [
+            ([], "arguments: expected object, got array"),
+            ({}, "arguments: missing required property 'item'"),
+            ({"item": "tea", "colour": "red"}, "arguments: unexpected property 'colour'"),
+            ({"item": ""}, "arguments.item: must be at least 1 characters"),
+            ({"item": "Tea"}, "arguments.item: does not match pattern '^[a-z]+$'"),
+            ({"item": "tea", "quantity": 0}, "arguments.quantity: must be >= 1"),
+            ({"item": "tea", "quantity": 11}, "arguments.quantity: must be <= 10"),
+            ({"item": "tea", "quantity": 1.5}, "arguments.quantity: expected integer, got number"),
+            ({"item": "tea", "size": "medium"}, "arguments.size: must be one of ['small', 'large']"),
+            ({"item": "tea", "tags": ["a", "b", "c"]}, "arguments.tags: must have at most 2 items"),
+            ({"item": "tea", "tags": ["a", 1]}, "arguments.tags[1]: expected string, got integer"),
+        ]
+        for arguments, error in cases:
+            self.assertEqual(self.validate(arguments), error)
+
+    def test_booleans_are_not_numbers(self):
+        self.assertEqual(self.validate({"item": "tea", "quantity": True}),
+                         "arguments.quantity: expected integer, got boolean")
+        self.assertIsNotNone(compile_schema({"enum": [1]})(True))
+
+    def test_unsupported_types_are_rejected_at_compile_time(self):
+        with self.assertRaises(ValueError):
+            compile_schema({"type": "decimal"})
+
+
+class ToolCallValidationTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer()
+        self.server.add_tool(order, "order", "Places an order", ORDER_SCHEMA)
+
+    def call(self, arguments) -> dict:
+        return self.server.handle_request({"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+                                           "params": {"name": "order", "arguments": arguments}})
+
+    def test_valid_call_runs_the_tool(self):
+        response = self.call({"item": "tea", "quantity": 3})
+        self.assertEqual(response["result"]["content"][0]["text"], "3 small tea")
+
+    def test_invalid_arguments_are_invalid_params(self):
+        response = self.call({"item": "tea", "quantity": "three"})
+        self.assertEqual(response["id"], 7)
+        self.assertEqual(response["error"]["code"], -32602)
+        self.assertIn("arguments.quantity: expected integer, got string", response["error"]["message"])
+
+    def test_unknown_tool_is_method_not_found(self):
+        response = self.server.handle_request({"jsonrpc": "2.0", "id": 8, "method": "tools/call",
+                                               "params": {"name": "missing", "arguments": {}}})
+        self.assertEqual(response["error"]["code"], -32601)
+
+
+if __name__ == "__main__":
+    unittest.main()
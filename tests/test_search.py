@@ -0,0 +1,88 @@
+"""Ranked tool search: the index and the tools/search method"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from mcp_server import MAX_SEARCH_LIMIT, MCPServer  # noqa: E402
+from search import ToolIndex, tokenize  # noqa: E402
+
+
+def noop() -> str:
+    return ""
+
+
+TOOLS = [
+    ("get_weather_info", "Current conditions at a weather station", {"location": {"type": "string"}}),
+    ("convert_currency", "Convert an amount between currencies", {"amount": {"type": "number"}}),
+    ("send_email", "Send a message to a recipient", {"recipient": {"type": "string"}}),
+]
+
+
+class ToolIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ToolIndex()
+        for name, description, properties in TOOLS:
+            self.index.add(name, description, {"type": "object", "properties": properties})
+
+    def names(self, query: str, limit: int = 10) -> list:
+        return [name for name, _ in self.index.search(query, limit)]
+
+    def test_tokenize_splits_identifiers(self):
+        self.assertEqual(list(tokenize("getWeatherInfo send_email HTTPServer v2")),
+                         ["get", "weather", "info", "send", "email", "http", "server", "v", "2"])
+
+    def test_matches_names_descriptions_and_properties(self):
+        self.assertEqual(self.names("weather")[0], "get_weather_info")
+        self.assertEqual(self.names("currencies"), ["convert_currency"])
+        self.assertEqual(self.names("recipient"), ["send_email"])
+
+    def test_prefixes_match_at_a_lower_weight(self):
+        self.assertEqual(self.names("curr"), ["convert_currency", "get_weather_info"])
+        self.assertEqual(self.names("currenc"), ["convert_currency"])
+        self.assertLess(self.index.search("currenc")[0][1], self.index.search("currency")[0][1])
+        self.assertEqual(self.names("cu"), [])
+
+    def test_limit_and_unmatched_queries(self):
+        self.assertEqual(len(self.names("a weather email amount", limit=2)), 2)
+        self.assertEqual(self.names("zebra"), [])
+        self.assertEqual(ToolIndex().search("weather"), [])
+
+    def test_re_adding_and_removing_update_the_postings(self):
+        self.index.add("send_email", "Deliver a letter", {})
+        self.assertEqual(self.names("recipient"), [])
+        self.assertEqual(self.names("letter"), ["send_email"])
+        self.index.remove("send_email")
+        self.assertEqual(self.names("letter email"), [])
+        self.assertEqual(len(self.index), 2)
+
+
+class ToolsSearchRequestTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer()
+        for name, description, properties in TOOLS:
+            self.server.add_tool(noop, name, description, {"type": "object", "properties": properties})
+
+    def search(self, params) -> dict:
+        return self.server.handle_request({"jsonrpc": "2.0", "id": 3, "method": "tools/search", "params": params})
+
+    def test_results_are_scored_tool_definitions(self):
+        tools = self.search({"query": "weather station", "limit": 1})["result"]["tools"]
+        self.assertEqual(len(tools), 1)
+        self.assertEqual(tools[0]["name"], "get_weather_info")
+        self.assertIn("inputSchema", tools[0])
+        self.assertGreater(tools[0]["score"], 0)
+
+    def test_invalid_queries_and_limits_are_invalid_params(self):
+        for params in ({}, {"query": ""}, {"query": "   "}, {"query": 3},
+                       {"query": "weather", "limit": 0}, {"query": "weather", "limit": MAX_SEARCH_LIMIT + 1},
+                       {"query": "weather", "limit": "5"}, {"query": "weather", "limit": True}, None):
+            response = self.search(params)
+            self.assertEqual(response["id"], 3)
+            self.assertEqual(response["error"]["code"], -32602, params)
+
+
+if __name__ == "__main__":
+    unittest.main()
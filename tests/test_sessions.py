@@ -0,0 +1,121 @@
+"""Sessions seen by tools through the HTTP layer"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from http_app import MCPHTTPApp  # noqa: E402
+from mcp_server import MCPServer  # noqa: E402
+from sessions import SESSION_HEADER, SQLiteSessionBackend, SessionStore, current_session  # noqa: E402
+
+NO_ARGUMENTS = {"type": "object", "properties": {}}
+STREAM = {"Accept": "text/event-stream"}
+
+
+def visits():
+    """Count this session's calls, one chunk per step"""
+    session = current_session()
+    yield "session " if session is not None else "no session "
+    session.data["visits"] = session.data.get("visits", 0) + 1
+    yield str(session.data["visits"])
+
+
+async def visits_async():
+    session = current_session()
+    yield "session " if session is not None else "no session "
+    session.data["visits"] = session.data.get("visits", 0) + 1
+    yield str(session.data["visits"])
+
+
+def message(method: str, params: dict = None) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}).encode()
+
+
+def final_text(chunks) -> str:
+    events = [event for event in b"".join(chunks).split(b"\n\n") if event]
+    return json.loads(events[-1].split(b"data: ", 1)[1])["result"]["content"][0]["text"]
+
+
+class StreamedSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = SQLiteSessionBackend(os.path.join(self.directory.name, "sessions.db"))
+        self.server = MCPServer()
+        self.server.add_tool(visits, "visits", "Visits", NO_ARGUMENTS)
+        self.server.add_tool(visits_async, "visits_async", "Visits", NO_ARGUMENTS)
+        self.app = MCPHTTPApp(self.server, sessions=SessionStore(backend=self.backend))
+        response = self.app.handle_post({}, message("initialize"))
+        self.session_id = dict(response.headers)[SESSION_HEADER]
+
+    def tearDown(self):
+        self.backend.close()
+        self.directory.cleanup()
+
+    def call(self, name: str) -> str:
+        headers = dict(STREAM, **{SESSION_HEADER: self.session_id})
+        response = self.app.handle_post(headers, message("tools/call", {"name": name}))
+        try:
+            return final_text(list(response.stream))
+        finally:
+            response.stream.close()
+
+    def call_async(self, name: str) -> str:
+        async def read():
+            headers = dict(STREAM, **{SESSION_HEADER: self.session_id})
+            response = await self.app.handle_post_async(headers, message("tools/call", {"name": name}))
+            try:
+                return final_text([chunk async for chunk in response.stream])
+            finally:
+                await response.stream.aclose()
+
+        return asyncio.run(read())
+
+    def test_streamed_tools_see_the_session(self):
+        self.assertEqual(self.call("visits"), "session 1")
+        self.assertEqual(self.call("visits_async"), "session 2")
+        self.assertEqual(self.call_async("visits"), "session 3")
+        self.assertEqual(self.call_async("visits_async"), "session 4")
+
+    def test_changes_made_while_streaming_are_saved(self):
+        self.call("visits")
+        self.call_async("visits")
+        self.assertEqual(self.backend.load(self.session_id)["data"], {"visits": 2})
+
+
+class BackendExpiryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = SQLiteSessionBackend(os.path.join(self.directory.name, "sessions.db"))
+        self.store = SessionStore(idle_timeout=1.0, backend=self.backend, sync_interval=0)
+
+    def tearDown(self):
+        self.backend.close()
+        self.directory.cleanup()
+
+    def test_session_in_use_outlives_its_stored_expiry(self):
+        session_id = self.store.create({}).id
+        time.sleep(0.4)
+        session = self.store.get(session_id)
+        # Skipped: the stored expiry is still half the idle timeout away
+        self.store.save(session)
+        time.sleep(0.7)
+        self.assertIsNone(self.backend.load(session_id))
+        session = self.store.get(session_id)
+        self.assertIsNotNone(session)
+        self.store.save(session)
+        self.assertIsNotNone(self.backend.load(session_id))
+
+    def test_session_ended_on_another_instance_is_gone(self):
+        session = self.store.create({})
+        self.backend.delete(session.id)
+        self.assertIsNone(self.store.get(session.id))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Streamed tool output and protocol version negotiation"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from http_app import PROTOCOL_VERSION_HEADER, MCPHTTPApp  # noqa: E402
+from mcp_server import PROTOCOL_VERSION, MCPServer  # noqa: E402
+from sessions import SESSION_HEADER, SessionStore  # noqa: E402
+
+STREAM = {"Accept": "text/event-stream"}
+
+
+def count(n: int = 3):
+    for i in range(n):
+        yield str(i)
+
+
+def message(method: str, params: dict) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": 7, "method": method, "params": params}).encode()
+
+
+def call(progress_token=None) -> bytes:
+    params = {"name": "count", "arguments": {}}
+    if progress_token is not None:
+        params["_meta"] = {"progressToken": progress_token}
+    return message("tools/call", params)
+
+
+def events(response) -> list:
+    try:
+        body = b"".join(response.stream)
+    finally:
+        response.stream.close()
+    return [json.loads(event.split(b"data: ", 1)[1]) for event in body.split(b"\n\n") if event]
+
+
+class StreamingTest(unittest.TestCase):
+    def setUp(self):
+        server = MCPServer()
+        server.add_tool(count, "count", "Count", {"type": "object", "properties": {}})
+        self.app = MCPHTTPApp(server, sessions=SessionStore())
+
+    def initialize(self, protocol_version: str) -> dict:
+        response = self.app.handle_post({}, message("initialize", {"protocolVersion": protocol_version}))
+        return {"session": dict(response.headers)[SESSION_HEADER], "result": json.loads(response.body)["result"]}
+
+    def test_progress_is_only_sent_for_a_progress_token(self):
+        sent = events(self.app.handle_post(STREAM, call()))
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(sent[0]["id"], 7)
+        self.assertEqual(sent[0]["result"]["content"][0]["text"], "012")
+
+    def test_progress_carries_the_chunk_from_2025_03_26(self):
+        sent = events(self.app.handle_post(STREAM, call("tok")))
+        self.assertEqual([event["params"] for event in sent[:-1]], [
+            {"progressToken": "tok", "progress": i + 1, "message": str(i)} for i in range(3)
+        ])
+
+    def test_no_message_for_clients_on_2024_11_05(self):
+        session = self.initialize("2024-11-05")["session"]
+        for headers in ({SESSION_HEADER: session}, {PROTOCOL_VERSION_HEADER: "2024-11-05"}):
+            sent = events(self.app.handle_post(dict(STREAM, **headers), call(1)))
+            self.assertEqual([event["params"] for event in sent[:-1]],
+                             [{"progressToken": 1, "progress": i + 1} for i in range(3)])
+
+    def test_initialize_negotiates_the_protocol_version(self):
+        self.assertEqual(self.initialize("2024-11-05")["result"]["protocolVersion"], "2024-11-05")
+        self.assertEqual(self.initialize("1999-01-01")["result"]["protocolVersion"], PROTOCOL_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()
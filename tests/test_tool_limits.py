@@ -0,0 +1,111 @@
+"""Concurrency limits and deadlines of pooled tools"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from mcp_server import TOOL_TIMEOUT_ERROR, MCPServer, ToolTimeoutError  # noqa: E402
+
+
+class SlowTool:
+    """A tool that sleeps, counting how many copies of it run at once"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.running = 0
+        self.most_running = 0
+        self._lock = threading.Lock()
+
+    def run(self) -> str:
+        with self._lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return "done"
+
+
+def ticks(n: int = 5):
+    for i in range(n):
+        time.sleep(0.1)
+        yield str(i)
+
+
+def call(name: str) -> dict:
+    return {"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": name, "arguments": {}, "_meta": {"progressToken": "p"}}}
+
+
+class MaxConcurrencyTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer()
+        self.slow = SlowTool(0.3)
+        self.server.add_tool(self.slow.run, "slow", "Sleep", {"type": "object", "properties": {}}, execution="thread",
+                             max_concurrency=1, timeout=0.1)
+        self.tool = self.server.tools["slow"]
+
+    def test_timed_out_calls_keep_their_slot_until_the_worker_finishes(self):
+        for _ in range(4):
+            with self.assertRaises(ToolTimeoutError):
+                self.server._run_tool(self.tool, {})
+        time.sleep(0.4)
+        self.assertEqual(self.slow.most_running, 1)
+
+    def test_timed_out_async_calls_keep_their_slot_until_the_worker_finishes(self):
+        async def call_repeatedly():
+            for _ in range(4):
+                with self.assertRaises(ToolTimeoutError):
+                    await self.server._run_tool_async(self.tool, {})
+
+        asyncio.run(call_repeatedly())
+        time.sleep(0.4)
+        self.assertEqual(self.slow.most_running, 1)
+
+    def test_slot_is_free_again_once_the_worker_finishes(self):
+        with self.assertRaises(ToolTimeoutError):
+            self.server._run_tool(self.tool, {})
+        time.sleep(0.4)
+        self.tool.timeout = 1.0
+        self.assertEqual(self.server._run_tool(self.tool, {}), "done")
+
+
+class StreamedLimitsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MCPServer()
+        self.server.add_tool(ticks, "ticks", "Tick", {"type": "object", "properties": {}},
+                             max_concurrency=1, timeout=0.25)
+
+    def test_streamed_call_ends_at_its_deadline(self):
+        started = time.monotonic()
+        messages = list(self.server.stream_request(call("ticks")))
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(messages[-1]["error"]["code"], TOOL_TIMEOUT_ERROR)
+        self.assertLessEqual(len(messages) - 1, 2)
+
+    def test_async_streamed_call_ends_at_its_deadline(self):
+        async def read():
+            return [message async for message in self.server.stream_request_async(call("ticks"))]
+
+        self.assertEqual(asyncio.run(read())[-1]["error"]["code"], TOOL_TIMEOUT_ERROR)
+
+    def test_stream_holds_its_slot_until_it_ends(self):
+        stream = self.server.stream_request(call("ticks"))
+        next(stream)
+        try:
+            second = list(self.server.stream_request(call("ticks")))
+        finally:
+            stream.close()
+        self.assertEqual(second, [second[-1]])
+        self.assertIn("free slot", second[-1]["error"]["message"])
+        # Closing the first stream gave the slot back
+        self.assertTrue(self.server.tools["ticks"].slots.acquire(blocking=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
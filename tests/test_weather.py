@@ -0,0 +1,155 @@
+"""The weather service and the get_weather_info tool"""
+
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import weather  # noqa: E402
+from mcp_server import mcp  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def call_weather(location: str) -> dict:
+    return mcp.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                               "params": {"name": "get_weather_info", "arguments": {"location": location}}})
+
+
+def great_circle_km(a: tuple, b: tuple) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * weather.EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+class KDTreeTest(unittest.TestCase):
+    def assert_nearest(self, points: list, query: tuple) -> None:
+        index, km = weather.KDTree(points).nearest(*query)
+        distances = [great_circle_km(query, point) for point in points]
+        self.assertAlmostEqual(km, min(distances), places=6)
+        self.assertAlmostEqual(distances[index], min(distances), places=6)
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        points = [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(500)]
+        for _ in range(200):
+            self.assert_nearest(points, (rng.uniform(-90, 90), rng.uniform(-180, 180)))
+
+    def test_antimeridian_and_poles(self):
+        points = [(0.0, 179.5), (0.0, -170.0), (0.0, 150.0), (89.0, 0.0), (-89.5, 90.0), (45.0, -179.9)]
+        self.assertEqual(weather.KDTree(points).nearest(0.0, -179.9)[0], 0)
+        self.assertEqual(weather.KDTree(points).nearest(45.0, 179.95)[0], 5)
+        self.assertEqual(weather.KDTree(points).nearest(90.0, -120.0)[0], 3)
+        self.assertEqual(weather.KDTree(points).nearest(-90.0, 0.0)[0], 4)
+        for query in ((0.0, -179.9), (45.0, 179.95), (90.0, -120.0), (-90.0, 0.0), (10.0, 180.0)):
+            self.assert_nearest(points, query)
+
+    def test_exact_hit_and_small_trees(self):
+        self.assertEqual(weather.KDTree([(37.6, -122.4)]).nearest(37.6, -122.4), (0, 0.0))
+        self.assertEqual(weather.KDTree([(1.0, 1.0), (1.0, 1.0)]).nearest(1.0, 1.0)[1], 0.0)
+        with self.assertRaises(ValueError):
+            weather.KDTree([]).nearest(0.0, 0.0)
+
+    def test_parse_coordinates(self):
+        self.assertEqual(weather.parse_coordinates(" 48.85, 2.35 "), (48.85, 2.35))
+        self.assertEqual(weather.parse_coordinates("-33.9 151.2"), (-33.9, 151.2))
+        self.assertIsNone(weather.parse_coordinates("Paris"))
+        for text in ("91, 0", "0, 180.5", "-90.1;0"):
+            with self.assertRaises(ValueError):
+                weather.parse_coordinates(text)
+
+
+class WeatherServiceTest(unittest.TestCase):
+    def test_concurrent_first_calls_all_get_a_report(self):
+        service = weather.WeatherService()
+        load_stations = weather.load_stations
+
+        def slow_load(path):
+            # Keeps the other callers waiting on the lock while the data is read
+            time.sleep(0.05)
+            return load_stations(path)
+
+        start = threading.Barrier(8)
+        reports, errors = [], []
+
+        def report():
+            start.wait()
+            try:
+                reports.append(service.report("KSFO"))
+            except Exception as e:
+                errors.append(e)
+
+        with mock.patch.object(weather, "load_stations", side_effect=slow_load) as loads:
+            threads = [threading.Thread(target=report) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(reports), 8)
+        self.assertEqual(loads.call_count, 1)
+
+    def test_changed_files_are_read_again(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        stations = shutil.copy(weather.STATIONS_PATH, directory)
+        clock = FakeClock()
+        service = weather.WeatherService(stations_path=stations, reload_interval=60, clock=clock)
+        self.assertIn("7.9°C", service.report("KSFO"))
+
+        with open(stations) as f:
+            text = f.read().replace("7.9,63", "12.5,63")
+        with open(stations, "w") as f:
+            f.write(text)
+        os.utime(stations, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+        self.assertIn("7.9°C", service.report("KSFO"))
+        clock.now = 60
+        self.assertIn("12.5°C", service.report("KSFO"))
+
+
+class WeatherToolTest(unittest.TestCase):
+    def test_unknown_location_is_a_tool_error(self):
+        response = call_weather("Atlantis")
+        self.assertNotIn("error", response)
+        self.assertTrue(response["result"]["isError"])
+        self.assertIn("Unknown location", response["result"]["content"][0]["text"])
+
+    def test_out_of_range_coordinates_are_a_tool_error(self):
+        response = call_weather("95, 10")
+        self.assertTrue(response["result"]["isError"])
+        self.assertIn("Coordinates out of range", response["result"]["content"][0]["text"])
+
+    def test_coordinates_report_the_nearest_station(self):
+        response = call_weather("37.6, -122.4")
+        self.assertNotIn("isError", response["result"])
+        self.assertIn("at KSFO", response["result"]["content"][0]["text"])
+
+    def test_reports_follow_the_service_cache(self):
+        clock = FakeClock()
+        service = weather.WeatherService(report_ttl=10, clock=clock)
+        with mock.patch.object(weather, "_service", service):
+            self.assertNotIn("isError", call_weather("KSFO")["result"])
+            call_weather("KSFO")
+            clock.now = 11
+            call_weather("KSFO")
+        self.assertEqual(service.cache_stats()["hits"], 1)
+        self.assertEqual(service.cache_stats()["misses"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()